@@ -1,8 +1,29 @@
+import os
+import sqlite3
+from contextlib import closing
 import streamlit as st
 import pandas as pd
-import sqlite3
 import altair as alt 
 import numpy as np 
+from src.database.database import (
+    ReadOnlyConnectionPool, IncrementalPlayerFrame, PlayerHistoryCache, DB_PATH, read_growth,
+    read_alerts, read_watchlists, read_watchlist_players, read_alert_rules, read_cube
+)
+from src.database.columnar import columnar_path
+from src.analysis.similarity import SimilarityIndex
+from src.analysis.skyline import compute_bargains, CRITERIOS_PADRAO, CRITERIOS_EXTRAS
+from src.analysis.squad import build_squad, FORMACOES
+from src.analysis.pagination import SortedPager
+from src.analysis.aggregations import AggregationEngine
+from src.analysis.growth import IDADES_PROJECAO
+from src.analysis.cube import LIMIARES_POTENCIAL
+from src.runner.runner import DATA_PATH, ETAPAS, start_pipeline_run, read_status, is_running
+from src.load.schema import FAIXAS_ETARIAS, COLUNAS_PERCENTIL
+from src.load.alerts import (
+    REGRAS_ALERTA, connect_watchlists, create_watchlist, set_watchlist_players, delete_watchlist,
+    add_rule, delete_rule, mark_alerts_read
+)
+from src.profiling.profiling import CACHE_STATS, ENV_LOG, RerunProfiler, overlay_enabled
 
 # Configuração da Página
 st.set_page_config(
@@ -13,21 +34,185 @@ st.set_page_config(
 # Título 
 st.title("Análise de Jogadores - Football Manager Scouting")
 
-# Carregamento dos Dados 
-@st.cache_data
-def load_data():
-    con = sqlite3.connect("database/fm_database.db")
-    df = pd.read_sql_query("SELECT * FROM players", con)
-    con.close()
-
+# Medições de desempenho por seção do rerun (opt-in: ?perf=1 ou FM_PERF_OVERLAY=1 mostram o painel;
+# FM_PERF_LOG=<arquivo> grava cada rerun como uma linha JSON)
+mostrar_desempenho = overlay_enabled(os.environ, st.query_params.to_dict())
+if 'perf' not in st.session_state:
+    st.session_state['perf'] = RerunProfiler(ativo=False)
+perf = st.session_state['perf']
+perf.log_path = os.environ.get(ENV_LOG) or None
+perf.ativo = mostrar_desempenho or perf.log_path is not None
+perf.start()
+CACHE_STATS.start_rerun()
+
+# Conexões somente leitura compartilhadas pela sessão do servidor (uma por thread)
+@CACHE_STATS.track('connection_pool', st.cache_resource)
+def get_connection_pool():
+    return ReadOnlyConnectionPool(DB_PATH)
+
+# Preenche os nulos das colunas categóricas usadas nos filtros
+def prepare_data(df):
     df['posicao'] = df['posicao'].fillna('Desconhecida')
     df['clube'] = df['clube'].fillna('Sem Clube')
     df['pais'] = df['pais'].fillna('Desconhecido')
+    df['gap'] = df['classificacao_potencial'] - df['classificacao_atual']
     return df
 
+# Histórico em memória, sincronizado com a versão do banco (só snapshots novos são lidos).
+# A carga inicial mapeia a cópia colunar gravada pelo pipeline: uma vez por processo, sem cópia por sessão.
+@CACHE_STATS.track('player_store', st.cache_resource)
+def get_player_store():
+    return IncrementalPlayerFrame('players', prepare=prepare_data, columnar_path=columnar_path(DB_PATH))
+
+# Séries históricas dos jogadores comparados na aba Evolução (uma por jogador, compartilhadas entre sessões)
+@CACHE_STATS.track('player_histories', st.cache_resource)
+def get_player_histories():
+    return PlayerHistoryCache('players', prepare=prepare_data)
+
+# Opções da comparação, em ordem alfabética: um item por jogador, com o rótulo da última linha dele.
+# A chave é o player_id quando existe (o histórico vem do banco, numa consulta indexada);
+# jogadores sem ID são identificados pelo nome, como no CSV.
+def player_options(df):
+    chaves = df['player_id'].astype('object').where(df['player_id'].notna(), df['nome'])
+    ordem = np.argsort(df['data_snapshot'].to_numpy(), kind='stable')
+    ultimas = df.loc[chaves.iloc[ordem].drop_duplicates(keep='last').index]
+    ids = ultimas['player_id']
+    rotulos = (ultimas['nome'] + " (" + ultimas['clube'] + ") #" + ids.astype('Int64').astype(str)).where(ids.notna(), ultimas['nome'])
+    mapa = dict(zip([nome if pd.isna(pid) else int(pid) for pid, nome in zip(ids, ultimas['nome'])], rotulos))
+    return {chave: mapa[chave] for chave in sorted(mapa, key=mapa.get)}
+
+# Carregamento dos Dados 
+def load_data():
+    con = get_connection_pool().get()
+    return get_player_store().refresh(con)
+
+# Fronteira de custo-benefício do snapshot mais recente (uma vez por snapshot e critérios)
+@CACHE_STATS.track('bargains', st.cache_data(max_entries=16))
+def get_bargains(versao, criterios_extras, grupo):
+    df = load_data()
+    df_snapshot = df[(df['data_snapshot'] == versao) & (df['valor'] > 1000)]
+    criterios = {**CRITERIOS_PADRAO, **{c: CRITERIOS_EXTRAS[c] for c in criterios_extras}}
+    return compute_bargains(df_snapshot, criterios, grupo)
+
+# Comparação da aba Evolução: número máximo de jogadores e métricas do gráfico (coluna -> rótulo)
+MAX_COMPARACAO = 20
+METRICAS_EVOLUCAO = {
+    'classificacao_atual': "Qualidade Atual",
+    'classificacao_potencial': "Potencial",
+    'valor': "Valor de Mercado",
+}
+
+# Ordenações da tabela principal: coluna -> rótulo
+COLUNAS_ORDENACAO = {
+    'classificacao_potencial': "Potencial",
+    'valor': "Valor de mercado",
+    'idade': "Idade",
+    'gap': "Gap (potencial - atual)",
+    **{coluna_pct: f"Percentil na coorte ({nome})" for nome, coluna_pct in [
+        ("qualidade atual", 'pct_atual'), ("potencial", 'pct_potencial'),
+        ("valor", 'pct_valor'), ("salário", 'pct_salario')
+    ]},
+}
+
+# Ordens pré-calculadas da tabela principal (refeitas só quando chegam linhas novas)
+@CACHE_STATS.track('sorted_pager', st.cache_resource(max_entries=1))
+def get_sorted_pager(versao, n_linhas):
+    return SortedPager(load_data(), list(COLUNAS_ORDENACAO))
+
+# Índice de similaridade do snapshot mais recente (construído uma vez por versão dos dados)
+@CACHE_STATS.track('similarity_index', st.cache_resource(max_entries=1))
+def get_similarity_index(versao):
+    df = load_data()
+    return SimilarityIndex(df[df['data_snapshot'] == versao])
+
+# Agregações do histórico: as do histórico inteiro no DuckDB, direto sobre o banco publicado; os recortes
+# da sidebar no pandas, sobre o quadro '_df' (sem hash: a chave é a versão). Refeito uma vez por versão.
+@CACHE_STATS.track('aggregation_engine', st.cache_resource(max_entries=1))
+def get_aggregation_engine(versao, n_linhas, _df):
+    return AggregationEngine(_df, 'duckdb', db_path=DB_PATH)
+
+# Progresso da última execução do ETL, lido do arquivo de status gravado pelo processo de segundo plano
+def etl_status_panel():
+    status = read_status()
+    if status is None:
+        st.caption("Nenhuma execução registrada.")
+        return
+
+    etapas_feitas = [etapa for etapa in ETAPAS if etapa in status.get('linhas', {})]
+    if status['estado'] == 'executando':
+        st.progress(len(etapas_feitas) / len(ETAPAS), text=status['mensagem'])
+    elif status['estado'] == 'concluido':
+        st.success(f"Concluído em {status['finalizado_em']}.")
+    else:
+        st.error(f"Falhou: {status['erro']}")
+    for etapa in etapas_feitas:
+        st.caption(f"{etapa}: {status['linhas'][etapa]} linhas ({status.get('segundos', {}).get(etapa, 0)}s)")
+
+    # Terminou com dados novos: recarrega o app. Só as entradas de cache da versão nova são montadas;
+    # o histórico em memória busca apenas o snapshot novo.
+    if status['estado'] != 'executando' and st.session_state.get('etl_acompanhando'):
+        st.session_state['etl_acompanhando'] = False
+        st.rerun(scope='app')
+
+# Painel de desempenho: tempo de cada seção no último rerun e médias dos últimos reruns da sessão,
+# mais acertos/faltas dos caches (no rerun e acumulados no processo)
+def perf_panel(perf, registro):
+    resumo = perf.summary()
+    with st.sidebar.expander("⏱️ Desempenho", expanded=True):
+        st.metric(
+            "Último rerun",
+            f"{registro['total_ms']:.0f} ms",
+            delta=f"{registro['total_ms'] - resumo.loc['total', 'media_ms']:+.0f} ms vs média",
+            delta_color="inverse"
+        )
+        st.dataframe(
+            resumo,
+            column_config={
+                "secao": "Seção",
+                "ultimo_ms": st.column_config.NumberColumn("Último (ms)", format="%.1f"),
+                "media_ms": st.column_config.NumberColumn("Média (ms)", format="%.1f"),
+                "p95_ms": st.column_config.NumberColumn("p95 (ms)", format="%.1f"),
+                "max_ms": st.column_config.NumberColumn("Máx. (ms)", format="%.1f"),
+                "fatia": st.column_config.ProgressColumn("Fatia", format="percent", min_value=0.0, max_value=1.0),
+            }
+        )
+        st.caption(f"Médias dos últimos {len(perf.historico)} reruns desta sessão.")
+
+        caches = CACHE_STATS.totals()
+        rerun = pd.DataFrame.from_dict(registro['cache'], orient='index', columns=['hits', 'misses'])
+        caches = caches.join(rerun.add_suffix('_rerun')).fillna(0)
+        st.dataframe(
+            caches[['hits_rerun', 'misses_rerun', 'hits', 'misses', 'taxa_acerto']],
+            column_config={
+                "cache": "Cache",
+                "hits_rerun": st.column_config.NumberColumn("Hits (rerun)", format="%d"),
+                "misses_rerun": st.column_config.NumberColumn("Misses (rerun)", format="%d"),
+                "hits": st.column_config.NumberColumn("Hits (total)", format="%d"),
+                "misses": st.column_config.NumberColumn("Misses (total)", format="%d"),
+                "taxa_acerto": st.column_config.NumberColumn("Acerto", format="percent"),
+            }
+        )
+        if perf.log_path:
+            st.caption(f"Reruns gravados em `{perf.log_path}`.")
+
+# Painel de administração: roda o pipeline sem bloquear o dashboard (uma execução por vez)
+with st.sidebar.expander("⚙️ Atualizar dados (ETL)"):
+    caminho_csv = st.text_input("Arquivo CSV exportado", value=DATA_PATH, key="caminho_csv")
+    executando = is_running()
+    if st.button("Executar pipeline", disabled=executando, key="executar_etl"):
+        if start_pipeline_run(caminho_csv, DB_PATH):
+            executando = True
+        else:
+            st.warning("Já existe uma execução em andamento.")
+    if executando:
+        st.session_state['etl_acompanhando'] = True
+    st.fragment(run_every=1 if executando else None)(etl_status_panel)()
+perf.checkpoint('painel_etl')
+
 # Carrega os dados
 try:
     df_players = load_data()
+    perf.checkpoint('load_data')
 
     st.sidebar.header("Filtros Interativos")
 
@@ -100,41 +285,116 @@ try:
         step=100000,
         format="€ %d"
     )
-    
-    df_filtered = df_players.copy()
-    
-    df_filtered = df_players.copy()
+
+    # Filtros relativos à coorte (função atual x faixa etária), com percentis calculados na carga
+    st.sidebar.markdown("**Comparação na coorte (função × faixa etária)**")
+    filtro_faixa = st.sidebar.multiselect(
+        "Faixa etária",
+        options=[rotulo for _, rotulo in FAIXAS_ETARIAS],
+        default=[]
+    )
+    nomes_percentis = {
+        'pct_atual': "Qualidade atual",
+        'pct_potencial': "Potencial",
+        'pct_valor': "Valor de mercado",
+        'pct_salario': "Salário",
+    }
+    metrica_coorte = st.sidebar.selectbox(
+        "Percentil de",
+        options=list(COLUNAS_PERCENTIL.values()),
+        index=1,
+        format_func=nomes_percentis.get
+    )
+    filtro_percentil = st.sidebar.slider(
+        "Percentil mínimo na coorte",
+        min_value=0,
+        max_value=100,
+        value=0,
+        format="%d%%"
+    )
+    perf.checkpoint('widgets_filtros')
+
+    # Os filtros viram uma máscara sobre o quadro compartilhado (cache de todas as sessões): nada dele
+    # é copiado sem filtro e nenhuma aba escreve nele
+    mascara_filtro = np.ones(len(df_players), dtype=bool)
 
     if filtro_nome:
-        df_filtered = df_filtered[df_filtered['nome'].str.contains(filtro_nome, case=False, na=False)]
+        mascara_filtro &= df_players['nome'].str.contains(filtro_nome, case=False, na=False).to_numpy()
     if filtro_funcao:
-        df_filtered = df_filtered[df_filtered['sufixo_atual'].str.contains('|'.join(filtro_funcao), na=False)]
+        mascara_filtro &= df_players['sufixo_atual'].str.contains('|'.join(filtro_funcao), na=False).to_numpy()
     if filtro_posicao:
-        df_filtered = df_filtered[df_filtered['posicao'].isin(filtro_posicao)]
+        mascara_filtro &= df_players['posicao'].isin(filtro_posicao).to_numpy()
     if filtro_clube:
-        df_filtered = df_filtered[df_filtered['clube'].isin(filtro_clube)]
+        mascara_filtro &= df_players['clube'].isin(filtro_clube).to_numpy()
     if filtro_pais:
-        df_filtered = df_filtered[df_filtered['pais'].isin(filtro_pais)]
+        mascara_filtro &= df_players['pais'].isin(filtro_pais).to_numpy()
 
     # Filtros de intervalo (idade, potencial, valor)
-    df_filtered = df_filtered[
-        (df_filtered['idade'] >= filtro_idade[0]) & (df_filtered['idade'] <= filtro_idade[1])
-    ]
-    df_filtered = df_filtered[
-        (df_filtered['classificacao_potencial'] >= filtro_potencial[0]) & (df_filtered['classificacao_potencial'] <= filtro_potencial[1])
-    ]
-    df_filtered = df_filtered[
-        (df_filtered['valor'] >= filtro_valor[0]) & (df_filtered['valor'] <= filtro_valor[1])
-    ]
+    mascara_filtro &= df_players['idade'].between(filtro_idade[0], filtro_idade[1]).to_numpy()
+    mascara_filtro &= df_players['classificacao_potencial'].between(filtro_potencial[0], filtro_potencial[1]).to_numpy()
+    mascara_filtro &= df_players['valor'].between(filtro_valor[0], filtro_valor[1]).to_numpy()
+
+    # Filtros de coorte
+    if filtro_faixa:
+        mascara_filtro &= df_players['faixa_etaria'].isin(filtro_faixa).to_numpy()
+    if filtro_percentil > 0:
+        mascara_filtro &= (df_players[metrica_coorte] >= filtro_percentil / 100).to_numpy()
+    df_filtered = df_players if mascara_filtro.all() else df_players[mascara_filtro]
+    perf.checkpoint('cadeia_filtros')
 
     # PÁGINA PRINCIPAL 
     st.header("Análise Principal (Resultados Filtrados)")
     st.info(f"Mostrando **{len(df_filtered)}** jogadores de um total de **{len(df_players)}** com base nos filtros aplicados.")
     
+    # Paginação por cursor sobre as ordens pré-calculadas: só a página atual vai para o navegador
+    col_o1, col_o2, col_o3 = st.columns([2, 1, 1])
+    coluna_ordem = col_o1.selectbox(
+        "Ordenar por",
+        options=list(COLUNAS_ORDENACAO),
+        format_func=COLUNAS_ORDENACAO.get,
+        key="ordem_principal"
+    )
+    decrescente = col_o2.selectbox("Sentido", options=["Decrescente", "Crescente"], key="sentido_principal") == "Decrescente"
+    tamanho_pagina = col_o3.selectbox("Linhas por página", options=[50, 100, 200, 500], key="tamanho_pagina")
+
+    pager = get_sorted_pager(df_players['data_snapshot'].max(), len(df_players))
+
+    # Volta para a primeira página quando filtros ou ordenação mudam
+    assinatura = (
+        filtro_nome, tuple(filtro_funcao), tuple(filtro_posicao), tuple(filtro_clube), tuple(filtro_pais),
+        filtro_idade, filtro_potencial, filtro_valor, tuple(filtro_faixa), metrica_coorte, filtro_percentil,
+        coluna_ordem, decrescente, tamanho_pagina, len(df_players)
+    )
+    if st.session_state.get('assinatura_pagina') != assinatura:
+        st.session_state['assinatura_pagina'] = assinatura
+        st.session_state['cursores_pagina'] = [-1]
+    cursores = st.session_state['cursores_pagina']
+
+    posicoes_pagina, proximo_cursor = pager.page(coluna_ordem, decrescente, mascara_filtro, cursores[-1], tamanho_pagina)
+    inicio_pagina = (len(cursores) - 1) * tamanho_pagina
+
     st.dataframe(
-    df_filtered.sort_values(by="classificacao_potencial", ascending=False).head(50), 
+    df_players.iloc[posicoes_pagina], 
     height=500,
     column_config={
+            "player_id": None,
+            "gap": st.column_config.NumberColumn(
+                "Gap",
+                help="Potencial - qualidade atual.",
+                format="%.1f"
+            ),
+            "faixa_etaria": st.column_config.TextColumn(
+                "Faixa Etária",
+                help="Faixa etária usada na coorte dos percentis."
+            ),
+            **{
+                coluna_pct: st.column_config.NumberColumn(
+                    f"Percentil {nome.lower()}",
+                    help="Percentil dentro da coorte (mesma função atual e faixa etária) no snapshot.",
+                    format="percent"
+                )
+                for coluna_pct, nome in nomes_percentis.items()
+            },
             "valor": st.column_config.NumberColumn(
                 "Valor de Mercado",
                 format="€ %d"  
@@ -158,15 +418,39 @@ try:
         }
     )
 
+    col_p1, col_p2, col_p3 = st.columns([1, 2, 1])
+    col_p1.button(
+        "◀ Anterior",
+        disabled=len(cursores) == 1,
+        on_click=cursores.pop,
+        key="pagina_anterior"
+    )
+    col_p2.markdown(
+        f"Página **{len(cursores)}** — linhas {inicio_pagina + 1 if len(posicoes_pagina) else 0}"
+        f"–{inicio_pagina + len(posicoes_pagina)} de {len(df_filtered)}"
+    )
+    col_p3.button(
+        "Próxima ▶",
+        disabled=proximo_cursor is None,
+        on_click=cursores.append,
+        args=(proximo_cursor,),
+        key="pagina_proxima"
+    )
+
+    perf.checkpoint('tabela_principal')
+
     st.markdown("---") 
 
     # Seções de Análise (em ABAS)
     st.header("Análises Detalhadas")
-    tab1, tab2, tab3, tab_evolucao, tab_legenda = st.tabs([
+    tab1, tab2, tab3, tab_evolucao, tab_alertas, tab_similares, tab_elenco, tab_legenda = st.tabs([
         "Wonderkids", 
         "Melhor custo-benefício", 
         "Fábrica de talentos (Clube/País)",
         "Evolução dos jogadores",
+        "Watchlists e alertas",
+        "Jogadores similares",
+        "Montar elenco",
         "Legendas e Informações"     
     ])
 
@@ -176,10 +460,10 @@ try:
         
         idade_brutos = st.slider("Idade Máxima", 15, 25, 21, key="idade_brutos")
         
-        df_gap = df_filtered.copy()
-        df_gap['gap_potencial'] = df_gap['classificacao_potencial'] - df_gap['classificacao_atual']
-        
-        df_gap_filtrado = df_gap[df_gap['idade'] <= idade_brutos]
+        df_gap_filtrado = df_filtered[df_filtered['idade'] <= idade_brutos]
+        df_gap_filtrado = df_gap_filtrado.assign(
+            gap_potencial=df_gap_filtrado['classificacao_potencial'] - df_gap_filtrado['classificacao_atual']
+        )
         
         st.dataframe(
             df_gap_filtrado.sort_values(by="gap_potencial", ascending=False).head(20),
@@ -195,119 +479,561 @@ try:
                 )
             }
         )
+    perf.checkpoint('aba_wonderkids')
 
     # Aba 2: Pechinchas 
     with tab2:
         st.subheader("Gráfico de Custo-Benefício (Qualidade Atual vs. Valor)")
-        st.markdown("Procure por jogadores no **canto superior esquerdo** (alta qualidade, baixo valor).")
+        st.markdown("Os pontos em **vermelho** formam a fronteira de custo-benefício: nenhum outro jogador do mesmo grupo é ao mesmo tempo mais barato e melhor.")
 
         df_pechinchas = df_filtered[df_filtered['valor'] > 1000].copy()
 
-        use_log_valor = st.checkbox("Usar escala logarítmica para 'Valor'", value=True)
+        col_p1, col_p2, col_p3 = st.columns(3)
+        use_log_valor = col_p1.checkbox("Usar escala logarítmica para 'Valor'", value=True)
+        criterios_extras = col_p2.multiselect(
+            "Critérios adicionais",
+            options=list(CRITERIOS_EXTRAS),
+            format_func=lambda c: {'idade': 'Mais jovem', 'classificacao_potencial': 'Maior potencial'}[c],
+            key="criterios_pechincha"
+        )
+        grupo_pechincha = col_p3.selectbox(
+            "Comparar dentro de",
+            options=['sufixo_atual', 'posicao', None],
+            format_func=lambda g: {'sufixo_atual': 'Função', 'posicao': 'Posição', None: 'Todos os jogadores'}[g],
+            key="grupo_pechincha"
+        )
         scale_type = "log" if use_log_valor else "linear"
 
+        # Fronteira calculada sobre o snapshot mais recente; os filtros da sidebar restringem a lista
+        df_fronteira = get_bargains(df_players['data_snapshot'].max(), tuple(criterios_extras), grupo_pechincha)
+        df_fronteira = df_fronteira[df_fronteira.index.isin(df_pechinchas.index)]
+
         chart = alt.Chart(df_pechinchas).mark_circle(opacity=0.7).encode(
             x=alt.X('valor', title='Valor de Mercado', scale=alt.Scale(type=scale_type)),
             y=alt.Y('classificacao_atual', title='Qualidade Atual'),
             tooltip=['nome', 'clube', 'idade', 'valor', 'classificacao_atual', 'posicao']
-        ).interactive() 
+        )
+        chart_fronteira = alt.Chart(df_fronteira).mark_circle(color='red', size=90).encode(
+            x='valor',
+            y='classificacao_atual',
+            tooltip=['nome', 'clube', 'idade', 'valor', 'classificacao_atual', 'posicao', 'sufixo_atual']
+        )
 
-        st.altair_chart(chart, use_container_width=True)
+        st.altair_chart((chart + chart_fronteira).interactive(), use_container_width=True)
+
+        st.markdown(f"#### Melhores pechinchas ({len(df_fronteira)} jogadores na fronteira)")
+        st.dataframe(
+            df_fronteira,
+            column_order=[
+                'nome', 'clube', 'idade', 'posicao', 'sufixo_atual',
+                'classificacao_atual', 'classificacao_potencial', 'valor', 'salario'
+            ],
+            column_config={
+                "valor": st.column_config.NumberColumn("Valor de Mercado", format="€ %d"),
+                "salario": st.column_config.NumberColumn("Salário", format="€ %d")
+            }
+        )
+    perf.checkpoint('aba_pechinchas')
 
     # Aba 3: Clubes que produzem os Wonderkids
     with tab3:
         st.subheader("Quais Clubes e Países produzem os melhores talentos?")
-        
+
+        # Sem filtros na sidebar, cada recorte é uma leitura do cubo materializado na carga (custa o número de
+        # grupos); com filtros, as agregações rodam sobre o recorte. Em ambos os casos, só o snapshot mais recente.
+        conn_cubo = get_connection_pool().get()
+        usar_cubo = len(df_filtered) == len(df_players) and not read_cube(conn_cubo, []).empty
+        df_talentos = df_filtered[df_filtered['data_snapshot'] == df_players['data_snapshot'].max()]
+        if usar_cubo:
+            st.caption("Snapshot mais recente, lido do cubo de agregações gravado na carga.")
+        else:
+            st.caption("Snapshot mais recente, calculado sobre os jogadores dos filtros da sidebar.")
+
+        faixas_talentos = [None] + [rotulo for _, rotulo in FAIXAS_ETARIAS]
+        funcao_talentos = st.selectbox(
+            "Função", options=[None] + funcoes_unicas, format_func=lambda f: "Todas" if f is None else f, key="funcao_talentos"
+        )
+
+        # Recorte (fora do cubo) de uma faixa etária e função
+        def recorte_talentos(faixa, funcao):
+            recorte = df_talentos
+            if faixa is not None:
+                recorte = recorte[recorte['faixa_etaria'] == faixa]
+            if funcao is not None:
+                tokens = recorte['sufixo_atual'].fillna('').str.split(',')
+                recorte = recorte[tokens.map(lambda lista: funcao in [t.strip() for t in lista])]
+            return recorte
+
+        def filtros_cubo(faixa, funcao):
+            return {k: v for k, v in {'faixa_etaria': faixa, 'funcao': funcao}.items() if v is not None}
+
         col1, col2 = st.columns(2) 
 
         with col1:
             st.markdown("#### Top Clubes por Potencial Médio")
             
             min_players_club = st.slider("Nº mínimo de jogadores no clube (para média)", 1, 10, 3, key="min_jog_clube")
-            
-            club_stats = df_filtered.groupby('clube')['classificacao_potencial'].agg(['mean', 'count'])
-            club_stats_filtered = club_stats[club_stats['count'] >= min_players_club]
-            
-            top_clubs = club_stats_filtered.sort_values(by='mean', ascending=False).head(15)
+            faixa_clubes = st.selectbox(
+                "Faixa etária", options=faixas_talentos, format_func=lambda f: "Todas" if f is None else f, key="faixa_clubes"
+            )
+
+            if usar_cubo:
+                clubes = read_cube(conn_cubo, ['clube'], filtros_cubo(faixa_clubes, funcao_talentos))
+                clubes = clubes[clubes['count_potencial'] >= min_players_club]
+                clubes = clubes.sort_values(['media_potencial', 'clube'], ascending=[False, True], na_position='last')
+                top_clubs = clubes.head(15).set_index('clube')[['media_potencial', 'count_potencial']]
+            else:
+                motor_agregacoes = get_aggregation_engine(df_players['data_snapshot'].max(), len(df_players), df_players)
+                top_clubs = motor_agregacoes.club_potential(recorte_talentos(faixa_clubes, funcao_talentos), min_players_club, n=15)
             top_clubs.columns = ['Potencial Médio', 'Nº de Jogadores']
             st.dataframe(top_clubs.style.format({"Potencial Médio": "{:.1f}"}))
 
         with col2:
             st.markdown("#### Top Países por contagem de 'Wonderkids'")
 
-            # Define os atributos para um Wonderkid
-            potencial_wonderkid = st.slider("Potencial Mínimo (Wonderkid)", 80.0, 100.0, 90.0, step=0.1, key="pot_wk")
-            idade_wonderkid = st.slider("Idade Máxima (Wonderkid)", 18, 23, 21, key="idade_wk")
+            # Define os atributos para um Wonderkid (limiares de potencial contados no cubo)
+            potencial_wonderkid = st.select_slider(
+                "Potencial Mínimo (Wonderkid)", options=list(LIMIARES_POTENCIAL), value=90, key="pot_wk"
+            )
+            faixa_wonderkid = st.selectbox(
+                "Faixa etária (Wonderkid)", options=faixas_talentos, index=1,
+                format_func=lambda f: "Todas" if f is None else f, key="faixa_wk"
+            )
+
+            if usar_cubo:
+                paises = read_cube(conn_cubo, ['pais'], filtros_cubo(faixa_wonderkid, funcao_talentos))
+                paises = paises[paises[f'n_pot_{potencial_wonderkid}'] > 0]
+                paises = paises.sort_values([f'n_pot_{potencial_wonderkid}', 'pais'], ascending=[False, True])
+                wonderkids_por_pais = paises.head(15).set_index('pais')[f'n_pot_{potencial_wonderkid}'].rename('count')
+            else:
+                motor_agregacoes = get_aggregation_engine(df_players['data_snapshot'].max(), len(df_players), df_players)
+                wonderkids_por_pais = motor_agregacoes.country_counts(
+                    recorte_talentos(faixa_wonderkid, funcao_talentos), potencial_wonderkid, n=15
+                )
+            st.bar_chart(wonderkids_por_pais)
+
+        # Drill-down / roll-up: cada combinação de dimensões é um nível pronto do cubo
+        if usar_cubo:
+            with st.expander("Explorar por clube, país, faixa etária e função"):
+                nomes_dimensoes = {'pais': "País", 'clube': "Clube", 'faixa_etaria': "Faixa etária", 'funcao': "Função"}
+                agrupar_cubo = st.multiselect(
+                    "Agrupar por (adicione dimensões para detalhar, remova para consolidar)",
+                    options=list(nomes_dimensoes), default=['pais'], format_func=nomes_dimensoes.get, key="agrupar_cubo"
+                )
+                fatia = read_cube(conn_cubo, agrupar_cubo, filtros_cubo(faixa_clubes, funcao_talentos))
+                st.caption(
+                    f"{len(fatia)} grupos (faixa etária: {faixa_clubes or 'todas'}, função: {funcao_talentos or 'todas'}). "
+                    "Com a função no agrupamento, quem tem mais de uma função aparece em cada uma."
+                )
+                st.dataframe(
+                    fatia.sort_values('jogadores', ascending=False).head(500),
+                    column_order=agrupar_cubo + [
+                        'jogadores', 'media_potencial', 'max_potencial', 'media_atual', 'max_atual',
+                        f'n_pot_{potencial_wonderkid}', 'media_valor', 'sum_valor'
+                    ],
+                    column_config={
+                        **{d: nomes_dimensoes[d] for d in agrupar_cubo},
+                        "jogadores": st.column_config.NumberColumn("Jogadores", format="%d"),
+                        "media_potencial": st.column_config.NumberColumn("Potencial médio", format="%.1f"),
+                        "max_potencial": st.column_config.NumberColumn("Potencial máx.", format="%.1f"),
+                        "media_atual": st.column_config.NumberColumn("Atual médio", format="%.1f"),
+                        "max_atual": st.column_config.NumberColumn("Atual máx.", format="%.1f"),
+                        f"n_pot_{potencial_wonderkid}": st.column_config.NumberColumn(
+                            f"Potencial ≥ {potencial_wonderkid}", format="%d"
+                        ),
+                        "media_valor": st.column_config.NumberColumn("Valor médio", format="€ %.0f"),
+                        "sum_valor": st.column_config.NumberColumn("Valor total", format="€ %.0f"),
+                    },
+                    hide_index=True
+                )
+
+        # Todo o histórico, snapshot a snapshot: sem filtros na sidebar roda no DuckDB sobre o banco publicado
+        with st.expander("Evolução por snapshot (todo o histórico)"):
+            nomes_grupos = {'pais': "País", 'faixa_etaria': "Faixa etária", 'clube': "Clube"}
+            nomes_metricas = {
+                'jogadores': "Jogadores", 'media_potencial': "Potencial médio",
+                'media_atual': "Qualidade atual média", 'valor_total': "Valor total",
+            }
+            col_h1, col_h2 = st.columns(2)
+            grupo_historico = col_h1.selectbox(
+                "Agrupar por", options=list(nomes_grupos), format_func=nomes_grupos.get, key="grupo_historico"
+            )
+            metrica_historico = col_h2.selectbox(
+                "Métrica", options=list(nomes_metricas), format_func=nomes_metricas.get, key="metrica_historico"
+            )
+            motor_agregacoes = get_aggregation_engine(df_players['data_snapshot'].max(), len(df_players), df_players)
+            filtro_historico = None if len(df_filtered) == len(df_players) else df_filtered
+            resumo = motor_agregacoes.snapshot_summary(grupo_historico, filtro_historico)
+            if resumo.empty:
+                st.warning("Nenhum jogador encontrado com os filtros atuais.")
+            else:
+                # Os 10 grupos com mais jogadores no snapshot mais recente
+                ultimo = resumo[resumo['data_snapshot'] == resumo['data_snapshot'].max()]
+                principais = ultimo.nlargest(10, 'jogadores')[grupo_historico]
+                if filtro_historico is not None:
+                    origem_historico = "jogadores dos filtros da sidebar"
+                elif motor_agregacoes.backend == 'duckdb':
+                    origem_historico = "todos os jogadores, agregados no DuckDB"
+                else:
+                    origem_historico = "todos os jogadores"
+                st.caption(f"{resumo['data_snapshot'].nunique()} snapshots, {origem_historico}.")
+                st.line_chart(
+                    resumo[resumo[grupo_historico].isin(principais)]
+                    .pivot(index='data_snapshot', columns=grupo_historico, values=metrica_historico)
+                )
+    perf.checkpoint('aba_fabrica_talentos')
 
-            df_wonderkids = df_filtered[
-                (df_filtered['classificacao_potencial'] >= potencial_wonderkid) & 
-                (df_filtered['idade'] <= idade_wonderkid)
-            ]
-            
-            country_counts = df_wonderkids['pais'].value_counts().head(15)
-            st.bar_chart(country_counts)
-    
     # Aba 4: Evolução dos Jogadores
     with tab_evolucao:
-        st.subheader("Análise de Evolução do Jogador")
-        st.markdown("Use os filtros da sidebar para refinar a lista de jogadores e, em seguida, selecione um jogador abaixo para ver seu histórico.")
-
-        nomes_unicos_filtrados = sorted(df_filtered['nome'].unique())
-        
-        jogador_selecionado = st.selectbox(
-            "Selecione um jogador:",
-            options=nomes_unicos_filtrados,
-            index=None,
-            placeholder="Escolha um jogador para analisar..."
+        st.subheader("Comparação da Evolução dos Jogadores")
+        st.markdown(f"Use os filtros da sidebar para refinar a lista e selecione até {MAX_COMPARACAO} jogadores para comparar o histórico lado a lado.")
+
+        rotulos_jogadores = player_options(df_filtered)
+        opcoes_jogadores = list(rotulos_jogadores)
+
+        jogadores_selecionados = st.multiselect(
+            "Selecione jogadores para comparar:",
+            options=opcoes_jogadores,
+            format_func=rotulos_jogadores.get,
+            max_selections=MAX_COMPARACAO,
+            placeholder="Escolha um ou mais jogadores...",
+            key="jogadores_comparacao"
         )
 
-        if jogador_selecionado:
-            df_historico = df_players[df_players['nome'] == jogador_selecionado].copy()
-            
+        if jogadores_selecionados:
+            ids_comparacao = [chave for chave in jogadores_selecionados if not isinstance(chave, str)]
+            nomes_sem_id = [chave for chave in jogadores_selecionados if isinstance(chave, str)]
+            partes_historico = []
+            if ids_comparacao:
+                # Só os jogadores que ainda não estão no cache são lidos do banco
+                partes_historico.append(get_player_histories().get(
+                    get_connection_pool().get(), ids_comparacao, df_players['data_snapshot'].max()
+                ))
+            if nomes_sem_id:
+                partes_historico.append(df_players[df_players['player_id'].isna() & df_players['nome'].isin(nomes_sem_id)])
+            df_historico = pd.concat(partes_historico, ignore_index=True)
+            df_historico['jogador'] = [
+                rotulos_jogadores.get(int(pid), nome) if pd.notna(pid) else nome
+                for pid, nome in zip(df_historico['player_id'], df_historico['nome'])
+            ]
             df_historico['data_snapshot'] = pd.to_datetime(df_historico['data_snapshot'])
-            df_historico = df_historico.sort_values(by="data_snapshot")
+            df_historico = df_historico.sort_values(['jogador', 'data_snapshot'])
 
-            if len(df_historico) < 2:
-                st.warning(f"O jogador '{jogador_selecionado}' tem apenas 1 registro. Não é possível mostrar a evolução.")
-                st.dataframe(df_historico)
-            
-            else:
-                primeiro_snapshot = df_historico.iloc[0]
-                ultimo_snapshot = df_historico.iloc[-1]
-                
-                delta_atual = ultimo_snapshot['classificacao_atual'] - primeiro_snapshot['classificacao_atual']
-                delta_potencial = ultimo_snapshot['classificacao_potencial'] - primeiro_snapshot['classificacao_potencial']
-                delta_valor = ultimo_snapshot['valor'] - primeiro_snapshot['valor']
-
-                st.markdown(f"#### Resumo da Evolução de {jogador_selecionado}")
-                col_m1, col_m2, col_m3 = st.columns(3)
-                col_m1.metric(
-                    "Qualidade Atual", 
-                    f"{ultimo_snapshot['classificacao_atual']:.1f}", 
-                    f"{delta_atual:+.1f}"
-                )
-                col_m2.metric(
-                    "Potencial", 
-                    f"{ultimo_snapshot['classificacao_potencial']:.1f}", 
-                    f"{delta_potencial:+.1f}"
-                )
-                col_m3.metric(
-                    "Valor de Mercado", 
-                    f"€ {ultimo_snapshot['valor']:,.0f}", 
-                    f"€ {delta_valor:+,.0f}"
+            col_e1, col_e2 = st.columns(2)
+            metrica_evolucao = col_e1.selectbox(
+                "Métrica", options=list(METRICAS_EVOLUCAO), format_func=METRICAS_EVOLUCAO.get, key="metrica_evolucao"
+            )
+            eixo_evolucao = col_e2.radio(
+                "Alinhar por", options=["Data do snapshot", "Idade"], horizontal=True, key="eixo_evolucao"
+            )
+            eixo_x = (
+                alt.X('data_snapshot:T', title="Snapshot") if eixo_evolucao == "Data do snapshot"
+                else alt.X('idade:Q', title="Idade", scale=alt.Scale(zero=False))
+            )
+            grafico_evolucao = alt.Chart(df_historico).mark_line(point=True).encode(
+                x=eixo_x,
+                y=alt.Y(f'{metrica_evolucao}:Q', title=METRICAS_EVOLUCAO[metrica_evolucao], scale=alt.Scale(zero=False)),
+                color=alt.Color('jogador:N', title="Jogador"),
+                tooltip=['jogador', 'data_snapshot', 'idade', 'clube', metrica_evolucao]
+            )
+            st.altair_chart(grafico_evolucao, use_container_width=True)
+
+            # Resumo: primeiro e último snapshot de cada jogador
+            grupos_historico = df_historico.groupby('jogador', sort=False)
+            primeiros, ultimos = grupos_historico.first(), grupos_historico.last()
+            resumo_evolucao = pd.DataFrame({
+                'snapshots': grupos_historico.size(),
+                'clube': ultimos['clube'],
+                'idade': ultimos['idade'],
+                'classificacao_atual': ultimos['classificacao_atual'],
+                'delta_atual': ultimos['classificacao_atual'] - primeiros['classificacao_atual'],
+                'classificacao_potencial': ultimos['classificacao_potencial'],
+                'delta_potencial': ultimos['classificacao_potencial'] - primeiros['classificacao_potencial'],
+                'valor': ultimos['valor'],
+                'delta_valor': ultimos['valor'] - primeiros['valor'],
+            }).reset_index()
+            st.markdown("#### Resumo da Evolução")
+            st.dataframe(
+                resumo_evolucao,
+                column_config={
+                    "jogador": "Jogador", "clube": "Clube (último)",
+                    "snapshots": st.column_config.NumberColumn("Snapshots", format="%d"),
+                    "idade": st.column_config.NumberColumn("Idade", format="%d"),
+                    "classificacao_atual": st.column_config.NumberColumn("Qualidade Atual", format="%.1f"),
+                    "delta_atual": st.column_config.NumberColumn("Δ Atual", format="%+.1f"),
+                    "classificacao_potencial": st.column_config.NumberColumn("Potencial", format="%.1f"),
+                    "delta_potencial": st.column_config.NumberColumn("Δ Potencial", format="%+.1f"),
+                    "valor": st.column_config.NumberColumn("Valor de Mercado", format="€ %d"),
+                    "delta_valor": st.column_config.NumberColumn("Δ Valor", format="€ %+d"),
+                },
+                hide_index=True
+            )
+            if (resumo_evolucao['snapshots'] < 2).any():
+                st.caption("Jogadores com um único registro aparecem como um ponto: ainda não há evolução para mostrar.")
+
+            # Curvas de crescimento ajustadas na carga (só jogadores com id acompanhados entre snapshots)
+            curvas = read_growth(get_connection_pool().get(), player_ids=ids_comparacao) if ids_comparacao else pd.DataFrame()
+            if not curvas.empty:
+                curvas['jogador'] = [rotulos_jogadores.get(int(pid)) for pid in curvas['player_id']]
+                st.markdown("### Projeção de Crescimento")
+                st.caption("Retas ajustadas sobre os snapshots de cada jogador. Idades já passadas ficam em branco.")
+                st.dataframe(
+                    curvas,
+                    column_order=['jogador', 'taxa_anual', *[f'proj_{idade}' for idade in IDADES_PROJECAO], 'deficit_potencial', 'rmse', 'n_obs'],
+                    column_config={
+                        "jogador": "Jogador",
+                        "taxa_anual": st.column_config.NumberColumn("Pontos/ano", format="%+.1f"),
+                        **{f'proj_{idade}': st.column_config.NumberColumn(f"Proj. {idade}", format="%.1f") for idade in IDADES_PROJECAO},
+                        "deficit_potencial": st.column_config.NumberColumn(
+                            "Distância do potencial no pico", format="%.1f",
+                            help="Potencial - qualidade projetada aos 27 anos (ou a atual, para quem já passou dessa idade)."
+                        ),
+                        "rmse": st.column_config.NumberColumn("Erro médio", format="%.1f"),
+                        "n_obs": st.column_config.NumberColumn("Snapshots", format="%d"),
+                    },
+                    hide_index=True
                 )
+            st.markdown("---")
+
+        # Jogadores cuja curva alcança o potencial: consulta indexada na tabela de curvas
+        st.markdown("#### Quem está no caminho do potencial")
+        col_c1, col_c2 = st.columns(2)
+        tolerancia_curva = col_c1.slider("Distância máxima do potencial no pico", 0.0, 20.0, 2.0, step=0.5, key="tolerancia_curva")
+        idade_max_curva = col_c2.slider("Idade máxima", 15, 40, 23, key="idade_max_curva")
+        no_caminho = read_growth(get_connection_pool().get(), deficit_max=tolerancia_curva, idade_max=idade_max_curva, limite=200)
+        if no_caminho.empty:
+            st.caption("Nenhuma curva encontrada: as curvas só existem para jogadores com ID acompanhados entre snapshots.")
+        else:
+            st.dataframe(
+                no_caminho,
+                column_order=[
+                    'nome', 'clube', 'idade_ref', 'nivel', 'taxa_anual', 'proj_21', 'proj_24', 'proj_27',
+                    'classificacao_potencial', 'deficit_potencial', 'n_obs'
+                ],
+                column_config={
+                    "idade_ref": st.column_config.NumberColumn("Idade", format="%.1f"),
+                    "nivel": st.column_config.NumberColumn("Qualidade (ajustada)", format="%.1f"),
+                    "taxa_anual": st.column_config.NumberColumn("Pontos/ano", format="%+.1f"),
+                    "proj_21": st.column_config.NumberColumn("Proj. 21", format="%.1f"),
+                    "proj_24": st.column_config.NumberColumn("Proj. 24", format="%.1f"),
+                    "proj_27": st.column_config.NumberColumn("Proj. 27", format="%.1f"),
+                    "classificacao_potencial": st.column_config.NumberColumn("Potencial", format="%.1f"),
+                    "deficit_potencial": st.column_config.NumberColumn("Distância", format="%.1f"),
+                    "n_obs": st.column_config.NumberColumn("Snapshots", format="%d"),
+                },
+                hide_index=True
+            )
+    perf.checkpoint('aba_evolucao')
+
+    # Aba: Watchlists e alertas (as regras são avaliadas pela carga; aqui só se lê o resultado)
+    with tab_alertas:
+        st.subheader("Watchlists e alertas")
+        conn_leitura = get_connection_pool().get()
+
+        alertas = read_alerts(conn_leitura, limite=500)
+        st.markdown(f"#### Alertas pendentes ({len(alertas)})")
+        if alertas.empty:
+            st.caption("Nenhum alerta pendente. As regras são avaliadas a cada carga, só para os jogadores das watchlists.")
+        else:
+            st.dataframe(
+                alertas,
+                column_order=['data_snapshot', 'watchlist', 'nome', 'clube', 'mensagem'],
+                column_config={
+                    "data_snapshot": "Snapshot", "watchlist": "Watchlist", "nome": "Nome",
+                    "clube": "Clube", "mensagem": "Alerta",
+                },
+                hide_index=True
+            )
+            if st.button("Marcar todos como lidos", key="marcar_alertas_lidos"):
+                with closing(connect_watchlists(DB_PATH)) as conn_escrita, conn_escrita:
+                    mark_alerts_read(conn_escrita, alertas['alert_id'].tolist())
+                st.rerun()
 
-                st.markdown("---")
-                st.markdown("### Gráfico de Evolução (vs. Tempo)")
-                
-                df_plot = df_historico.set_index('data_snapshot')
-                st.line_chart(df_plot[['classificacao_atual', 'classificacao_potencial']])
-                st.markdown("### Evolução do Valor de Mercado")
-                st.line_chart(df_plot[['valor']])
-                
-                st.markdown("---")
-    
-    # Aba 5: Legendas
+        st.markdown("---")
+        st.markdown("#### Watchlists")
+        watchlists = read_watchlists(conn_leitura)
+        col_w1, col_w2 = st.columns([2, 1])
+        nome_nova = col_w2.text_input("Nova watchlist", key="nome_nova_watchlist")
+        if col_w2.button("Criar", key="criar_watchlist", disabled=not nome_nova.strip()):
+            with closing(connect_watchlists(DB_PATH)) as conn_escrita, conn_escrita:
+                create_watchlist(conn_escrita, nome_nova)
+            st.rerun()
+        watchlist_id = col_w1.selectbox(
+            "Watchlist",
+            options=watchlists['watchlist_id'].tolist(),
+            format_func=lambda w: "{} ({} jogadores, {} pendentes)".format(
+                *watchlists.set_index('watchlist_id').loc[w, ['nome', 'jogadores', 'pendentes']]
+            ),
+            index=None,
+            placeholder="Escolha ou crie uma watchlist...",
+            key="watchlist_selecionada"
+        )
+
+        if watchlist_id is not None:
+            # Jogadores com ID no snapshot mais recente, restritos pelos filtros da sidebar
+            membros = read_watchlist_players(conn_leitura, watchlist_id)
+            candidatos = df_filtered[
+                (df_filtered['data_snapshot'] == df_players['data_snapshot'].max()) & df_filtered['player_id'].notna()
+            ].head(2000)
+            rotulos = dict(zip(membros['player_id'], membros['nome'].fillna('(fora do export)') + " - " + membros['clube'].fillna('')))
+            rotulos.update(zip(candidatos['player_id'].astype('int64'), candidatos['nome'] + " - " + candidatos['clube']))
+            if not rotulos:
+                st.caption("Nenhum jogador com 'ID Único' nos filtros atuais: só jogadores com ID podem ser acompanhados entre snapshots.")
+            selecionados = st.multiselect(
+                "Jogadores (use os filtros da sidebar para encontrar outros)",
+                options=list(rotulos),
+                default=membros['player_id'].tolist(),
+                format_func=rotulos.get,
+                key=f"membros_watchlist_{watchlist_id}"
+            )
+            col_b1, col_b2 = st.columns(2)
+            if col_b1.button("Salvar jogadores", key="salvar_watchlist"):
+                with closing(connect_watchlists(DB_PATH)) as conn_escrita, conn_escrita:
+                    set_watchlist_players(conn_escrita, watchlist_id, selecionados)
+                st.rerun()
+            if col_b2.button("Excluir watchlist", key="excluir_watchlist"):
+                with closing(connect_watchlists(DB_PATH)) as conn_escrita, conn_escrita:
+                    delete_watchlist(conn_escrita, watchlist_id)
+                st.rerun()
+
+        st.markdown("#### Regras de alerta")
+        regras = read_alert_rules(conn_leitura)
+        if not regras.empty:
+            regras['regra'] = regras['tipo'].map(lambda t: REGRAS_ALERTA.get(t, (t,))[0])
+            regras['watchlist'] = regras['watchlist'].fillna('Todas')
+            st.dataframe(
+                regras, column_order=['rule_id', 'watchlist', 'regra', 'limiar'],
+                column_config={"rule_id": "Regra", "watchlist": "Watchlist", "regra": "Condição", "limiar": "N"},
+                hide_index=True
+            )
+        with st.form("form_regra"):
+            col_r1, col_r2, col_r3 = st.columns(3)
+            tipo_regra = col_r1.selectbox("Condição", options=list(REGRAS_ALERTA), format_func=lambda t: REGRAS_ALERTA[t][0])
+            limiar_regra = col_r2.number_input("N (pontos ou %)", min_value=0.0, value=2.0, step=0.5)
+            escopo_regra = col_r3.selectbox(
+                "Vale para", options=[None] + watchlists['watchlist_id'].tolist(),
+                format_func=lambda w: "Todas as watchlists" if w is None else watchlists.set_index('watchlist_id').loc[w, 'nome']
+            )
+            if st.form_submit_button("Adicionar regra"):
+                with closing(connect_watchlists(DB_PATH)) as conn_escrita, conn_escrita:
+                    add_rule(conn_escrita, tipo_regra, limiar_regra, escopo_regra)
+                st.rerun()
+        if not regras.empty:
+            col_d1, col_d2 = st.columns([2, 1])
+            regra_remover = col_d1.selectbox("Remover regra", options=regras['rule_id'].tolist(), index=None, key="regra_remover")
+            if col_d2.button("Remover", key="remover_regra", disabled=regra_remover is None):
+                with closing(connect_watchlists(DB_PATH)) as conn_escrita, conn_escrita:
+                    delete_rule(conn_escrita, regra_remover)
+                st.rerun()
+    perf.checkpoint('aba_alertas')
+
+    # Aba 5: Jogadores Similares
+    with tab_similares:
+        st.subheader("Encontre alternativas parecidas com um jogador")
+        st.markdown("Compara idade, qualidade atual, potencial, valor e salário (padronizados) e a sobreposição de posições/funções, no snapshot mais recente.")
+
+        ultimo_snapshot = df_players['data_snapshot'].max()
+        indice_similares = get_similarity_index(ultimo_snapshot)
+        df_ultimo = indice_similares.df
+
+        # Opções: jogadores do snapshot mais recente que passam nos filtros da sidebar
+        opcoes_similares = df_ultimo.index[df_ultimo.index.isin(df_filtered.index)]
+        jogador_base = st.selectbox(
+            "Jogador de referência:",
+            options=opcoes_similares,
+            index=None,
+            format_func=lambda i: f"{df_ultimo.at[i, 'nome']} ({df_ultimo.at[i, 'clube']}, {df_ultimo.at[i, 'idade']})",
+            placeholder="Escolha um jogador...",
+            key="jogador_similar"
+        )
+
+        col_s1, col_s2, col_s3 = st.columns(3)
+        k_similares = col_s1.slider("Quantidade de resultados", 5, 50, 10, key="k_similares")
+        so_mais_baratos = col_s2.checkbox("Apenas mais baratos", key="similar_barato")
+        so_mais_jovens = col_s3.checkbox("Apenas mais jovens", key="similar_jovem")
+
+        if jogador_base is not None:
+            df_similares = indice_similares.query(
+                indice_similares.position_of(jogador_base),
+                k=k_similares,
+                mais_barato=so_mais_baratos,
+                mais_jovem=so_mais_jovens
+            )
+            st.dataframe(
+                df_similares,
+                column_order=[
+                    'nome', 'clube', 'idade', 'posicao', 'sufixo_atual', 'classificacao_atual',
+                    'classificacao_potencial', 'valor', 'salario', 'distancia'
+                ],
+                column_config={
+                    "valor": st.column_config.NumberColumn("Valor de Mercado", format="€ %d"),
+                    "salario": st.column_config.NumberColumn("Salário", format="€ %d"),
+                    "distancia": st.column_config.NumberColumn(
+                        "Distância",
+                        help="Quanto menor, mais parecido com o jogador de referência",
+                        format="%.3f"
+                    )
+                }
+            )
+    perf.checkpoint('aba_similares')
+
+    # Aba 6: Montar Elenco
+    with tab_elenco:
+        st.subheader("Monte o melhor time dentro do orçamento")
+        st.markdown("Escolhe, entre os jogadores filtrados no snapshot mais recente, o time titular com a maior soma de classificação que cabe nos orçamentos de transferência e de salários.")
+
+        with st.form("form_elenco"):
+            col_e1, col_e2 = st.columns(2)
+            formacao = col_e1.selectbox("Formação:", options=list(FORMACOES), key="formacao_elenco")
+            objetivo = col_e2.selectbox(
+                "Maximizar:",
+                options=['classificacao_atual', 'classificacao_potencial'],
+                format_func=lambda c: "Qualidade atual" if c == 'classificacao_atual' else "Potencial",
+                key="objetivo_elenco"
+            )
+            col_e3, col_e4 = st.columns(2)
+            orcamento = col_e3.number_input("Orçamento de transferências (€):", min_value=0, value=50_000_000, step=1_000_000, key="orcamento_elenco")
+            orcamento_salarial = col_e4.number_input("Orçamento de salários (€):", min_value=0, value=500_000, step=10_000, key="orcamento_salarial_elenco")
+            montar = st.form_submit_button("Montar elenco")
+
+        if montar:
+            # Só o snapshot mais recente: versões antigas de quem os filtros tiram dele não entram no elenco
+            df_elenco_base = df_filtered[df_filtered['data_snapshot'] == df_players['data_snapshot'].max()]
+            if df_elenco_base.empty:
+                st.warning("Nenhum jogador encontrado com os filtros atuais.")
+            else:
+                try:
+                    elenco, info = build_squad(df_elenco_base, FORMACOES[formacao], orcamento, orcamento_salarial, objetivo=objetivo)
+                except ValueError as erro:
+                    st.warning(str(erro))
+                else:
+                    if elenco.empty:
+                        st.warning("Nenhum time cabe nesses orçamentos.")
+                    else:
+                        col_r1, col_r2, col_r3 = st.columns(3)
+                        col_r1.metric("Soma das classificações", f"{info['total']:.0f}")
+                        col_r2.metric("Custo total", f"€ {elenco['valor'].sum():,.0f}")
+                        col_r3.metric("Salários", f"€ {elenco['salario'].sum():,.0f}")
+                        if info['otimo']:
+                            st.success(f"Melhor time possível ({info['candidatos']} candidatos, {info['tempo']:.2f}s).")
+                        else:
+                            st.info(f"Melhor time encontrado no tempo limite; nenhum time passa de {info['limite_superior']:.0f} ({info['candidatos']} candidatos).")
+                        st.dataframe(
+                            elenco,
+                            column_order=[
+                                'vaga', 'nome', 'clube', 'idade', 'posicao', 'classificacao_atual',
+                                'classificacao_potencial', 'valor', 'salario'
+                            ],
+                            column_config={
+                                "vaga": "Vaga",
+                                "valor": st.column_config.NumberColumn("Valor de Mercado", format="€ %d"),
+                                "salario": st.column_config.NumberColumn("Salário", format="€ %d")
+                            },
+                            hide_index=True
+                        )
+    perf.checkpoint('aba_elenco')
+
+    # Aba 7: Legendas
     with tab_legenda:
         st.subheader("Legendas")
         st.markdown("Aqui você encontra a explicação dos termos e abreviações usados no dashboard.")
@@ -1221,8 +1947,14 @@ try:
                     st.markdown("**Resumo Avançado de Refêrencia 'Pivô':**")
                     st.markdown("* Ótimo para padrões de ataque simples e diretos.")
                     st.markdown("* Pode ser o alvo de cruzamentos e bolas longas dos zagueiros.")
-                    st.markdown("* Combina bem com um Segundo Atacante (SS) ou Matador (PLF).") 
-    
+                    st.markdown("* Combina bem com um Segundo Atacante (SS) ou Matador (PLF).")
+    perf.checkpoint('aba_legendas')
+
 except Exception as e:
     st.error(f"Erro ao carregar os dados: {e}")
     st.exception(e)
+
+# Fecha as medições do rerun (grava a linha JSON, se configurado) e mostra o painel
+registro_perf = perf.finish('outros', cache=CACHE_STATS.rerun_counts())
+if mostrar_desempenho and registro_perf is not None:
+    perf_panel(perf, registro_perf)
@@ -0,0 +1,98 @@
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.analysis.aggregations import BACKENDS, AggregationEngine, _duckdb
+from src.database.columnar import write_columnar
+from src.database.database import DB_PATH
+
+# Histórico do banco replicado em 'snapshots' snapshots (com ruído nas notas e valores),
+# simulando um save acompanhado por muitas temporadas.
+def carregar_historico(snapshots: int, semente: int = 0) -> pd.DataFrame:
+    conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True)
+    df = pd.read_sql_query(
+        "SELECT nome, pais, clube, idade, valor, classificacao_atual, classificacao_potencial, faixa_etaria "
+        "FROM players WHERE data_snapshot = (SELECT MAX(data_snapshot) FROM players)",
+        conn
+    )
+    conn.close()
+    rng = np.random.default_rng(semente)
+    partes = []
+    for i in range(snapshots):
+        parte = df.copy()
+        parte['data_snapshot'] = pd.Timestamp('2023-07-01') + pd.DateOffset(months=6 * i)
+        parte['idade'] = parte['idade'] + i // 2
+        parte['classificacao_atual'] = (parte['classificacao_atual'] + rng.normal(0, 1, len(parte))).round(1)
+        parte['valor'] = parte['valor'] * rng.uniform(0.8, 1.2, len(parte))
+        partes.append(parte)
+    return pd.concat(partes, ignore_index=True)
+
+# Publica o histórico num banco temporário, com a cópia colunar que o backend DuckDB lê.
+def publicar_historico(df: pd.DataFrame, db_path: str) -> None:
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    with sqlite3.connect(db_path) as conn:
+        df.to_sql('players', conn, index=False)
+    conn.close()
+    write_columnar(db_path)
+
+# Melhor tempo (em ms) de 'repeticoes' execuções.
+def cronometrar(funcao, repeticoes: int) -> float:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return min(tempos)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark das agregações do dashboard (pandas x DuckDB).")
+    parser.add_argument('--snapshots', type=int, nargs='+', default=[1, 10, 40])
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+
+    backends = [b for b in BACKENDS if b != 'duckdb' or _duckdb() is not None]
+    if 'duckdb' not in backends:
+        print("DuckDB não instalado (pip install duckdb): medindo só o pandas.")
+
+    # Consultas sobre o histórico inteiro e sobre um recorte típico da sidebar (jogadores até 23 anos).
+    # Os recortes rodam no pandas nos dois backends; só o histórico inteiro vai para o DuckDB.
+    consultas = {
+        'clubes': lambda m, f: m.club_potential(f, 3),
+        'países': lambda m, f: m.country_counts(f, 80.0, 21),
+        'histórico/clube': lambda m, f: m.snapshot_summary('clube', f),
+        'histórico/faixa': lambda m, f: m.snapshot_summary('faixa_etaria', f),
+    }
+
+    print(f"{'snapshots':>9} {'linhas':>10} {'consulta':>16} {'recorte':>8} "
+          + " ".join(f"{b + ' ms':>11}" for b in backends))
+    banco = os.path.join(tempfile.gettempdir(), 'fm_bench_aggregations.db')
+    for snapshots in args.snapshots:
+        df = carregar_historico(snapshots)
+        df['data_snapshot'] = df['data_snapshot'].astype(str)
+        publicar_historico(df, banco)
+        recorte = df[df['idade'] <= 23]
+        motores = {}
+        for backend in backends:
+            inicio = time.perf_counter()
+            motores[backend] = AggregationEngine(df, backend, db_path=banco)
+            print(f"{snapshots:>9} {len(df):>10} {'(preparo)':>16} {'-':>8} "
+                  f"{(time.perf_counter() - inicio) * 1000:>11.1f}  [{backend}]")
+        for nome, consulta in consultas.items():
+            for rotulo, filtro in (('todos', None), ('sub-23', recorte)):
+                tempos = [cronometrar(lambda: consulta(motores[b], filtro), args.repeticoes) for b in backends]
+                print(f"{snapshots:>9} {len(df):>10} {nome:>16} {rotulo:>8} "
+                      + " ".join(f"{t:>11.1f}" for t in tempos))
+        for motor in motores.values():
+            motor.close()
+
+if __name__ == '__main__':
+    main()
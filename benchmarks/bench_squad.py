@@ -0,0 +1,50 @@
+import argparse
+import sqlite3
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.analysis.squad import build_squad, FORMACOES
+from src.database.database import DB_PATH
+
+# Cenários de orçamento (transferências, salários)
+ORCAMENTOS = [(1_000_000, 5_000), (5_000_000, 50_000), (50_000_000, 500_000), (500_000_000, 2_000_000)]
+
+# Snapshot mais recente do banco, reamostrado até 'tamanho' jogadores (com ruído nas notas e valores).
+def carregar_pool(tamanho: int, semente: int = 0) -> pd.DataFrame:
+    conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True)
+    df = pd.read_sql_query(
+        "SELECT nome, posicao, valor, salario, classificacao_atual, classificacao_potencial "
+        "FROM players WHERE data_snapshot = (SELECT MAX(data_snapshot) FROM players)",
+        conn
+    )
+    conn.close()
+    rng = np.random.default_rng(semente)
+    pool = df.sample(tamanho, replace=tamanho > len(df), random_state=semente).reset_index(drop=True)
+    pool['valor'] = pool['valor'] * rng.uniform(0.8, 1.2, len(pool))
+    pool['salario'] = pool['salario'] * rng.uniform(0.8, 1.2, len(pool))
+    pool['classificacao_atual'] = (pool['classificacao_atual'] + rng.normal(0, 1, len(pool))).round(1)
+    return pool
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark do montador de elenco.")
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[20_000, 50_000])
+    parser.add_argument('--limite-tempo', type=float, default=2.0)
+    args = parser.parse_args()
+
+    print(f"{'pool':>7} {'formação':>8} {'orçamento':>12} {'salários':>10} {'cand.':>6} {'nós':>7} "
+          f"{'tempo':>6} {'total':>7} {'limite':>7} {'ótimo':>6}")
+    for tamanho in args.tamanhos:
+        pool = carregar_pool(tamanho)
+        for orcamento, orcamento_salarial in ORCAMENTOS:
+            for formacao, vagas in FORMACOES.items():
+                elenco, info = build_squad(pool, vagas, orcamento, orcamento_salarial, limite_tempo=args.limite_tempo)
+                print(f"{tamanho:>7} {formacao:>8} {orcamento:>12,} {orcamento_salarial:>10,} {info['candidatos']:>6} "
+                      f"{info['nos']:>7} {info['tempo']:>6.2f} {info.get('total', float('nan')):>7.1f} "
+                      f"{info['limite_superior']:>7.1f} {str(info['otimo']):>6}")
+
+if __name__ == '__main__':
+    main()
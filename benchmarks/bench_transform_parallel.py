@@ -0,0 +1,66 @@
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.extract.extract import extract_data
+from src.runner.runner import DATA_PATH
+from src.transform.transform import transform_data
+
+# Melhor tempo (em s) de 'repeticoes' transformações; retorna também o último resultado.
+def cronometrar(df: pd.DataFrame, workers: int, repeticoes: int, backend: str = 'pandas') -> tuple:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = transform_data(df, backend=backend, workers=workers)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), resultado
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark da transformação em paralelo (partições em processos) contra a serial."
+    )
+    parser.add_argument('--csv', default=DATA_PATH)
+    parser.add_argument('--copias', type=int, default=10, help="Vezes que o export é replicado")
+    parser.add_argument('--workers', type=int, nargs='+', default=None,
+                        help="Números de processos (padrão: 2, 4, ... até o número de núcleos)")
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+
+    nucleos = os.cpu_count() or 1
+    workers = args.workers or sorted({w for w in (2, 4, 8, 16, 32, nucleos) if 1 < w <= nucleos}) or [2]
+    if max(workers) > nucleos:
+        print(f"Aviso: só {nucleos} núcleo(s) disponível(is); com mais processos que núcleos não há ganho.")
+
+    bruto = extract_data(args.csv)
+    df = pd.concat([bruto] * args.copias, ignore_index=True)
+    print(f"\n{len(df)} linhas brutas, {nucleos} núcleo(s)\n")
+
+    serial, esperado = cronometrar(df, None, args.repeticoes)
+    esperado = esperado.drop(columns='data_snapshot')
+    linhas = [('serial', serial, True)]
+    for n in workers:
+        tempo, resultado = cronometrar(df, n, args.repeticoes)
+        igual = resultado.drop(columns='data_snapshot').equals(esperado)
+        linhas.append((f"{n} processos", tempo, igual))
+    # Referência: o Polars (multithread, backend padrão do pipeline quando instalado)
+    try:
+        import polars  # noqa: F401
+        tempo_polars, resultado = cronometrar(df, None, args.repeticoes, backend='polars')
+        polars_igual = resultado.drop(columns='data_snapshot').equals(esperado)
+    except ImportError:
+        tempo_polars = None
+
+    print(f"\n{'modo':>12} {'tempo s':>9} {'speedup':>8} {'eficiência':>11} {'igual ao serial':>16}")
+    for (modo, tempo, igual), n in zip(linhas, [1] + workers):
+        speedup = serial / tempo
+        print(f"{modo:>12} {tempo:>9.2f} {speedup:>7.2f}x {speedup / n:>10.0%} {'sim' if igual else 'NÃO':>16}")
+    if tempo_polars is not None:
+        print(f"{'polars':>12} {tempo_polars:>9.2f} {serial / tempo_polars:>7.2f}x {'-':>11} {'sim' if polars_igual else 'NÃO':>16}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+import argparse
+import http.client
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.api.api import APIServer
+
+# Mistura de consultas típicas das ferramentas internas
+CONSULTAS = [
+    '/players?limit=50',
+    '/players?limit=50&ordem=valor&sentido=asc',
+    '/players?limit=100&faixa_etaria=Sub-21&percentil_min=90',
+    '/players?limit=50&posicao=PL&idade_max=23',
+    '/players?limit=50&nome=silva',
+    '/top?coluna=classificacao_atual&n=5&por=faixa_etaria',
+    '/top?coluna=pct_potencial&n=10',
+    '/snapshots',
+]
+
+# Um cliente: faz 'n' requisições sequenciais e guarda a latência de cada uma (em ms).
+def cliente(host: str, porta: int, n: int, revalidar: bool, latencias: list, erros: list, semente: int) -> None:
+    rng = random.Random(semente)
+    etags = {}
+    for _ in range(n):
+        caminho = rng.choice(CONSULTAS)
+        cabecalhos = {'Accept-Encoding': 'gzip'}
+        if revalidar and caminho in etags:
+            cabecalhos['If-None-Match'] = etags[caminho]
+        inicio = time.perf_counter()
+        try:
+            conn = http.client.HTTPConnection(host, porta, timeout=30)
+            conn.request('GET', caminho, headers=cabecalhos)
+            resposta = conn.getresponse()
+            resposta.read()
+            conn.close()
+        except OSError as e:
+            erros.append(str(e))
+            continue
+        latencias.append((time.perf_counter() - inicio) * 1000)
+        if resposta.status not in (200, 304):
+            erros.append(f"{caminho}: HTTP {resposta.status}")
+        elif resposta.getheader('ETag'):
+            etags[caminho] = resposta.getheader('ETag')
+
+# Roda 'clientes' threads em paralelo e imprime p50/p99 e vazão.
+def rodada(host: str, porta: int, clientes: int, requisicoes: int, revalidar: bool) -> None:
+    latencias, erros = [], []
+    threads = [
+        threading.Thread(target=cliente, args=(host, porta, requisicoes, revalidar, latencias, erros, i))
+        for i in range(clientes)
+    ]
+    inicio = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    duracao = time.perf_counter() - inicio
+
+    lat = np.array(latencias)
+    print(f"{clientes:>8} {'sim' if revalidar else 'não':>10} {len(lat):>7} {len(erros):>6} "
+          f"{np.percentile(lat, 50):>8.1f} {np.percentile(lat, 99):>8.1f} {len(lat) / duracao:>8.0f}")
+    for erro in erros[:3]:
+        print(f"  erro: {erro}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Teste de carga da API de jogadores.")
+    parser.add_argument('--url', default=None, help="API já em execução (padrão: sobe uma local, em thread)")
+    parser.add_argument('--clientes', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--requisicoes', type=int, default=100, help="Requisições por cliente")
+    parser.add_argument('--workers', type=int, default=16)
+    args = parser.parse_args()
+
+    servidor = None
+    if args.url:
+        partes = urlsplit(args.url)
+        host, porta = partes.hostname, partes.port or 80
+    else:
+        servidor = APIServer(('127.0.0.1', 0), workers=args.workers)
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        host, porta = servidor.server_address
+
+    print(f"{'clientes':>8} {'revalida':>10} {'req':>7} {'erros':>6} {'p50 ms':>8} {'p99 ms':>8} {'req/s':>8}")
+    try:
+        for clientes in args.clientes:
+            for revalidar in (False, True):
+                rodada(host, porta, clientes, args.requisicoes, revalidar)
+    finally:
+        if servidor is not None:
+            servidor.shutdown()
+            servidor.server_close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,342 @@
+import argparse
+import asyncio
+import os
+import random
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RAIZ))
+from src.load.load import load_data
+
+APP_PATH = str(RAIZ / 'app.py')
+BANCO_REAL = RAIZ / 'database' / 'fm_database.db'
+BANCO_SINTETICO = os.path.join(tempfile.gettempdir(), 'fm_load_test.db')
+
+# Interações de um scout e o peso de cada uma no sorteio da sequência
+INTERACOES = {
+    'busca_nome': 3,
+    'posicao': 2,
+    'clube': 2,
+    'idade': 2,
+    'potencial': 1,
+    'aba_talentos': 1,
+    'aba_brutos': 1,
+    'jogador': 2,
+    'proxima_pagina': 2,
+    'limpar_filtros': 1,
+}
+
+# Tipos de widget acompanhados pelo cliente
+TIPOS_WIDGET = ('text_input', 'multiselect', 'slider', 'selectbox', 'button')
+
+# Banco sintético: o snapshot mais recente do banco real reamostrado até 'jogadores' jogadores
+# e evoluído por 'snapshots' snapshots (idade, notas e valores mudam a cada um).
+def build_synthetic_db(db_path: str, jogadores: int, snapshots: int, semente: int = 0) -> None:
+    conn = sqlite3.connect(f"file:{BANCO_REAL}?mode=ro", uri=True)
+    base = pd.read_sql_query(
+        "SELECT nome, pais, posicao, clube, idade, salario, valor, classificacao_atual, "
+        "classificacao_potencial, sufixo_atual, sufixo_potencial FROM players "
+        "WHERE data_snapshot = (SELECT MAX(data_snapshot) FROM players)",
+        conn
+    )
+    conn.close()
+
+    rng = np.random.default_rng(semente)
+    df = base.sample(jogadores, replace=jogadores > len(base), random_state=semente).reset_index(drop=True)
+    copia = df.index // len(base)
+    df['nome'] = df['nome'].where(copia == 0, df['nome'] + ' ' + copia.astype(str))
+    df['id_unico'] = np.arange(1, len(df) + 1, dtype='int64')
+
+    inicio = pd.Timestamp('2023-07-01')
+    for i in range(snapshots):
+        if i > 0:
+            df['classificacao_atual'] = (df['classificacao_atual'] + rng.normal(0.5, 1.0, len(df))).clip(0, 100).round(1)
+            df['valor'] = (df['valor'] * rng.uniform(0.9, 1.3, len(df))).round(-3)
+            df['idade'] = df['idade'] + (i % 2)
+        df['data_snapshot'] = inicio + pd.DateOffset(months=6 * i)
+        load_data(df, db_path, 'players')
+
+# Memória residente de um processo em MB (Linux; None se indisponível).
+def rss_mb(pid: int):
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for linha in f:
+                if linha.startswith('VmRSS:'):
+                    return int(linha.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+# Cliente mínimo do protocolo do Streamlit (websocket + protobuf), fazendo o papel do navegador:
+# envia o estado dos widgets a cada rerun e lê as mensagens até o fim da execução do script.
+class StreamlitSession:
+    def __init__(self, url_ws: str, timeout: float):
+        self.url_ws = url_ws
+        self.timeout = timeout
+        self.widgets = {}   # id -> (tipo, proto do widget) da última execução
+        self.estados = {}   # id -> WidgetState enviado nos próximos reruns
+        self.erros = []
+        self._ws = None
+        self._pagina = ''
+
+    async def connect(self) -> None:
+        from tornado.httpclient import HTTPRequest
+        from tornado.websocket import websocket_connect
+        requisicao = HTTPRequest(self.url_ws, headers={'Sec-WebSocket-Protocol': 'streamlit'})
+        self._ws = await websocket_connect(requisicao, max_message_size=512 * 1024 * 1024)
+
+    def close(self) -> None:
+        if self._ws is not None:
+            self._ws.close()
+
+    # Executa o script com o estado atual dos widgets; retorna a latência em ms.
+    async def rerun(self) -> float:
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        mensagem = BackMsg()
+        mensagem.rerun_script.page_script_hash = self._pagina
+        mensagem.rerun_script.widget_states.widgets.extend(self.estados.values())
+        inicio = time.perf_counter()
+        await self._ws.write_message(mensagem.SerializeToString(), binary=True)
+
+        vistos = {}
+        while True:
+            dados = await asyncio.wait_for(self._ws.read_message(), self.timeout)
+            if dados is None:
+                raise ConnectionError("O servidor fechou a conexão.")
+            resposta = ForwardMsg()
+            resposta.ParseFromString(dados)
+            tipo = resposta.WhichOneof('type')
+            if tipo == 'new_session':
+                self._pagina = resposta.new_session.page_script_hash
+            elif tipo == 'delta' and resposta.delta.WhichOneof('type') == 'new_element':
+                elemento = resposta.delta.new_element
+                tipo_elemento = elemento.WhichOneof('type')
+                if tipo_elemento in TIPOS_WIDGET:
+                    widget = getattr(elemento, tipo_elemento)
+                    vistos[widget.id] = (tipo_elemento, widget)
+                elif tipo_elemento == 'exception' and not elemento.exception.is_warning:
+                    self.erros.append(elemento.exception.message)
+            elif tipo == 'script_finished' and resposta.script_finished in (
+                ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_WITH_COMPILE_ERROR
+            ):
+                break
+        latencia = (time.perf_counter() - inicio) * 1000
+
+        # Widgets que sumiram (ou mudaram de id) e gatilhos de botão já consumidos saem do estado
+        self.widgets = vistos
+        self.estados = {
+            i: estado for i, estado in self.estados.items()
+            if i in vistos and estado.WhichOneof('value') != 'trigger_value'
+        }
+        return latencia
+
+    def widget(self, tipo: str, rotulo: str = None, chave: str = None):
+        for id_widget, (tipo_widget, widget) in self.widgets.items():
+            if tipo_widget != tipo:
+                continue
+            if (chave is not None and id_widget.endswith(f'-{chave}')) or (rotulo is not None and widget.label == rotulo):
+                return widget
+        return None
+
+    def set_value(self, tipo: str, widget, valor) -> None:
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+        estado = WidgetState(id=widget.id)
+        if tipo in ('text_input', 'selectbox'):
+            estado.string_value = valor
+        elif tipo == 'multiselect':
+            estado.string_array_value.data.extend(valor)
+        elif tipo == 'slider':
+            estado.double_array_value.data.extend(valor)
+        elif tipo == 'button':
+            estado.trigger_value = True
+        self.estados[widget.id] = estado
+
+# Prepara uma interação (sem rodar). Retorna False se ela não se aplica ao estado atual da página.
+def aplicar(sessao: StreamlitSession, interacao: str, rng: random.Random) -> bool:
+    if interacao == 'busca_nome':
+        nomes = sessao.widget('multiselect', rotulo="Selecione jogadores para comparar:")
+        base = rng.choice(list(nomes.options)) if nomes is not None and nomes.options else 'silva'
+        campo = sessao.widget('text_input', rotulo="Buscar por Nome")
+        sessao.set_value('text_input', campo, base[:rng.randint(3, 5)])
+    elif interacao in ('posicao', 'clube'):
+        rotulo = "Posição (posicao)" if interacao == 'posicao' else "Clube (clube)"
+        campo = sessao.widget('multiselect', rotulo=rotulo)
+        opcoes = list(campo.options)
+        sessao.set_value('multiselect', campo, rng.sample(opcoes, k=min(rng.randint(1, 3), len(opcoes))))
+    elif interacao in ('idade', 'potencial'):
+        rotulo = "Idade (idade)" if interacao == 'idade' else "Potencial (classificacao_potencial)"
+        campo = sessao.widget('slider', rotulo=rotulo)
+        a, b = sorted(rng.uniform(campo.min, campo.max) for _ in range(2))
+        inteiro = interacao == 'idade'
+        sessao.set_value('slider', campo, [float(int(a)), float(int(b))] if inteiro else [round(a, 1), round(b, 1)])
+    elif interacao == 'aba_talentos':
+        # select_slider: o valor enviado é o índice da opção
+        campo = sessao.widget('slider', chave="pot_wk")
+        sessao.set_value('slider', campo, [float(rng.randrange(len(campo.options)))])
+    elif interacao == 'aba_brutos':
+        sessao.set_value('slider', sessao.widget('slider', chave="idade_brutos"), [float(rng.randint(15, 25))])
+    elif interacao == 'jogador':
+        # Comparação: acrescenta um jogador aos já selecionados (os outros vêm do cache de séries)
+        campo = sessao.widget('multiselect', rotulo="Selecione jogadores para comparar:")
+        if campo is None or not campo.options:
+            return False
+        atuais = list(sessao.estados[campo.id].string_array_value.data) if campo.id in sessao.estados else []
+        if campo.max_selections and len(atuais) >= campo.max_selections:
+            atuais = atuais[1:]
+        sessao.set_value('multiselect', campo, atuais + [rng.choice(list(campo.options))])
+    elif interacao == 'proxima_pagina':
+        botao = sessao.widget('button', chave="pagina_proxima")
+        if botao is None or botao.disabled:
+            return False
+        sessao.set_value('button', botao, True)
+    elif interacao == 'limpar_filtros':
+        sessao.set_value('text_input', sessao.widget('text_input', rotulo="Buscar por Nome"), "")
+        for rotulo in ("Posição (posicao)", "Clube (clube)"):
+            sessao.set_value('multiselect', sessao.widget('multiselect', rotulo=rotulo), [])
+    return True
+
+# Uma sessão de scout: carga inicial + 'n_interacoes' interações sorteadas, com pausas entre elas.
+async def simular_sessao(url_ws: str, n_interacoes: int, pausa: float, semente: int, timeout: float,
+                         tempos: list, erros: list) -> None:
+    rng = random.Random(semente)
+    sessao = StreamlitSession(url_ws, timeout)
+    try:
+        await sessao.connect()
+        tempos.append(('carga_inicial', await sessao.rerun()))
+        nomes, pesos = list(INTERACOES), list(INTERACOES.values())
+        for _ in range(n_interacoes):
+            await asyncio.sleep(rng.uniform(0, 2 * pausa))
+            interacao = rng.choices(nomes, pesos)[0]
+            if aplicar(sessao, interacao, rng):
+                tempos.append((interacao, await sessao.rerun()))
+    except Exception as e:
+        erros.append(f"{type(e).__name__}: {e}")
+    finally:
+        erros.extend(sessao.erros)
+        sessao.close()
+
+# Amostra o RSS do servidor enquanto a rodada roda e guarda o pico.
+async def monitorar_rss(pid: int, picos: list, intervalo: float = 0.1) -> None:
+    while True:
+        rss = rss_mb(pid)
+        if rss is not None:
+            picos.append(rss)
+        await asyncio.sleep(intervalo)
+
+# Roda 'sessoes' sessões simultâneas e imprime p50/p95/p99 por interação e o RSS do servidor.
+async def rodada(url_ws: str, pid: int, sessoes: int, args) -> None:
+    tempos, erros, amostras_rss = [], [], []
+    rss_inicio = rss_mb(pid) if pid else None
+    monitor = asyncio.ensure_future(monitorar_rss(pid, amostras_rss)) if pid else None
+    inicio = time.perf_counter()
+    await asyncio.gather(*(
+        simular_sessao(url_ws, args.interacoes, args.pausa, args.semente + i, args.timeout, tempos, erros)
+        for i in range(sessoes)
+    ))
+    duracao = time.perf_counter() - inicio
+    if monitor is not None:
+        monitor.cancel()
+
+    rss = "RSS do servidor indisponível"
+    if rss_inicio is not None and amostras_rss:
+        rss = f"RSS do servidor {rss_inicio:.0f} MB -> pico {max(amostras_rss):.0f} MB"
+    print(f"\n{sessoes} sessões, {len(tempos)} reruns em {duracao:.1f}s | {rss} | erros: {len(erros)}")
+    print(f"  {'interação':<16} {'n':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    df = pd.DataFrame(tempos, columns=['interacao', 'ms'])
+    grupos = [('carga_inicial', df[df['interacao'] == 'carga_inicial'])]
+    grupos += [(i, df[df['interacao'] == i]) for i in INTERACOES]
+    grupos += [('(interações)', df[df['interacao'] != 'carga_inicial'])]
+    for nome, grupo in grupos:
+        if len(grupo):
+            p50, p95, p99 = grupo['ms'].quantile([0.5, 0.95, 0.99])
+            print(f"  {nome:<16} {len(grupo):>5} {p50:>9.0f} {p95:>9.0f} {p99:>9.0f}")
+    for erro in erros[:3]:
+        print(f"  erro: {erro}")
+
+def _porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+# Sobe 'streamlit run app.py' apontando para o banco informado e espera o servidor responder.
+def iniciar_servidor(db_path: str, porta: int) -> subprocess.Popen:
+    comando = [
+        sys.executable, '-m', 'streamlit', 'run', APP_PATH,
+        '--server.headless', 'true', '--server.port', str(porta), '--server.address', '127.0.0.1',
+        '--server.fileWatcherType', 'none', '--browser.gatherUsageStats', 'false',
+    ]
+    log = open(os.path.join(tempfile.gettempdir(), 'fm_load_test_server.log'), 'w')
+    servidor = subprocess.Popen(comando, env={**os.environ, 'FM_DB_PATH': db_path}, stdout=log, stderr=subprocess.STDOUT,
+                                cwd=str(RAIZ))
+    limite = time.time() + 60
+    while time.time() < limite:
+        if servidor.poll() is not None:
+            raise RuntimeError(f"O servidor terminou com código {servidor.returncode} (veja {log.name}).")
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{porta}/_stcore/health', timeout=1) as resposta:
+                if resposta.status == 200:
+                    return servidor
+        except OSError:
+            time.sleep(0.2)
+    servidor.terminate()
+    raise TimeoutError("O servidor do Streamlit não respondeu em 60s.")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Teste de carga do dashboard: sessões simultâneas (cliente websocket do Streamlit) "
+                    "sobre um banco sintético."
+    )
+    parser.add_argument('--db', default=BANCO_SINTETICO, help="Banco sintético (criado se não existir)")
+    parser.add_argument('--jogadores', type=int, default=100_000, help="Jogadores por snapshot no banco sintético")
+    parser.add_argument('--snapshots', type=int, default=4)
+    parser.add_argument('--recriar', action='store_true', help="Recria o banco sintético mesmo se já existir")
+    parser.add_argument('--url', default=None, help="Servidor já em execução (ex: http://localhost:8501)")
+    parser.add_argument('--pid', type=int, default=None, help="PID do servidor externo, para medir o RSS")
+    parser.add_argument('--sessoes', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--interacoes', type=int, default=15, help="Interações por sessão")
+    parser.add_argument('--pausa', type=float, default=0.5, help="Pausa média entre interações (s)")
+    parser.add_argument('--timeout', type=float, default=300.0, help="Tempo máximo de um rerun (s)")
+    parser.add_argument('--semente', type=int, default=0)
+    args = parser.parse_args()
+
+    servidor = None
+    if args.url:
+        url, pid = args.url.rstrip('/'), args.pid
+    else:
+        if args.recriar or not os.path.exists(args.db):
+            for arquivo in (args.db, os.path.splitext(args.db)[0] + '.arrow'):
+                if os.path.exists(arquivo):
+                    os.remove(arquivo)
+            inicio = time.perf_counter()
+            build_synthetic_db(args.db, args.jogadores, args.snapshots, args.semente)
+            print(f"Banco sintético criado em {time.perf_counter() - inicio:.0f}s: {args.db}")
+        with sqlite3.connect(args.db) as conn:
+            print(f"Banco: {args.db} ({conn.execute('SELECT COUNT(*) FROM players').fetchone()[0]} linhas na view)")
+        porta = _porta_livre()
+        servidor = iniciar_servidor(args.db, porta)
+        url, pid = f'http://127.0.0.1:{porta}', servidor.pid
+    url_ws = url.replace('http', 'ws', 1) + '/_stcore/stream'
+
+    try:
+        # A primeira rodada também aquece os caches compartilhados (cache_resource), como num servidor real
+        for sessoes in args.sessoes:
+            asyncio.run(rodada(url_ws, pid, sessoes, args))
+    finally:
+        if servidor is not None:
+            servidor.terminate()
+            servidor.wait(timeout=30)
+
+if __name__ == '__main__':
+    main()
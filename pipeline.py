@@ -2,7 +2,9 @@ import sys
 import os
 from src.extract.extract import extract_data
 from src.transform.transform import transform_data
+from src.validate.validate import validate_data, ValidationError
 from src.load.load import load_data
+from src.report.report import generate_report
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_PATH = os.path.join(BASE_DIR, 'data', 'todos-jogadores.csv')
@@ -19,19 +21,32 @@ def main():
     
     try:
         # 1. EXTRACT
-        print("\n[Passo 1/3] Extraindo dados brutos...")
+        print("\n[Passo 1/5] Extraindo dados brutos...")
         df_bruto = extract_data(DATA_PATH)
         print(f"✔ Sucesso: {len(df_bruto)} registros brutos extraídos.")
         
         # 2. TRANSFORM 
-        print("\n[Passo 2/3] Transformando e limpando os dados...")
+        print("\n[Passo 2/5] Transformando e limpando os dados...")
         df_transformado = transform_data(df_bruto)
         print(f"✔ Sucesso: {len(df_transformado)} registros limpos e prontos.")
+
+        # 3. VALIDATE
+        print("\n[Passo 3/5] Validando a qualidade dos dados...")
+        df_valido, quarentena, _ = validate_data(df_bruto, df_transformado, DB_PATH)
+        print(f"✔ Sucesso: {len(df_valido)} registros aprovados ({len(quarentena)} problemas em quarentena).")
         
-        # 3. LOAD
-        print("\n[Passo 3/3] Carregando dados para o Banco de Dados...")
-        load_data(df_transformado, DB_PATH, TABLE_NAME)
+        # 4. LOAD
+        print("\n[Passo 4/5] Carregando dados para o Banco de Dados...")
+        load_data(df_valido, DB_PATH, TABLE_NAME)
         print(f"✔ Sucesso: Dados salvos em '{TABLE_NAME}' no arquivo '{DB_PATH}'.")
+
+        # 5. REPORT (opcional: uma falha aqui não desfaz a carga)
+        print("\n[Passo 5/5] Gerando o relatório estático do snapshot...")
+        try:
+            pasta = generate_report(DB_PATH)
+            print(f"✔ Sucesso: Relatório em '{pasta}'.")
+        except Exception as e:
+            print(f"⚠ Aviso: o relatório não foi gerado ({e}).", file=sys.stderr)
         
         print("\n=============================================")
         print("--- PIPELINE ETL CONCLUÍDO COM SUCESSO! ---")
@@ -41,6 +56,10 @@ def main():
         print(f"\n[ERRO FATAL] O arquivo de dados não foi encontrado em:", file=sys.stderr)
         print(f"{DATA_PATH}", file=sys.stderr)
         print("Verifique se o arquivo .csv está no local correto.", file=sys.stderr)
+    except ValidationError as e:
+        print(f"\n[ERRO FATAL] {e}", file=sys.stderr)
+        print("Nada foi carregado. As linhas com problema estão na tabela 'quarantine' do banco.", file=sys.stderr)
+        sys.exit(1)
     except Exception as e:
         print(f"\n[ERRO FATAL] O pipeline falhou.", file=sys.stderr)
         print(f"Detalhe do erro: {e}", file=sys.stderr)
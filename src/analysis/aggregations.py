@@ -0,0 +1,182 @@
+import os
+import sys
+import threading
+
+import pandas as pd
+
+from src.database.columnar import columnar_path, open_columnar_table, read_columnar_version
+from src.database.database import connect_readonly, get_data_version
+
+BACKENDS = ('duckdb', 'pandas')
+
+# Colunas aceitas como grupo no resumo do histórico
+COLUNAS_AGREGACAO = [
+    'nome', 'pais', 'clube', 'posicao', 'idade', 'valor', 'salario',
+    'classificacao_atual', 'classificacao_potencial', 'faixa_etaria', 'data_snapshot',
+]
+
+# Métricas por grupo no resumo do histórico: nome -> (coluna, agregação)
+METRICAS_HISTORICO = {
+    'jogadores': ('nome', 'count'),
+    'media_atual': ('classificacao_atual', 'mean'),
+    'media_potencial': ('classificacao_potencial', 'mean'),
+    'valor_total': ('valor', 'sum'),
+}
+EXPRESSOES_SQL = {'count': "COUNT({})", 'mean': "AVG({})", 'sum': "COALESCE(SUM({}), 0)"}
+
+def _duckdb():
+    try:
+        import duckdb
+        return duckdb
+    except ImportError:
+        return None
+
+# O padrão é o pandas: nos recortes filtrados da sidebar ele é mais rápido (benchmarks/bench_aggregations.py).
+# O dashboard pede o DuckDB explicitamente para as agregações sobre o histórico inteiro, onde ele ganha.
+def default_backend() -> str:
+    return 'pandas'
+
+# NaN do pandas conta como nulo (no DuckDB, NaN de ponto flutuante é um valor).
+def _sem_nan(coluna: str) -> str:
+    return f"CASE WHEN isnan({coluna}) THEN NULL ELSE {coluna} END"
+
+# Conexão DuckDB com a view 'jogadores' sobre o histórico publicado em 'db_path', sem passar pelo
+# DataFrame do processo: a cópia colunar (Arrow IPC mapeado em memória, ver src/database/columnar.py)
+# quando está na versão do banco; senão o próprio banco SQLite, anexado somente leitura. Retorna
+# (conexão, tabela Arrow da cópia colunar ou None); a tabela é registrada em cada cursor, porque o
+# registro vale só para a conexão que o fez. (None, None), com aviso, se o DuckDB não está instalado
+# ou nenhuma das duas fontes pode ser aberta.
+def _open_duckdb(db_path: str) -> tuple:
+    duckdb = _duckdb()
+    if duckdb is None:
+        print("DuckDB não instalado (pip install duckdb): agregações no pandas.")
+        return None, None
+    if db_path is None or not os.path.exists(db_path):
+        print(f"Banco '{db_path}' não encontrado: agregações do DuckDB no pandas.")
+        return None, None
+
+    conn = connect_readonly(db_path)
+    try:
+        versao = get_data_version(conn)
+    finally:
+        conn.close()
+    caminho_colunar = columnar_path(db_path)
+    con = duckdb.connect()
+    try:
+        if versao is not None and read_columnar_version(caminho_colunar) == versao:
+            return con, open_columnar_table(caminho_colunar)
+        con.execute(f"ATTACH '{db_path.replace(chr(39), chr(39) * 2)}' AS fm (TYPE sqlite, READ_ONLY)")
+        con.execute("CREATE VIEW jogadores AS SELECT * FROM fm.players")
+        return con, None
+    except duckdb.Error as e:
+        con.close()
+        print(f"DuckDB não conseguiu abrir '{db_path}' ({e}): agregações no pandas.", file=sys.stderr)
+        return None, None
+
+# Agregações do dashboard sobre o histórico de jogadores.
+# No backend DuckDB, as consultas sobre o histórico inteiro (sem 'filtro') rodam em SQL vetorizado e
+# multithread direto sobre o banco publicado (ver _open_duckdb), sem o DataFrame em memória. Os recortes
+# filtrados da sidebar rodam no pandas nos dois backends: neles o pandas é mais rápido. Sem o DuckDB
+# (ou sem como abrir o banco), o motor cai para o pandas sobre 'df'. Os dois caminhos retornam
+# exatamente o mesmo resultado.
+class AggregationEngine:
+    def __init__(self, df: pd.DataFrame, backend: str = None, db_path: str = None):
+        self.backend = backend or default_backend()
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Backend '{self.backend}' inválido. Use um de {BACKENDS}.")
+        self.df = df
+        self._con, self._colunar = None, None
+        self._lock = threading.Lock()
+        if self.backend == 'duckdb':
+            self._con, self._colunar = _open_duckdb(db_path)
+            if self._con is None:
+                self.backend = 'pandas'
+
+    def close(self) -> None:
+        if self._con is not None:
+            self._con.close()
+            self._con, self._colunar = None, None
+
+    # Recorte em que a consulta roda no pandas (None quando ela vai para o DuckDB).
+    def _recorte(self, filtro: pd.DataFrame = None):
+        if self.backend == 'pandas' or filtro is not None:
+            return self.df if filtro is None else filtro
+        return None
+
+    # Roda 'sql' sobre o histórico inteiro. Cada consulta usa um cursor próprio, então o motor pode
+    # ser compartilhado entre threads.
+    def _consultar(self, sql: str, params: list = None) -> pd.DataFrame:
+        with self._lock:
+            cursor = self._con.cursor()
+        try:
+            if self._colunar is not None:
+                cursor.register('jogadores', self._colunar)
+            return cursor.execute(sql, params or []).df()
+        finally:
+            cursor.close()
+
+    # Potencial médio e nº de jogadores por clube, só clubes com pelo menos 'min_jogadores'.
+    # Retorna as 'n' maiores médias (empates pelo nome do clube), indexado por 'clube'.
+    def club_potential(self, filtro: pd.DataFrame = None, min_jogadores: int = 1, n: int = 15) -> pd.DataFrame:
+        df = self._recorte(filtro)
+        if df is not None:
+            stats = df.groupby('clube')['classificacao_potencial'].agg(['mean', 'count'])
+            stats = stats[stats['count'] >= min_jogadores].reset_index()
+            stats = stats.sort_values(['mean', 'clube'], ascending=[False, True], na_position='last')
+            return stats.head(n).set_index('clube')
+
+        potencial = _sem_nan('classificacao_potencial')
+        stats = self._consultar(f"""
+            SELECT clube, AVG({potencial}) AS mean, COUNT({potencial}) AS count
+            FROM jogadores
+            WHERE clube IS NOT NULL
+            GROUP BY clube
+            HAVING COUNT({potencial}) >= ?
+            ORDER BY mean DESC NULLS LAST, clube
+            LIMIT {int(n)}
+        """, [int(min_jogadores)])
+        return stats.astype({'count': 'int64'}).set_index('clube')
+
+    # Nº de jogadores por país entre os que têm potencial >= 'potencial_min' e idade <= 'idade_max'.
+    # Retorna os 'n' países com mais jogadores (empates pelo nome do país).
+    def country_counts(self, filtro: pd.DataFrame = None, potencial_min: float = 0.0, idade_max: int = 99,
+                       n: int = 15) -> pd.Series:
+        df = self._recorte(filtro)
+        if df is not None:
+            selecao = df[(df['classificacao_potencial'] >= potencial_min) & (df['idade'] <= idade_max)]
+            contagem = selecao['pais'].value_counts().rename_axis('pais').reset_index()
+            contagem = contagem.sort_values(['count', 'pais'], ascending=[False, True])
+        else:
+            contagem = self._consultar(f"""
+                SELECT pais, COUNT(*) AS count
+                FROM jogadores
+                WHERE pais IS NOT NULL AND {_sem_nan('classificacao_potencial')} >= ? AND idade <= ?
+                GROUP BY pais
+                ORDER BY count DESC, pais
+                LIMIT {int(n)}
+            """, [float(potencial_min), int(idade_max)])
+        return contagem.head(n).set_index('pais')['count'].astype('int64')
+
+    # Resumo de todo o histórico: métricas de METRICAS_HISTORICO por snapshot e 'grupo'
+    # (clube, pais, faixa_etaria...), ordenado por snapshot e grupo.
+    def snapshot_summary(self, grupo: str = 'clube', filtro: pd.DataFrame = None) -> pd.DataFrame:
+        if grupo not in COLUNAS_AGREGACAO:
+            raise KeyError(f"Coluna de agrupamento inválida: '{grupo}'.")
+        chaves = ['data_snapshot', grupo]
+        df = self._recorte(filtro)
+        if df is not None:
+            resumo = df.groupby(chaves).agg(**METRICAS_HISTORICO).reset_index()
+            return resumo.sort_values(chaves, ignore_index=True)
+
+        selecao = ", ".join(
+            EXPRESSOES_SQL[agregacao].format(coluna if coluna == 'nome' else _sem_nan(coluna)) + f" AS {nome}"
+            for nome, (coluna, agregacao) in METRICAS_HISTORICO.items()
+        )
+        resumo = self._consultar(f"""
+            SELECT data_snapshot, {grupo}, {selecao}
+            FROM jogadores
+            WHERE data_snapshot IS NOT NULL AND {grupo} IS NOT NULL
+            GROUP BY data_snapshot, {grupo}
+            ORDER BY data_snapshot, {grupo}
+        """)
+        return resumo.astype({'jogadores': 'int64', 'valor_total': 'float64'})
@@ -0,0 +1,81 @@
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+# Cubo de agregações da fábrica de talentos: contagem, soma, mínimo e máximo das métricas de
+# MEDIDAS_CUBO em todas as combinações (grouping sets) de clube, país, faixa etária e função.
+# Cada linha traz o 'nivel': uma máscara de bits com as dimensões mantidas (bit i = DIMENSOES_CUBO[i]);
+# as dimensões fora do nível ficam nulas, e o nível 0 é o total geral. Assim um nulo numa dimensão
+# mantida ("sem clube") nunca se confunde com um subtotal.
+
+# Dimensões do cubo, na ordem dos bits do nível
+DIMENSOES_CUBO = ['club_id', 'country_id', 'faixa_etaria', 'role_token_id']
+
+# Métricas agregadas: prefixo -> coluna
+MEDIDAS_CUBO = {
+    'potencial': 'classificacao_potencial',
+    'atual': 'classificacao_atual',
+    'valor': 'valor',
+}
+
+# Limiares de potencial com contagem própria no cubo (n_pot_<limiar> = jogadores com potencial >= limiar)
+LIMIARES_POTENCIAL = (80, 85, 90, 95)
+
+AGREGACOES_CUBO = ('count', 'sum', 'min', 'max')
+
+COLUNAS_MEDIDAS = (
+    ['jogadores']
+    + [f'{agregacao}_{prefixo}' for prefixo in MEDIDAS_CUBO for agregacao in AGREGACOES_CUBO]
+    + [f'n_pot_{limiar}' for limiar in LIMIARES_POTENCIAL]
+)
+COLUNAS_CUBO = ['nivel'] + DIMENSOES_CUBO + COLUNAS_MEDIDAS
+
+# Nível (máscara de bits) de um conjunto de dimensões mantidas.
+def cube_level(dimensoes) -> int:
+    dimensoes = set(dimensoes)
+    desconhecidas = dimensoes - set(DIMENSOES_CUBO)
+    if desconhecidas:
+        raise KeyError(f"Dimensões fora do cubo: {sorted(desconhecidas)}. Use {DIMENSOES_CUBO}.")
+    return sum(1 << DIMENSOES_CUBO.index(d) for d in dimensoes)
+
+# Funções de cada jogador: o sufixo pode listar várias separadas por vírgula (como no filtro da sidebar).
+# Retorna uma Series com um token por linha, repetindo o índice do jogador; quem não tem função fica com NaN.
+def role_tokens(sufixos: pd.Series) -> pd.Series:
+    tokens = sufixos.str.split(',').explode().str.strip()
+    return tokens.where(tokens != '', np.nan)
+
+# Agrega 'df' por 'chaves' (lista vazia = total geral) nas colunas de COLUNAS_MEDIDAS.
+# Um único groupby por nível, com as quatro reduções aplicadas a todas as métricas de uma vez.
+def _aggregate(df: pd.DataFrame, chaves: list) -> pd.DataFrame:
+    metricas = pd.DataFrame({prefixo: df[coluna].astype('float64') for prefixo, coluna in MEDIDAS_CUBO.items()})
+    contagens = pd.DataFrame({'jogadores': np.ones(len(df), dtype='int64')}, index=df.index)
+    for limiar in LIMIARES_POTENCIAL:
+        contagens[f'n_pot_{limiar}'] = (df['classificacao_potencial'] >= limiar).astype('int64')
+
+    grupos = [df[chave] for chave in chaves] if chaves else np.zeros(len(df), dtype='int64')
+    g_metricas = metricas.groupby(grupos, dropna=False, sort=False)
+    partes = [contagens.groupby(grupos, dropna=False, sort=False).sum()]
+    for agregacao in AGREGACOES_CUBO:
+        partes.append(getattr(g_metricas, agregacao)().add_prefix(f'{agregacao}_'))
+    agregado = pd.concat(partes, axis=1)
+    return agregado.reset_index() if chaves else agregado.reset_index(drop=True)
+
+# Monta o cubo de um snapshot. 'df' tem uma linha por jogador com club_id, country_id, faixa_etaria e as
+# colunas de MEDIDAS_CUBO; 'funcoes' tem um role_token_id por linha e por função do jogador (índice repetido,
+# NaN para quem não tem função, ver role_tokens). Os níveis sem a função são agregados sobre os
+# jogadores, não sobre as funções: quem tem duas funções conta uma vez só nos subtotais.
+def build_cube(df: pd.DataFrame, funcoes: pd.Series) -> pd.DataFrame:
+    base = df.drop(columns=['role_token_id'], errors='ignore')
+    por_funcao = base.loc[funcoes.index].assign(role_token_id=funcoes.to_numpy())
+    partes = []
+    for tamanho in range(len(DIMENSOES_CUBO) + 1):
+        for chaves in combinations(DIMENSOES_CUBO, tamanho):
+            origem = por_funcao if 'role_token_id' in chaves else base
+            parte = _aggregate(origem, list(chaves))
+            parte.insert(0, 'nivel', cube_level(chaves))
+            partes.append(parte)
+    cubo = pd.concat(partes, ignore_index=True)
+    for coluna in ['club_id', 'country_id', 'role_token_id']:
+        cubo[coluna] = cubo[coluna].astype('Int64')
+    return cubo[COLUNAS_CUBO]
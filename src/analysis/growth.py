@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+
+# Idades em que a curva de cada jogador é projetada (colunas proj_<idade>)
+IDADES_PROJECAO = (21, 24, 27)
+
+# Idade de pico usada para medir a distância até o potencial
+IDADE_PICO = 27
+
+# Regularização da taxa de crescimento (em anos²): puxa a taxa de quem tem poucas observações (ou todas
+# na mesma época) para a taxa típica da sua faixa etária. Com uma única observação, a taxa é a típica.
+RIDGE_TAXA = 1.0
+
+# Faixas etárias da taxa típica: limites superiores (anos)
+FAIXAS_TAXA = [18, 21, 24, 27, 30, np.inf]
+
+FAIXA_CLASSIFICACAO = (0.0, 100.0)
+
+COLUNAS_CURVA = [
+    'n_obs', 'idade_ref', 'nivel', 'taxa_anual', 'rmse',
+    *[f'proj_{idade}' for idade in IDADES_PROJECAO], 'classificacao_potencial', 'deficit_potencial',
+]
+
+# Idade contínua de cada observação: idade na primeira observação do jogador + anos desde ela
+# (a idade do export é inteira e não muda entre snapshots próximos).
+def _idade_continua(codigos: np.ndarray, anos: np.ndarray, idade: np.ndarray) -> np.ndarray:
+    ordem = np.lexsort((anos, codigos))
+    primeira = np.flatnonzero(np.r_[True, codigos[ordem][1:] != codigos[ordem][:-1]])
+    n_jogadores = codigos.max() + 1 if len(codigos) else 0
+    ano_inicial = np.empty(n_jogadores)
+    idade_inicial = np.empty(n_jogadores)
+    ano_inicial[codigos[ordem[primeira]]] = anos[ordem[primeira]]
+    idade_inicial[codigos[ordem[primeira]]] = idade[ordem[primeira]]
+    return idade_inicial[codigos] + (anos - ano_inicial[codigos])
+
+# Taxa típica (mediana das taxas bem determinadas) por faixa de 'idade_ref'; faixas sem dados usam a
+# mediana geral, e sem nenhuma taxa determinada, 0.
+def _taxa_tipica(idade_ref: np.ndarray, taxa: np.ndarray, determinada: np.ndarray) -> np.ndarray:
+    faixa = np.searchsorted(FAIXAS_TAXA, idade_ref)
+    geral = np.median(taxa[determinada]) if determinada.any() else 0.0
+    tipica = np.full(len(FAIXAS_TAXA), geral)
+    for i in np.unique(faixa[determinada]):
+        tipica[i] = np.median(taxa[determinada & (faixa == i)])
+    return tipica[faixa]
+
+# Curva de crescimento de todos os jogadores de uma vez: classificacao_atual = nivel + taxa_anual *
+# (idade - idade_ref), com idade_ref = idade na última observação (nivel é a qualidade ajustada hoje).
+# Mínimos quadrados em lote: as equações normais 2x2 de cada jogador saem de somas por grupo
+# (np.bincount) e são resolvidas juntas com np.linalg.solve, sem laço por jogador.
+# 'obs' tem uma linha por jogador e snapshot: player_id, data_snapshot, idade, classificacao_atual e
+# classificacao_potencial. Retorna COLUNAS_CURVA indexado por player_id; projeções para idades que o
+# jogador já passou ficam nulas.
+def fit_growth_curves(obs: pd.DataFrame, ridge: float = RIDGE_TAXA) -> pd.DataFrame:
+    obs = obs.dropna(subset=['player_id', 'data_snapshot', 'idade', 'classificacao_atual'])
+    if obs.empty:
+        return pd.DataFrame(columns=COLUNAS_CURVA, index=pd.Index([], name='player_id', dtype='int64'))
+
+    codigos, ids = pd.factorize(obs['player_id'].astype('int64'), sort=True)
+    datas = pd.to_datetime(obs['data_snapshot']).to_numpy()
+    anos = (datas - datas.min()) / np.timedelta64(1, 'D') / 365.25
+    y = obs['classificacao_atual'].to_numpy(dtype='float64')
+    x = _idade_continua(codigos, anos, obs['idade'].to_numpy(dtype='float64'))
+
+    k = len(ids)
+    idade_ref = np.full(k, -np.inf)
+    np.maximum.at(idade_ref, codigos, x)
+    u = x - idade_ref[codigos]
+
+    # Somas das equações normais por jogador
+    n = np.bincount(codigos, minlength=k).astype('float64')
+    su = np.bincount(codigos, u, minlength=k)
+    suu = np.bincount(codigos, u * u, minlength=k)
+    sy = np.bincount(codigos, y, minlength=k)
+    suy = np.bincount(codigos, u * y, minlength=k)
+    syy = np.bincount(codigos, y * y, minlength=k)
+
+    # Taxa de mínimos quadrados sem regularização, onde a variância da idade permite
+    var_u = suu - su * su / n
+    determinada = var_u > 1e-6
+    taxa_ols = np.where(determinada, (suy - su * sy / n) / np.where(determinada, var_u, 1.0), 0.0)
+    prior = _taxa_tipica(idade_ref, taxa_ols, determinada)
+
+    # Sistema regularizado de cada jogador: [[n, su], [su, suu + λ]] β = [sy, suy + λ·prior]
+    A = np.empty((k, 2, 2))
+    A[:, 0, 0], A[:, 0, 1], A[:, 1, 0], A[:, 1, 1] = n, su, su, suu + ridge
+    b = np.stack([sy, suy + ridge * prior], axis=1)[:, :, None]
+    nivel, taxa = np.linalg.solve(A, b)[:, :, 0].T
+
+    sse = syy - 2 * nivel * sy - 2 * taxa * suy + nivel ** 2 * n + 2 * nivel * taxa * su + taxa ** 2 * suu
+    curvas = pd.DataFrame({
+        'n_obs': n.astype('int64'),
+        'idade_ref': idade_ref,
+        'nivel': nivel,
+        'taxa_anual': taxa,
+        'rmse': np.sqrt(np.maximum(sse, 0.0) / n),
+    }, index=pd.Index(ids, name='player_id'))
+
+    for idade in IDADES_PROJECAO:
+        projecao = np.clip(nivel + taxa * (idade - idade_ref), *FAIXA_CLASSIFICACAO)
+        curvas[f'proj_{idade}'] = np.where(idade >= np.floor(idade_ref), projecao, np.nan)
+
+    # Potencial da última observação; déficit = potencial - qualidade projetada no pico (ou a atual, depois dele)
+    ordem = np.lexsort((x, codigos))
+    ultima = ordem[np.r_[codigos[ordem][1:] != codigos[ordem][:-1], True]]
+    potencial = np.full(k, np.nan)
+    potencial[codigos[ultima]] = obs['classificacao_potencial'].to_numpy(dtype='float64')[ultima]
+    no_pico = np.clip(nivel + taxa * np.maximum(IDADE_PICO - idade_ref, 0.0), *FAIXA_CLASSIFICACAO)
+    curvas['classificacao_potencial'] = potencial
+    curvas['deficit_potencial'] = potencial - no_pico
+    return curvas[COLUNAS_CURVA]
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+# Ordens de ordenação pré-calculadas de um DataFrame, para paginar resultados filtrados por cursor.
+# O cursor é a posição do último item entregue dentro da ordem: a página seguinte continua dali,
+# sem reordenar nem percorrer as páginas anteriores.
+class SortedPager:
+    def __init__(self, df: pd.DataFrame, colunas: list):
+        self.n = len(df)
+        self._valores = {coluna: df[coluna].to_numpy(dtype='float64') for coluna in colunas}
+        self._ordens = {}
+
+    # Ordem das linhas por 'coluna' (nulos sempre no fim; empates pela posição original).
+    def ordem(self, coluna: str, decrescente: bool = True) -> np.ndarray:
+        chave = (coluna, decrescente)
+        if chave not in self._ordens:
+            x = self._valores[coluna]
+            nulos = np.isnan(x)
+            self._ordens[chave] = np.lexsort((np.arange(self.n), -x if decrescente else x, nulos))
+        return self._ordens[chave]
+
+    # Próxima página de até 'tamanho' linhas que passam na máscara, depois do cursor.
+    # Percorre a ordem em blocos crescentes, então o custo acompanha o tamanho da página
+    # (e não o total de linhas filtradas). Retorna (posições das linhas, cursor da próxima página ou None).
+    def page(self, coluna: str, decrescente: bool, mascara: np.ndarray, cursor: int = -1, tamanho: int = 50):
+        ordem = self.ordem(coluna, decrescente)
+        rank = []
+        faltam = tamanho + 1  # uma a mais para saber se existe próxima página
+        inicio = cursor + 1
+        passo = max(4 * tamanho, 256)
+        while inicio < self.n and faltam > 0:
+            bloco = ordem[inicio:inicio + passo]
+            achados = np.flatnonzero(mascara[bloco])[:faltam]
+            rank.append(inicio + achados)
+            faltam -= len(achados)
+            inicio += passo
+            passo *= 2
+
+        rank = np.concatenate(rank) if rank else np.empty(0, dtype=np.int64)
+        proximo = int(rank[tamanho - 1]) if len(rank) > tamanho else None
+        return ordem[rank[:tamanho]], proximo
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+# Atributos numéricos comparados (padronizados); valor e salário entram em escala log
+COLUNAS_SIMILARIDADE = ['idade', 'classificacao_atual', 'classificacao_potencial', 'valor', 'salario']
+COLUNAS_LOG = ['valor', 'salario']
+
+# Quebra 'posicao' (ex: "MA DE, PL") e 'sufixo_atual' (ex: "W") num conjunto de tokens.
+def tokenize_roles(posicao, sufixo) -> set:
+    tokens = set()
+    if isinstance(posicao, str):
+        tokens.update(f"pos:{p.strip()}" for p in posicao.split(',') if p.strip())
+    if isinstance(sufixo, str):
+        tokens.update(f"fun:{f.strip()}" for f in sufixo.split(',') if f.strip())
+    return tokens
+
+# Índice de similaridade de um snapshot: matriz padronizada + tokens de posição/função em formato CSR.
+class SimilarityIndex:
+    def __init__(self, df: pd.DataFrame, peso_funcao: float = 1.0):
+        self.df = df
+        self.peso_funcao = peso_funcao
+
+        X = self.df[COLUNAS_SIMILARIDADE].astype('float64').fillna(0).to_numpy()
+        for coluna in COLUNAS_LOG:
+            j = COLUNAS_SIMILARIDADE.index(coluna)
+            X[:, j] = np.log1p(np.clip(X[:, j], 0, None))
+        media = X.mean(axis=0)
+        desvio = X.std(axis=0)
+        desvio[desvio == 0] = 1.0
+        self.Z = ((X - media) / desvio).astype(np.float32)
+
+        # Tokens de cada jogador: indptr/indices como numa matriz esparsa CSR.
+        # Há poucas combinações distintas de posição/função, então tokeniza-se cada uma só uma vez.
+        codigos, combinacoes = pd.MultiIndex.from_frame(
+            self.df[['posicao', 'sufixo_atual']].astype(object)
+        ).factorize()
+        conjuntos = [sorted(tokenize_roles(p, s)) for p, s in combinacoes]
+        self.vocabulario = {t: i for i, t in enumerate(sorted(set().union(*conjuntos)))}
+        n_tokens_combinacao = np.array([len(c) for c in conjuntos], dtype=np.int64)
+        inicio_combinacao = np.concatenate([[0], np.cumsum(n_tokens_combinacao)[:-1]])
+        indices_combinacao = np.array([self.vocabulario[t] for c in conjuntos for t in c], dtype=np.int32)
+
+        self.n_tokens = n_tokens_combinacao[codigos]
+        self.indptr = np.concatenate([[0], np.cumsum(self.n_tokens)])
+        deslocamento = np.arange(self.indptr[-1]) - np.repeat(self.indptr[:-1], self.n_tokens)
+        self.indices = indices_combinacao[np.repeat(inicio_combinacao[codigos], self.n_tokens) + deslocamento]
+        self.linha_do_token = np.repeat(np.arange(len(self.df), dtype=np.int32), self.n_tokens)
+
+        self.valor = self.df['valor'].to_numpy(dtype='float64')
+        self.idade = self.df['idade'].to_numpy(dtype='float64')
+
+    # Posição (linha) no índice do jogador com esse rótulo do DataFrame original.
+    def position_of(self, rotulo) -> int:
+        return self.df.index.get_loc(rotulo)
+
+    # Similaridade de Jaccard entre os tokens do jogador 'i' e os de todos os outros.
+    def _jaccard(self, i: int) -> np.ndarray:
+        tokens_i = self.indices[self.indptr[i]:self.indptr[i + 1]]
+        if len(tokens_i) == 0:
+            return np.zeros(len(self.df))
+        em_comum = np.bincount(
+            self.linha_do_token[np.isin(self.indices, tokens_i)], minlength=len(self.df)
+        )
+        uniao = self.n_tokens + len(tokens_i) - em_comum
+        return em_comum / np.maximum(uniao, 1)
+
+    # Retorna os k jogadores mais parecidos com o da linha 'i' (menor distância primeiro).
+    def query(self, i: int, k: int = 10, mais_barato: bool = False, mais_jovem: bool = False) -> pd.DataFrame:
+        diferenca = self.Z - self.Z[i]
+        distancia = np.sqrt(np.einsum('ij,ij->i', diferenca, diferenca))
+        distancia += self.peso_funcao * (1.0 - self._jaccard(i))
+
+        candidatos = np.ones(len(self.df), dtype=bool)
+        candidatos[i] = False
+        if mais_barato:
+            candidatos &= self.valor < self.valor[i]
+        if mais_jovem:
+            candidatos &= self.idade < self.idade[i]
+
+        posicoes = np.flatnonzero(candidatos)
+        k = min(k, len(posicoes))
+        if k == 0:
+            return self.df.iloc[[]].assign(distancia=pd.Series(dtype='float64'))
+
+        melhores = posicoes[np.argpartition(distancia[posicoes], k - 1)[:k]]
+        melhores = melhores[np.argsort(distancia[melhores], kind='stable')]
+        resultado = self.df.iloc[melhores].copy()
+        resultado['distancia'] = distancia[melhores]
+        return resultado
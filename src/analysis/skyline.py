@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+
+# Critérios padrão do custo-benefício: menor valor e maior qualidade atual
+CRITERIOS_PADRAO = {'valor': 'min', 'classificacao_atual': 'max'}
+
+# Critérios opcionais: mais jovem e maior potencial
+CRITERIOS_EXTRAS = {'idade': 'min', 'classificacao_potencial': 'max'}
+
+# Fronteira de Pareto em 2D (minimiza 'a', minimiza 'b') em O(n log n).
+# Pontos idênticos não se dominam, então todos os repetidos de um ponto da fronteira entram nela.
+def _pareto_2d(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    ordem = np.lexsort((b, a))
+    a_ord, b_ord = a[ordem], b[ordem]
+
+    # Em ordem de 'a' (e 'b') crescente, um ponto está na fronteira se o seu 'b'
+    # é menor que todos os 'b' dos pontos anteriores
+    melhor_anterior = np.minimum.accumulate(np.concatenate([[np.inf], b_ord[:-1]]))
+    na_fronteira = b_ord < melhor_anterior
+
+    # Repetidos herdam o resultado do primeiro ponto do seu grupo
+    repetido = np.concatenate([[False], (a_ord[1:] == a_ord[:-1]) & (b_ord[1:] == b_ord[:-1])])
+    inicio_grupo = np.flatnonzero(~repetido)
+    na_fronteira = na_fronteira[inicio_grupo][np.cumsum(~repetido) - 1]
+
+    mascara = np.empty(len(a), dtype=bool)
+    mascara[ordem] = na_fronteira
+    return mascara
+
+# Verdadeiro para cada linha de P dominada por alguma linha de F.
+def _dominados_por(P: np.ndarray, F: np.ndarray) -> np.ndarray:
+    if len(F) == 0:
+        return np.zeros(len(P), dtype=bool)
+    menor_igual = np.all(F[None, :, :] <= P[:, None, :], axis=2)
+    menor = np.any(F[None, :, :] < P[:, None, :], axis=2)
+    return np.any(menor_igual & menor, axis=1)
+
+# Fronteira de Pareto com mais critérios (sort-filter skyline): ordena pela soma dos critérios,
+# de modo que um ponto só pode ser dominado por pontos anteriores, e compara blocos de pontos
+# de uma vez com a fronteira já encontrada.
+def _pareto_nd(M: np.ndarray, bloco: int = 512) -> np.ndarray:
+    escala = np.where(np.isfinite(M), M, np.nan)
+    escala = (escala - np.nanmin(escala, axis=0)) / np.maximum(np.nanmax(escala, axis=0) - np.nanmin(escala, axis=0), 1e-12)
+    ordem = np.argsort(np.nan_to_num(escala, nan=1.0).sum(axis=1), kind='stable')
+
+    fronteira = np.empty((0, M.shape[1]))
+    indices_fronteira = []
+    for inicio in range(0, len(ordem), bloco):
+        idx = ordem[inicio:inicio + bloco]
+        P = M[idx]
+        sobreviventes = ~_dominados_por(P, fronteira)
+        # Dentro do bloco, os poucos sobreviventes são comparados entre si na ordem
+        for j in np.flatnonzero(sobreviventes):
+            if indices_fronteira and _dominados_por(P[j:j + 1], fronteira)[0]:
+                continue
+            fronteira = np.vstack([fronteira, P[j]])
+            indices_fronteira.append(idx[j])
+
+    mascara = np.zeros(len(M), dtype=bool)
+    mascara[indices_fronteira] = True
+    return mascara
+
+# Retorna a máscara dos jogadores que nenhum outro supera em todos os critérios.
+# 'criterios' mapeia coluna -> 'min' ou 'max'.
+def skyline_mask(df: pd.DataFrame, criterios: dict = None) -> np.ndarray:
+    criterios = criterios or CRITERIOS_PADRAO
+    if len(df) == 0:
+        return np.zeros(0, dtype=bool)
+
+    # Tudo vira minimização; nulos ficam no pior valor possível
+    colunas = []
+    for coluna, sentido in criterios.items():
+        x = df[coluna].to_numpy(dtype='float64')
+        x = x if sentido == 'min' else -x
+        colunas.append(np.where(np.isnan(x), np.inf, x))
+    M = np.column_stack(colunas)
+
+    if M.shape[1] == 2:
+        return _pareto_2d(M[:, 0], M[:, 1])
+    return _pareto_nd(M)
+
+# Calcula a fronteira dentro de cada grupo (ex: por função) e devolve a tabela de pechinchas,
+# ordenada por qualidade atual e, no empate, pelo menor valor.
+def compute_bargains(df: pd.DataFrame, criterios: dict = None, grupo: str = None) -> pd.DataFrame:
+    if grupo is None:
+        mascara = skyline_mask(df, criterios)
+    else:
+        mascara = np.zeros(len(df), dtype=bool)
+        posicoes = np.arange(len(df))
+        for _, pos_grupo in pd.Series(posicoes).groupby(df[grupo].fillna('-').to_numpy()):
+            idx = pos_grupo.to_numpy()
+            mascara[idx] = skyline_mask(df.iloc[idx], criterios)
+
+    pechinchas = df[mascara]
+    return pechinchas.sort_values(
+        by=['classificacao_atual', 'valor'], ascending=[False, True], kind='stable'
+    )
@@ -0,0 +1,290 @@
+import time
+import numpy as np
+import pandas as pd
+
+# Posições atômicas aceitas em cada vaga da escalação
+VAGAS = {
+    'Goleiro': {'GR'},
+    'Lateral D': {'Def D', 'Ala D'},
+    'Lateral E': {'Def E', 'Ala E'},
+    'Zagueiro': {'Def C'},
+    'Volante': {'MD'},
+    'Meio-campo': {'M C'},
+    'Ala/Ponta D': {'M D', 'MA D'},
+    'Ala/Ponta E': {'M E', 'MA E'},
+    'Meia': {'MA C'},
+    'Atacante': {'PL', 'Av C'},
+}
+
+# Formações: vaga -> quantidade de jogadores
+FORMACOES = {
+    '4-4-2': {'Goleiro': 1, 'Lateral D': 1, 'Lateral E': 1, 'Zagueiro': 2,
+              'Meio-campo': 2, 'Ala/Ponta D': 1, 'Ala/Ponta E': 1, 'Atacante': 2},
+    '4-3-3': {'Goleiro': 1, 'Lateral D': 1, 'Lateral E': 1, 'Zagueiro': 2, 'Volante': 1,
+              'Meio-campo': 2, 'Ala/Ponta D': 1, 'Ala/Ponta E': 1, 'Atacante': 1},
+    '4-2-3-1': {'Goleiro': 1, 'Lateral D': 1, 'Lateral E': 1, 'Zagueiro': 2, 'Volante': 2,
+                'Ala/Ponta D': 1, 'Ala/Ponta E': 1, 'Meia': 1, 'Atacante': 1},
+    '3-5-2': {'Goleiro': 1, 'Zagueiro': 3, 'Lateral D': 1, 'Lateral E': 1, 'Volante': 1,
+              'Meio-campo': 2, 'Atacante': 2},
+}
+
+# Expande a notação de posições do FM em posições atômicas.
+# Ex: "Def/Ala E, MA EC" -> {"Def E", "Ala E", "MA E", "MA C"}; "PL" -> {"PL"}
+def parse_positions(posicao) -> set:
+    if not isinstance(posicao, str):
+        return set()
+    atomicas = set()
+    for grupo in posicao.split(','):
+        grupo = grupo.strip()
+        if not grupo:
+            continue
+        if ' ' not in grupo:
+            atomicas.add(grupo)
+            continue
+        funcoes, lados = grupo.rsplit(' ', 1)
+        for funcao in funcoes.split('/'):
+            for lado in lados:
+                atomicas.add(f"{funcao.strip()} {lado}")
+    return atomicas
+
+# Máscara dos jogadores elegíveis para cada tipo de vaga (tokeniza cada 'posicao' distinta uma vez).
+def eligibility(df: pd.DataFrame, vagas: list) -> dict:
+    codigos, unicos = pd.factorize(df['posicao'])
+    atomicas = [parse_positions(p) for p in unicos]
+    elegiveis = {}
+    for vaga in vagas:
+        aceita = np.array([bool(a & VAGAS[vaga]) for a in atomicas] + [False])
+        elegiveis[vaga] = aceita[codigos]  # código -1 (posição nula) cai no último False
+    return elegiveis
+
+# k-skyband: descarta quem é dominado (mais caro, salário maior e nota menor) por pelo menos k jogadores.
+# Em ordem da soma normalizada, só os anteriores podem dominar um ponto; e se algum anterior descartado
+# o domina, os k mantidos que dominam esse descartado também o dominam. Então basta somar os
+# dominadores já mantidos com os do próprio bloco.
+def _skyband(custo: np.ndarray, salario: np.ndarray, nota: np.ndarray, k: int, bloco: int = 256) -> np.ndarray:
+    M = np.column_stack([custo, salario, -nota])
+    amplitude = np.maximum(M.max(axis=0) - M.min(axis=0), 1e-12)
+    ordem = np.argsort(((M - M.min(axis=0)) / amplitude).sum(axis=1), kind='stable')
+
+    def contar_dominadores(P: np.ndarray, F: np.ndarray) -> np.ndarray:
+        menor_igual = np.ones((len(P), len(F)), dtype=bool)
+        menor = np.zeros((len(P), len(F)), dtype=bool)
+        for c in range(M.shape[1]):
+            menor_igual &= F[None, :, c] <= P[:, None, c]
+            menor |= F[None, :, c] < P[:, None, c]
+        return np.count_nonzero(menor_igual & menor, axis=1)
+
+    mantidos = np.empty((0, 3))
+    indices = []
+    for inicio in range(0, len(ordem), bloco):
+        idx = ordem[inicio:inicio + bloco]
+        P = M[idx]
+        dominadores = contar_dominadores(P, mantidos) if len(mantidos) else np.zeros(len(idx), dtype=np.int64)
+        vivos = np.flatnonzero(dominadores < k)
+        if len(vivos) == 0:
+            continue
+        dominadores = dominadores[vivos] + contar_dominadores(P[vivos], P)
+        ficam = vivos[dominadores < k]
+        mantidos = np.vstack([mantidos, P[ficam]])
+        indices.extend(idx[ficam])
+    return np.sort(np.array(indices, dtype=np.int64))
+
+# Escolha gulosa de maior peso que ainda cabe nas vagas restantes.
+# As vagas formam um matroide transversal e o peso do jogador não depende da vaga ocupada,
+# então o guloso (com caminho aumentante entre tipos de vaga) dá a escolha ótima.
+# Retorna (soma dos pesos, jogadores alocados por tipo) ou (-inf, None) se não é possível preencher as vagas.
+def _melhor_base(ordem: np.ndarray, peso: np.ndarray, tipos_do: list, capacidade: list,
+                 usados: set, permitido: np.ndarray):
+    faltam = sum(capacidade)
+    alocados = [[] for _ in capacidade]
+    total = 0.0
+    if faltam == 0:
+        return total, alocados
+    for j in ordem:
+        if j in usados or not permitido[j]:
+            continue
+        if _inserir(j, tipos_do, capacidade, alocados):
+            total += peso[j]
+            faltam -= 1
+            if faltam == 0:
+                return total, alocados
+    return -np.inf, None
+
+# Tenta encaixar o jogador 'j' nas vagas, remanejando jogadores já alocados (busca em largura).
+def _inserir(j: int, tipos_do: list, capacidade: list, alocados: list) -> bool:
+    origem = {}
+    fila = []
+    for t in tipos_do[j]:
+        if capacidade[t] > 0 and t not in origem:
+            origem[t] = (None, j)
+            fila.append(t)
+    while fila:
+        t = fila.pop(0)
+        if len(alocados[t]) < capacidade[t]:
+            # Caminho encontrado: cada jogador do caminho passa para o tipo seguinte
+            while True:
+                anterior, jogador_t = origem[t]
+                alocados[t].append(jogador_t)
+                if anterior is None:
+                    return True
+                alocados[anterior].remove(jogador_t)
+                t = anterior
+        for q in alocados[t]:
+            for t2 in tipos_do[q]:
+                if capacidade[t2] > 0 and t2 not in origem:
+                    origem[t2] = (t, q)
+                    fila.append(t2)
+    return False
+
+# Monta o elenco que maximiza a soma de 'objetivo' respeitando os orçamentos de transferência
+# (soma de 'valor') e de salários (soma de 'salario'), com uma vaga por posição da formação.
+# Branch-and-bound sobre as vagas: poda por dominância (k-skyband por tipo de vaga) e dois
+# limites superiores por nó, ambos exatos quanto a jogadores repetidos em vagas diferentes:
+# a melhor escolha de notas entre os jogadores ainda pagáveis e o limite lagrangiano
+# (orçamentos relaxados com multiplicadores fixados na raiz).
+# Retorna o elenco e um dicionário com estatísticas ('otimo' é False se o tempo acabou antes).
+def build_squad(df: pd.DataFrame, formacao: dict, orcamento: float, orcamento_salarial: float,
+                objetivo: str = 'classificacao_atual', limite_tempo: float = 2.0):
+    inicio_busca = time.perf_counter()
+    formacao = {vaga: n for vaga, n in formacao.items() if n > 0}
+    vagas = list(formacao)
+    total_vagas = sum(formacao.values())
+
+    custo_todos = df['valor'].to_numpy(dtype='float64')
+    salario_todos = df['salario'].to_numpy(dtype='float64')
+    nota_todos = df[objetivo].to_numpy(dtype='float64')
+    pagavel = (~np.isnan(nota_todos) & (np.nan_to_num(custo_todos, nan=np.inf) <= orcamento)
+               & (np.nan_to_num(salario_todos, nan=np.inf) <= orcamento_salarial))
+
+    # Candidatos de cada tipo de vaga após a poda por dominância
+    elegiveis = eligibility(df, vagas)
+    mantidos = np.zeros(len(df), dtype=bool)
+    for vaga in vagas:
+        pos = np.flatnonzero(elegiveis[vaga] & pagavel)
+        if len(pos) < formacao[vaga]:
+            raise ValueError(f"Jogadores insuficientes para a vaga '{vaga}' dentro do orçamento.")
+        mantidos[pos[_skyband(custo_todos[pos], salario_todos[pos], nota_todos[pos], total_vagas)]] = True
+
+    # Candidatos numerados de 0..m-1, do maior para o menor 'objetivo'
+    linhas = np.flatnonzero(mantidos)
+    linhas = linhas[np.argsort(-nota_todos[linhas], kind='stable')]
+    custo, salario, nota = custo_todos[linhas], salario_todos[linhas], nota_todos[linhas]
+    tipos_do = [[t for t, vaga in enumerate(vagas) if elegiveis[vaga][linha]] for linha in linhas]
+    candidatos_do_tipo = [[j for j in range(len(linhas)) if t in tipos_do[j]] for t in range(len(vagas))]
+    ordem_nota = np.arange(len(linhas))
+
+    melhor = {'nota': -np.inf, 'escolha': None}
+    estado = {'nos': 0, 'interrompido': False}
+    usados = set()
+    escolha = []
+
+    # Completa a escolha atual com 'alocados' se couber nos orçamentos restantes (solução candidata)
+    def registrar(alocados: list, resto_orc: float, resto_sal: float) -> bool:
+        if alocados is None:
+            return False
+        completar = [(vagas[t], j) for t, jogadores in enumerate(alocados) for j in jogadores]
+        if (sum(custo[j] for _, j in completar) > resto_orc
+                or sum(salario[j] for _, j in completar) > resto_sal):
+            return False
+        soma = sum(nota[j] for _, j in escolha) + sum(nota[j] for _, j in completar)
+        if soma > melhor['nota']:
+            melhor['nota'] = soma
+            melhor['escolha'] = escolha + completar
+        return True
+
+    # Multiplicadores (lambda, mu) que minimizam o limite lagrangiano da raiz.
+    # Cada escolha lagrangiana que cabe nos orçamentos já serve de solução inicial.
+    capacidade_raiz = [formacao[vaga] for vaga in vagas]
+    todos = np.ones(len(linhas), dtype=bool)
+
+    def limite_lagrangiano(lam: float, mu: float) -> float:
+        peso = nota - lam * custo - mu * salario
+        base, alocados = _melhor_base(np.argsort(-peso, kind='stable'), peso, tipos_do, capacidade_raiz, set(), todos)
+        registrar(alocados, orcamento, orcamento_salarial)
+        return base + lam * orcamento + mu * orcamento_salarial
+
+    escala_lam = nota.mean() / max(np.median(custo[custo > 0]) if np.any(custo > 0) else 1.0, 1.0)
+    escala_mu = nota.mean() / max(np.median(salario[salario > 0]) if np.any(salario > 0) else 1.0, 1.0)
+    grade = np.concatenate([[0.0], np.logspace(-3, 1, 9)])
+    melhor_raiz = min((limite_lagrangiano(a * escala_lam, b * escala_mu), a, b) for a in grade for b in grade)
+    _, a, b = melhor_raiz
+    passo = 0.5
+    while passo > 0.02:
+        vizinhos = [(a * (1 - passo), b), (a * (1 + passo) or 1e-3, b), (a, b * (1 - passo)), (a, b * (1 + passo) or 1e-3)]
+        # Sem teto, um orçamento impossível de cumprir faria o limite cair sem fim
+        vizinhos = [(x, y) for x, y in vizinhos if x <= grade[-1] and y <= grade[-1]]
+        candidato = min((limite_lagrangiano(x * escala_lam, y * escala_mu), x, y) for x, y in vizinhos)
+        if candidato[0] < melhor_raiz[0]:
+            melhor_raiz = candidato
+            _, a, b = candidato
+        else:
+            passo /= 2
+    lam, mu = a * escala_lam, b * escala_mu
+    peso_lagrangiano = nota - lam * custo - mu * salario
+    ordem_lagrangiana = np.argsort(-peso_lagrangiano, kind='stable')
+
+    # Vagas com menos candidatos primeiro (ramificação menor no topo da árvore)
+    ordem_tipos = sorted(range(len(vagas)), key=lambda t: len(candidatos_do_tipo[t]))
+    assentos = [t for t in ordem_tipos for _ in range(formacao[vagas[t]])]
+    capacidade = list(capacidade_raiz)
+
+    def busca(a: int, soma: float, resto_orc: float, resto_sal: float, ultimo: int) -> None:
+        estado['nos'] += 1
+        if estado['nos'] % 64 == 0 and time.perf_counter() - inicio_busca > limite_tempo:
+            estado['interrompido'] = True
+        if estado['interrompido']:
+            return
+        if a == len(assentos):
+            if soma > melhor['nota']:
+                melhor['nota'] = soma
+                melhor['escolha'] = list(escolha)
+            return
+
+        permitido = (custo <= resto_orc) & (salario <= resto_sal)
+        limite, alocados = _melhor_base(ordem_nota, nota, tipos_do, capacidade, usados, permitido)
+        if soma + limite <= melhor['nota'] + 1e-9:
+            return
+        # Se a melhor escolha sem orçamento já cabe no orçamento, ela resolve o nó
+        if registrar(alocados, resto_orc, resto_sal):
+            return
+        limite, alocados = _melhor_base(ordem_lagrangiana, peso_lagrangiano, tipos_do, capacidade, usados, permitido)
+        if soma + limite + lam * resto_orc + mu * resto_sal <= melhor['nota'] + 1e-9:
+            return
+        registrar(alocados, resto_orc, resto_sal)
+
+        t = assentos[a]
+        proximo_mesmo_tipo = a + 1 < len(assentos) and assentos[a + 1] == t
+        capacidade[t] -= 1
+        # Vagas repetidas do mesmo tipo escolhem candidatos em ordem crescente (evita permutações)
+        for j in candidatos_do_tipo[t]:
+            if j <= ultimo or j in usados or not permitido[j]:
+                continue
+            usados.add(j)
+            escolha.append((vagas[t], j))
+            busca(a + 1, soma + nota[j], resto_orc - custo[j], resto_sal - salario[j],
+                  j if proximo_mesmo_tipo else -1)
+            escolha.pop()
+            usados.discard(j)
+            if estado['interrompido']:
+                break
+        capacidade[t] += 1
+
+    busca(0, 0.0, orcamento, orcamento_salarial, -1)
+
+    info = {
+        'otimo': not estado['interrompido'],
+        'nos': estado['nos'],
+        'candidatos': len(linhas),
+        'limite_superior': float(melhor_raiz[0]),
+        'tempo': time.perf_counter() - inicio_busca,
+    }
+    if melhor['escolha'] is None:
+        return df.iloc[[]].assign(vaga=pd.Series(dtype='object')), info
+
+    nomes_vagas, candidatos = zip(*melhor['escolha'])
+    elenco = df.iloc[linhas[list(candidatos)]].copy()
+    elenco.insert(0, 'vaga', list(nomes_vagas))
+    ordem_vagas = {vaga: i for i, vaga in enumerate(VAGAS)}
+    elenco = elenco.sort_values(by='vaga', key=lambda s: s.map(ordem_vagas), kind='stable')
+    info['total'] = float(elenco[objetivo].sum())
+    return elenco, info
@@ -0,0 +1,402 @@
+import argparse
+import base64
+import gzip
+import hashlib
+import json
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from src.database.database import ReadOnlyConnectionPool, get_data_version
+from src.load.schema import COLUNAS_PERCENTIL
+
+# Colunas devolvidas para cada jogador (mesmas da view 'players', com a chave da versão).
+# '{colunas_extras}' recebe colunas calculadas antes das demais (ver _select_jogador).
+SELECT_JOGADOR = """
+SELECT
+    {colunas_extras}v.version_id,
+    v.player_id,
+    v.nome,
+    COALESCE(co.nome, 'Desconhecido') AS pais,
+    COALESCE(po.nome, 'Desconhecida') AS posicao,
+    COALESCE(cl.nome, 'Sem Clube') AS clube,
+    v.idade,
+    v.salario,
+    v.valor,
+    v.classificacao_atual,
+    v.classificacao_potencial,
+    ra.nome AS sufixo_atual,
+    rp.nome AS sufixo_potencial,
+    pp.faixa_etaria,
+    pp.pct_atual,
+    pp.pct_potencial,
+    pp.pct_valor,
+    pp.pct_salario
+FROM player_versions v
+LEFT JOIN countries co ON co.country_id = v.country_id
+LEFT JOIN positions po ON po.position_id = v.position_id
+LEFT JOIN clubs cl ON cl.club_id = v.club_id
+LEFT JOIN roles ra ON ra.role_id = v.role_atual_id
+LEFT JOIN roles rp ON rp.role_id = v.role_potencial_id
+LEFT JOIN player_percentiles pp ON pp.snapshot_id = :snapshot AND pp.version_id = v.version_id
+WHERE v.valid_from <= :snapshot AND (v.valid_to IS NULL OR v.valid_to > :snapshot)
+"""
+
+# Colunas aceitas para ordenação e top-N
+COLUNAS_ORDEM = [
+    'classificacao_potencial', 'classificacao_atual', 'valor', 'salario', 'idade'
+] + list(COLUNAS_PERCENTIL.values())
+
+# Colunas aceitas para agrupar o top-N (parâmetro 'por')
+COLUNAS_GRUPO = {
+    'funcao': 'ra.nome', 'posicao': 'po.nome', 'clube': 'cl.nome', 'pais': 'co.nome', 'faixa_etaria': 'pp.faixa_etaria'
+}
+
+LIMITE_PADRAO = 50
+LIMITE_MAXIMO = 500
+
+# Respostas menores que isso não compensam a compressão
+GZIP_MINIMO = 1024
+
+# Erro de parâmetro inválido, devolvido como HTTP 400
+class RequisicaoInvalida(ValueError):
+    pass
+
+# Lê um parâmetro numérico opcional da query string.
+def _numero(params: dict, nome: str, tipo=float):
+    if nome not in params:
+        return None
+    try:
+        return tipo(params[nome][-1])
+    except ValueError:
+        raise RequisicaoInvalida(f"Parâmetro '{nome}' deve ser numérico.")
+
+# Lê um limite de linhas da query string: 'padrao' quando ausente, entre 1 e LIMITE_MAXIMO.
+def _limite(params: dict, nome: str, padrao: int) -> int:
+    valor = _numero(params, nome, int)
+    if valor is None:
+        return padrao
+    if valor < 1:
+        raise RequisicaoInvalida(f"Parâmetro '{nome}' deve ser maior que zero.")
+    return min(valor, LIMITE_MAXIMO)
+
+# SELECT_JOGADOR com as colunas extras ('expressão AS nome') no início da lista.
+def _select_jogador(*colunas_extras: str) -> str:
+    return SELECT_JOGADOR.format(colunas_extras=''.join(f"{coluna},\n    " for coluna in colunas_extras))
+
+# Lê uma lista de valores (repetindo o parâmetro ou separando por vírgula).
+def _lista(params: dict, nome: str) -> list:
+    valores = []
+    for valor in params.get(nome, []):
+        valores.extend(v.strip() for v in valor.split(',') if v.strip())
+    return valores
+
+# Traduz os filtros da sidebar do dashboard em condições SQL.
+def build_filters(params: dict) -> tuple:
+    condicoes, argumentos = [], {}
+
+    nome = params.get('nome', [''])[-1]
+    if nome:
+        condicoes.append("v.nome LIKE :nome ESCAPE '\\'")
+        argumentos['nome'] = '%' + nome.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+    funcoes = _lista(params, 'funcao')
+    if funcoes:
+        # Mesmo critério do dashboard: a função contém algum dos códigos escolhidos
+        termos = []
+        for i, funcao in enumerate(funcoes):
+            termos.append(f"instr(ra.nome, :funcao{i}) > 0")
+            argumentos[f'funcao{i}'] = funcao
+        condicoes.append(f"({' OR '.join(termos)})")
+
+    for nome_param, expressao in [
+        ('posicao', "COALESCE(po.nome, 'Desconhecida')"),
+        ('clube', "COALESCE(cl.nome, 'Sem Clube')"),
+        ('pais', "COALESCE(co.nome, 'Desconhecido')"),
+        ('faixa_etaria', 'pp.faixa_etaria'),
+    ]:
+        valores = _lista(params, nome_param)
+        if valores:
+            marcadores = []
+            for i, valor in enumerate(valores):
+                marcadores.append(f":{nome_param}{i}")
+                argumentos[f'{nome_param}{i}'] = valor
+            condicoes.append(f"{expressao} IN ({', '.join(marcadores)})")
+
+    for nome_param, coluna in [
+        ('idade', 'v.idade'), ('potencial', 'v.classificacao_potencial'), ('valor', 'v.valor')
+    ]:
+        minimo, maximo = _numero(params, f'{nome_param}_min'), _numero(params, f'{nome_param}_max')
+        if minimo is not None:
+            condicoes.append(f"{coluna} >= :{nome_param}_min")
+            argumentos[f'{nome_param}_min'] = minimo
+        if maximo is not None:
+            condicoes.append(f"{coluna} <= :{nome_param}_max")
+            argumentos[f'{nome_param}_max'] = maximo
+
+    # Percentil mínimo na coorte (0-100), como no filtro de coorte do dashboard
+    percentil_min = _numero(params, 'percentil_min')
+    if percentil_min is not None:
+        coluna_pct = params.get('percentil', ['pct_potencial'])[-1]
+        if coluna_pct not in COLUNAS_PERCENTIL.values():
+            raise RequisicaoInvalida(f"Percentil '{coluna_pct}' inválido.")
+        condicoes.append(f"pp.{coluna_pct} >= :percentil_min")
+        argumentos['percentil_min'] = percentil_min / 100
+
+    return condicoes, argumentos
+
+# Codifica/decodifica o cursor da paginação por chave: (valor da ordenação, version_id) do último item.
+def encode_cursor(valor, version_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([valor, version_id]).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        valor, version_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        return float(valor), int(version_id)
+    except (ValueError, TypeError):
+        raise RequisicaoInvalida("Cursor inválido.")
+
+# Consultas da API sobre o esquema normalizado, com uma conexão somente leitura por thread.
+class PlayerQueryService:
+    def __init__(self, db_path: str = None):
+        self.pool = ReadOnlyConnectionPool(db_path)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = self.pool.get()
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    # Versão dos dados (snapshot mais recente); muda a cada carga nova.
+    def version(self) -> str:
+        return get_data_version(self._conn())
+
+    def snapshots(self) -> list:
+        linhas = self._conn().execute("SELECT snapshot_id, data_snapshot FROM snapshots ORDER BY snapshot_id")
+        return [dict(linha) for linha in linhas]
+
+    # Id do snapshot pedido (padrão: o mais recente).
+    def _snapshot_id(self, params: dict) -> int:
+        snapshot = _numero(params, 'snapshot', int)
+        if snapshot is None:
+            snapshot = self._conn().execute("SELECT MAX(snapshot_id) FROM snapshots").fetchone()[0]
+        if snapshot is None:
+            raise RequisicaoInvalida("O banco ainda não tem snapshots.")
+        return snapshot
+
+    # Ordenação pedida: coluna da whitelist e sentido; nulos sempre por último.
+    @staticmethod
+    def _ordem(params: dict) -> tuple:
+        coluna = params.get('ordem', ['classificacao_potencial'])[-1]
+        if coluna not in COLUNAS_ORDEM:
+            raise RequisicaoInvalida(f"Ordenação por '{coluna}' não suportada.")
+        crescente = params.get('sentido', ['desc'])[-1] == 'asc'
+        prefixo = 'pp' if coluna in COLUNAS_PERCENTIL.values() else 'v'
+        nulo = '1e300' if crescente else '-1e300'
+        return f"COALESCE({prefixo}.{coluna}, {nulo})", crescente
+
+    # Lista filtrada com paginação por chave (sem OFFSET): cada página continua depois do cursor.
+    def players(self, params: dict) -> dict:
+        snapshot_id = self._snapshot_id(params)
+        condicoes, argumentos = build_filters(params)
+        chave, crescente = self._ordem(params)
+        limite = _limite(params, 'limit', LIMITE_PADRAO)
+
+        cursor = params.get('cursor', [None])[-1]
+        if cursor:
+            valor, version_id = decode_cursor(cursor)
+            condicoes.append(f"({chave}, v.version_id) {'>' if crescente else '<'} (:cursor_valor, :cursor_id)")
+            argumentos.update(cursor_valor=valor, cursor_id=version_id)
+
+        sentido = 'ASC' if crescente else 'DESC'
+        sql = (
+            f"SELECT * FROM ({_select_jogador(f'{chave} AS _chave')}{''.join(' AND ' + c for c in condicoes)} "
+            f"ORDER BY {chave} {sentido}, v.version_id {sentido} LIMIT :limite)"
+        )
+        linhas = self._conn().execute(sql, {**argumentos, 'snapshot': snapshot_id, 'limite': limite + 1}).fetchall()
+
+        itens = [dict(linha) for linha in linhas[:limite]]
+        proximo = None
+        if len(linhas) > limite:
+            proximo = encode_cursor(itens[-1]['_chave'], itens[-1]['version_id'])
+        for item in itens:
+            del item['_chave']
+        return {'snapshot_id': snapshot_id, 'items': itens, 'next_cursor': proximo}
+
+    # Top-N por uma coluna, no total ou dentro de cada grupo ('por').
+    def top(self, params: dict) -> dict:
+        snapshot_id = self._snapshot_id(params)
+        condicoes, argumentos = build_filters(params)
+        params = {**params, 'ordem': params.get('coluna', ['classificacao_potencial'])}
+        chave, crescente = self._ordem(params)
+        n = _limite(params, 'n', 10)
+        sentido = 'ASC' if crescente else 'DESC'
+
+        por = params.get('por', [None])[-1]
+        if por is not None and por not in COLUNAS_GRUPO:
+            raise RequisicaoInvalida(f"Agrupamento por '{por}' não suportado.")
+        particao = f"PARTITION BY {COLUNAS_GRUPO[por]} " if por else ""
+        sql_base = _select_jogador(
+            f"ROW_NUMBER() OVER ({particao}ORDER BY {chave} {sentido}, v.version_id) AS posicao_ranking",
+            f"{COLUNAS_GRUPO[por] if por else 'NULL'} AS grupo"
+        )
+        sql = (
+            f"SELECT * FROM ({sql_base}{''.join(' AND ' + c for c in condicoes)}) "
+            f"WHERE posicao_ranking <= :n ORDER BY grupo, posicao_ranking"
+        )
+        linhas = self._conn().execute(sql, {**argumentos, 'snapshot': snapshot_id, 'n': n}).fetchall()
+        return {'snapshot_id': snapshot_id, 'items': [dict(linha) for linha in linhas]}
+
+    # Histórico de um jogador (pelo player_id), um registro por snapshot.
+    def history(self, player_id: int) -> dict:
+        linhas = self._conn().execute(
+            "SELECT * FROM players WHERE player_id = ? ORDER BY data_snapshot", (player_id,)
+        ).fetchall()
+        return {'player_id': player_id, 'items': [dict(linha) for linha in linhas]}
+
+# Cache LRU das respostas já serializadas (e comprimidas), descartado quando a versão dos dados muda.
+class ResponseCache:
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.version = None
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, version: str, chave: tuple):
+        with self._lock:
+            if version != self.version:
+                self._itens.clear()
+                self.version = version
+                return None
+            item = self._itens.get(chave)
+            if item is not None:
+                self._itens.move_to_end(chave)
+            return item
+
+    def put(self, version: str, chave: tuple, item) -> None:
+        with self._lock:
+            if version != self.version:
+                return
+            self._itens[chave] = item
+            if len(self._itens) > self.max_entries:
+                self._itens.popitem(last=False)
+
+# ETag: versão dos dados + rota/parâmetros (normalizados); igual enquanto não houver carga nova.
+def make_etag(version: str, caminho: str, params: dict) -> str:
+    normalizado = json.dumps([version, caminho, sorted((k, v) for k, v in params.items())])
+    return '"' + hashlib.sha1(normalizado.encode()).hexdigest()[:20] + '"'
+
+class APIRequestHandler(BaseHTTPRequestHandler):
+    server_version = "FMScoutAPI/1.0"
+
+    def do_GET(self) -> None:
+        partes = urlsplit(self.path)
+        caminho = partes.path.rstrip('/') or '/'
+        params = parse_qs(partes.query)
+        servico = self.server.service
+
+        try:
+            version = servico.version()
+            etag = make_etag(version, caminho, params)
+            if etag in [t.strip() for t in self.headers.get('If-None-Match', '').split(',')]:
+                self._responder(304, etag=etag)
+                return
+
+            aceita_gzip = 'gzip' in self.headers.get('Accept-Encoding', '')
+            chave = (etag, aceita_gzip)
+            cache = self.server.cache.get(version, chave)
+            if cache is None:
+                corpo = json.dumps(self._rota(servico, caminho, params), ensure_ascii=False).encode('utf-8')
+                comprimido = aceita_gzip and len(corpo) >= GZIP_MINIMO
+                if comprimido:
+                    corpo = gzip.compress(corpo, compresslevel=5)
+                cache = (corpo, comprimido)
+                self.server.cache.put(version, chave, cache)
+            corpo, comprimido = cache
+            self._responder(200, corpo, etag=etag, gzip_=comprimido)
+        except RequisicaoInvalida as e:
+            self._responder(400, json.dumps({'erro': str(e)}).encode('utf-8'))
+        except LookupError as e:
+            self._responder(404, json.dumps({'erro': str(e)}).encode('utf-8'))
+        except sqlite3.Error as e:
+            print(f"Erro ao consultar o banco: {e}", file=sys.stderr)
+            self._responder(500, json.dumps({'erro': 'Erro ao consultar o banco.'}).encode('utf-8'))
+
+    # Roteia o caminho para a consulta correspondente.
+    def _rota(self, servico: PlayerQueryService, caminho: str, params: dict) -> dict:
+        if caminho == '/players':
+            return servico.players(params)
+        if caminho == '/top':
+            return servico.top(params)
+        if caminho == '/snapshots':
+            return {'items': servico.snapshots()}
+        partes = caminho.strip('/').split('/')
+        if len(partes) == 3 and partes[0] == 'players' and partes[2] == 'history':
+            try:
+                return servico.history(int(partes[1]))
+            except ValueError:
+                raise RequisicaoInvalida("player_id deve ser inteiro.")
+        raise LookupError(f"Rota '{caminho}' não encontrada.")
+
+    def _responder(self, status: int, corpo: bytes = b'', etag: str = None, gzip_: bool = False) -> None:
+        self.send_response(status)
+        if status != 304:
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(corpo)))
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Vary', 'Accept-Encoding')
+        if gzip_:
+            self.send_header('Content-Encoding', 'gzip')
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(corpo)
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+# Servidor HTTP com um número fixo de threads (cada uma mantém a sua conexão somente leitura).
+class APIServer(ThreadingHTTPServer):
+    # Fila de conexões maior que a padrão (5), para rajadas de clientes simultâneos
+    request_queue_size = 128
+
+    def __init__(self, endereco: tuple, db_path: str = None, workers: int = 16, verbose: bool = False):
+        super().__init__(endereco, APIRequestHandler)
+        self.service = PlayerQueryService(db_path)
+        self.cache = ResponseCache()
+        self.verbose = verbose
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='api')
+
+    def process_request(self, request, client_address) -> None:
+        self._executor.submit(self.process_request_thread, request, client_address)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self._executor.shutdown(wait=True)
+        self.service.pool.close()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="API HTTP local (JSON) sobre o banco de jogadores.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--db', default=None, help="Caminho do banco (padrão: database/fm_database.db)")
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    servidor = APIServer((args.host, args.port), args.db, args.workers, args.verbose)
+    print(f"API ouvindo em http://{args.host}:{servidor.server_address[1]}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+if __name__ == '__main__':
+    main()
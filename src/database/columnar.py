@@ -0,0 +1,103 @@
+import os
+import sqlite3
+import sys
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# Cópia colunar da view de jogadores num arquivo Arrow IPC (sem compressão), gravada pelo pipeline
+# ao lado do banco. O dashboard abre o arquivo com mmap: as colunas numéricas viram arrays NumPy
+# somente leitura apontando direto para o arquivo, então todas as sessões (e todos os processos do
+# servidor) compartilham as mesmas páginas em memória. Textos são gravados como dicionário e,
+# ao abrir, cada valor distinto vira um único objeto str compartilhado pelas linhas.
+
+# Chave dos metadados do arquivo com a versão dos dados (MAX(data_snapshot) do banco)
+CHAVE_VERSAO = b'data_version'
+
+def _pyarrow():
+    try:
+        import pyarrow
+        return pyarrow
+    except ImportError:
+        return None
+
+# Caminho do arquivo colunar de um banco (mesmo nome, extensão .arrow).
+def columnar_path(db_path: str) -> str:
+    return os.path.splitext(db_path)[0] + '.arrow'
+
+# Converte uma coluna do pandas para Arrow: números ficam como estão (NaN é valor, não nulo,
+# para a leitura poder ser sem cópia); textos viram dicionário.
+def _to_arrow(serie: pd.Series):
+    pa = _pyarrow()
+    if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+        return pa.array(serie.to_numpy())
+    texto = serie.astype(object).where(serie.notna(), None)
+    return pa.array(texto, type=pa.string(), from_pandas=True).dictionary_encode()
+
+# Grava o conteúdo de 'table_name' no arquivo colunar (troca atômica: leitores nunca veem meio arquivo).
+# Retorna o caminho gravado, ou None se o pyarrow não estiver instalado.
+def write_columnar(db_path: str, table_name: str = 'players', path: str = None) -> Optional[str]:
+    pa = _pyarrow()
+    if pa is None:
+        print("pyarrow não instalado: cópia colunar não gerada (o dashboard lerá do SQLite).")
+        return None
+    path = path or columnar_path(db_path)
+
+    from src.database.database import get_data_version
+
+    conn = sqlite3.connect(db_path)
+    try:
+        versao = get_data_version(conn, table_name)
+        df = pd.read_sql_query(f"SELECT * FROM {table_name}", conn)
+    finally:
+        conn.close()
+
+    tabela = pa.table(
+        {coluna: _to_arrow(df[coluna]) for coluna in df.columns},
+        metadata={CHAVE_VERSAO: str(versao or '').encode()}
+    )
+    temporario = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(temporario, 'wb') as destino:
+        with pa.ipc.new_file(destino, tabela.schema) as escritor:
+            # Um único lote: cada coluna fica contígua no arquivo
+            escritor.write_table(tabela, max_chunksize=max(len(df), 1))
+    os.replace(temporario, path)
+    print(f"Cópia colunar gravada em '{path}' ({len(df)} linhas).")
+    return path
+
+# Versão dos dados gravada no arquivo colunar (None se o arquivo não existe ou não pode ser lido).
+def read_columnar_version(path: str) -> Optional[str]:
+    pa = _pyarrow()
+    if pa is None or not os.path.exists(path):
+        return None
+    try:
+        with pa.memory_map(path) as origem:
+            metadados = pa.ipc.open_file(origem).schema.metadata or {}
+    except (OSError, pa.ArrowInvalid) as e:
+        print(f"Arquivo colunar ilegível '{path}': {e}", file=sys.stderr)
+        return None
+    return metadados.get(CHAVE_VERSAO, b'').decode() or None
+
+# Tabela Arrow do arquivo colunar, com os buffers apontando para o mmap (nada é copiado).
+def open_columnar_table(path: str):
+    pa = _pyarrow()
+    return pa.ipc.open_file(pa.memory_map(path)).read_all()
+
+# Abre o arquivo colunar como DataFrame. Colunas numéricas são views somente leitura do mmap
+# (sem cópia); textos são montados a partir do dicionário de cada coluna.
+def open_columnar(path: str) -> pd.DataFrame:
+    pa = _pyarrow()
+    tabela = open_columnar_table(path)
+    colunas = {}
+    for nome, coluna in zip(tabela.column_names, tabela.columns):
+        array = coluna.combine_chunks() if coluna.num_chunks != 1 else coluna.chunk(0)
+        if pa.types.is_dictionary(array.type):
+            valores = np.append(array.dictionary.to_numpy(zero_copy_only=False).astype(object), None)
+            indices = array.indices.fill_null(len(array.dictionary)).to_numpy()
+            colunas[nome] = valores[indices]
+        else:
+            valores = array.to_numpy(zero_copy_only=True)
+            valores.flags.writeable = False
+            colunas[nome] = valores
+    return pd.DataFrame(colunas, copy=False)
@@ -0,0 +1,346 @@
+import os
+import sqlite3
+import pandas as pd
+import threading
+import sys
+from typing import Callable, Optional
+from urllib.request import pathname2url
+from src.database.columnar import read_columnar_version, open_columnar
+from src.analysis.cube import cube_level, COLUNAS_MEDIDAS, MEDIDAS_CUBO
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Banco usado pelo dashboard e pelo runner; FM_DB_PATH aponta para outro arquivo (ex.: testes de carga)
+DB_PATH = os.environ.get('FM_DB_PATH') or os.path.join(BASE_DIR, 'database', 'fm_database.db')
+
+# Parâmetros de leitura do dashboard: mapeia até 256 MB do arquivo e mantém ~64 MB de cache de páginas
+MMAP_SIZE = 256 * 1024 * 1024
+CACHE_SIZE_KB = 64 * 1024
+
+# Resolve o caminho do banco a partir da raiz do projeto (mesma regra do pipeline.py).
+def resolve_db_path(db_path: str = None) -> str:
+    if db_path is None:
+        return DB_PATH
+    if os.path.isabs(db_path):
+        return db_path
+    return os.path.join(BASE_DIR, db_path)
+
+# Abre uma conexão somente leitura (mode=ro + query_only) ajustada para consultas do dashboard.
+def connect_readonly(db_path: str, mmap_size: int = MMAP_SIZE, cache_size_kb: int = CACHE_SIZE_KB) -> sqlite3.Connection:
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"Banco de dados não encontrado em '{db_path}'. Rode 'python pipeline.py' para criá-lo.")
+
+    uri = f"file:{pathname2url(os.path.abspath(db_path))}?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    conn.execute("PRAGMA query_only = ON")
+    conn.execute(f"PRAGMA mmap_size = {int(mmap_size)}")
+    conn.execute(f"PRAGMA cache_size = -{int(cache_size_kb)}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    return conn
+
+# Mantém uma conexão somente leitura por thread, reaproveitada entre consultas.
+class ReadOnlyConnectionPool:
+    def __init__(self, db_path: str = None):
+        self.db_path = resolve_db_path(db_path)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+
+    # Retorna a conexão da thread atual, abrindo-a na primeira chamada.
+    def get(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = connect_readonly(self.db_path)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    # Fecha todas as conexões abertas pelo pool.
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except sqlite3.Error as e:
+                    print(f"Erro ao fechar conexão: {e}", file=sys.stderr)
+            self._connections = []
+        self._local = threading.local()
+
+# Retorna a versão dos dados: o snapshot mais recente gravado no banco.
+# No esquema normalizado basta ler a dimensão 'snapshots'; no legado, a própria tabela.
+def get_data_version(conn: sqlite3.Connection, table_name: str = 'players') -> Optional[str]:
+    tem_snapshots = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'snapshots'"
+    ).fetchone()
+    origem = 'snapshots' if tem_snapshots else table_name
+    return conn.execute(f"SELECT MAX(data_snapshot) FROM {origem}").fetchone()[0]
+
+# Mantém o histórico de jogadores em memória e, quando a versão muda, busca só os snapshots novos.
+# Com 'columnar_path', usa a cópia colunar mapeada em memória sempre que ela está na mesma versão do
+# banco, também depois de um snapshot novo (ver src/database/columnar.py); senão, lê do SQLite.
+class IncrementalPlayerFrame:
+    def __init__(self, table_name: str = 'players', prepare: Callable[[pd.DataFrame], pd.DataFrame] = None,
+                 columnar_path: str = None):
+        self.table_name = table_name
+        self.prepare = prepare
+        self.columnar_path = columnar_path
+        self.df = None
+        self.version = None
+        self._lock = threading.Lock()
+
+    # Verdadeiro se a cópia colunar existe e está na versão 'versao' do banco.
+    def _columnar_current(self, versao: Optional[str]) -> bool:
+        return bool(self.columnar_path) and versao is not None and read_columnar_version(self.columnar_path) == versao
+
+    # Lê as linhas do banco (todas, ou apenas as posteriores a 'desde') e aplica o preparo.
+    def _read(self, conn: sqlite3.Connection, desde: Optional[str] = None, versao: Optional[str] = None) -> pd.DataFrame:
+        if desde is None and self._columnar_current(versao):
+            print(f"Abrindo cópia colunar '{self.columnar_path}' (mmap).")
+            df = open_columnar(self.columnar_path)
+        elif desde is None:
+            df = pd.read_sql_query(f"SELECT * FROM {self.table_name}", conn)
+        else:
+            df = pd.read_sql_query(
+                f"SELECT * FROM {self.table_name} WHERE data_snapshot > ?", conn, params=(desde,)
+            )
+        if self.prepare is not None:
+            df = self.prepare(df)
+        return df
+
+    # Sincroniza o DataFrame em memória com a versão atual do banco e o retorna.
+    def refresh(self, conn: sqlite3.Connection) -> pd.DataFrame:
+        version = get_data_version(conn, self.table_name)
+        with self._lock:
+            if self.df is None or self.version is None or version is None or version < self.version:
+                # Primeira carga (ou banco recriado): leitura completa
+                self.df = self._read(conn, versao=version)
+            elif version != self.version and self._columnar_current(version):
+                # A carga já gravou a cópia colunar da versão nova: reabri-la mantém as colunas mapeadas
+                # (um concat copiaria tudo para a memória do processo)
+                self.df = self._read(conn, versao=version)
+            elif version != self.version:
+                df_novos = self._read(conn, desde=self.version)
+                print(f"Anexando {len(df_novos)} linhas de snapshots novos ao cache.")
+                self.df = pd.concat([self.df, df_novos], ignore_index=True)
+            self.version = version
+            return self.df
+
+# Histórico completo de vários jogadores numa única consulta (player_id IN (...), pelo índice
+# ix_player_versions_player), ordenado por jogador e snapshot.
+def read_player_histories(conn: sqlite3.Connection, player_ids: list, table_name: str = 'players') -> pd.DataFrame:
+    ids = [int(p) for p in player_ids]
+    if not ids:
+        return pd.read_sql_query(f"SELECT * FROM {table_name} WHERE 0", conn)
+    return pd.read_sql_query(
+        f"SELECT * FROM {table_name} WHERE player_id IN ({', '.join('?' * len(ids))}) ORDER BY player_id, data_snapshot",
+        conn, params=ids
+    )
+
+# Séries históricas por jogador em memória. Cada chamada busca, numa consulta só, apenas os jogadores
+# que ainda não estão no cache; uma versão nova dos dados descarta tudo. Guarda no máximo
+# 'max_jogadores' séries (as usadas há mais tempo saem primeiro).
+class PlayerHistoryCache:
+    def __init__(self, table_name: str = 'players', prepare: Callable[[pd.DataFrame], pd.DataFrame] = None,
+                 max_jogadores: int = 500):
+        self.table_name = table_name
+        self.prepare = prepare
+        self.max_jogadores = max_jogadores
+        self.series = {}
+        self.version = None
+        self.consultas = 0
+        self._lock = threading.Lock()
+
+    # Retorna o histórico dos jogadores pedidos, na ordem de 'player_ids'.
+    def get(self, conn: sqlite3.Connection, player_ids: list, versao) -> pd.DataFrame:
+        ids = list(dict.fromkeys(int(p) for p in player_ids))
+        with self._lock:
+            if versao != self.version:
+                self.series = {}
+                self.version = versao
+            faltando = [p for p in ids if p not in self.series]
+            if faltando:
+                df = read_player_histories(conn, faltando, self.table_name)
+                self.consultas += 1
+                if self.prepare is not None:
+                    df = self.prepare(df)
+                grupos = dict(list(df.groupby('player_id', sort=False)))
+                for p in faltando:
+                    self.series[p] = grupos.get(p, df.iloc[:0])
+            for p in ids:
+                # Reinsere no fim: o dicionário fica em ordem de uso
+                self.series[p] = self.series.pop(p)
+            while len(self.series) > max(self.max_jogadores, len(ids)):
+                self.series.pop(next(iter(self.series)))
+            partes = [self.series[p] for p in ids]
+        if not partes:
+            return pd.DataFrame()
+        return pd.concat(partes, ignore_index=True)
+
+# Dimensões do cubo de talentos pelo nome usado no dashboard: nome -> (coluna do cubo, tabela com o nome, nulo)
+DIMENSOES_LEITURA_CUBO = {
+    'clube': ('club_id', 'clubs', 'Sem Clube'),
+    'pais': ('country_id', 'countries', 'Desconhecido'),
+    'faixa_etaria': ('faixa_etaria', None, None),
+    'funcao': ('role_token_id', 'role_tokens', None),
+}
+
+def _has_table(conn: sqlite3.Connection, nome: str) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (nome,)).fetchone() is not None
+
+# Curvas de crescimento gravadas pela carga (tabela 'player_growth'), com nome e clube da versão atual.
+# Filtra por jogadores, déficit máximo até o potencial e idade máxima; ordena pelo déficit (índice
+# ix_player_growth_deficit). Bancos sem a tabela (esquema anterior) retornam um DataFrame vazio.
+def read_growth(conn: sqlite3.Connection, player_ids: list = None, deficit_max: float = None,
+                idade_max: float = None, limite: int = None) -> pd.DataFrame:
+    if not _has_table(conn, 'player_growth'):
+        return pd.DataFrame()
+    condicoes, params = [], []
+    if player_ids is not None:
+        condicoes.append(f"g.player_id IN ({', '.join('?' * len(player_ids))})")
+        params += [int(p) for p in player_ids]
+    if deficit_max is not None:
+        condicoes.append("g.deficit_potencial <= ?")
+        params.append(float(deficit_max))
+    if idade_max is not None:
+        condicoes.append("g.idade_ref <= ?")
+        params.append(float(idade_max))
+    where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+    limit = f"LIMIT {int(limite)}" if limite is not None else ""
+    return pd.read_sql_query(
+        f"""
+        SELECT g.*, v.nome, cl.nome AS clube
+        FROM player_growth g
+        LEFT JOIN player_versions v ON v.player_id = g.player_id AND v.valid_to IS NULL
+        LEFT JOIN clubs cl ON cl.club_id = v.club_id
+        {where}
+        ORDER BY g.deficit_potencial NULLS LAST, g.idade_ref
+        {limit}
+        """,
+        conn, params=params
+    )
+
+# Watchlists com o número de jogadores e de alertas pendentes de cada uma.
+def read_watchlists(conn: sqlite3.Connection) -> pd.DataFrame:
+    if not _has_table(conn, 'watchlists'):
+        return pd.DataFrame(columns=['watchlist_id', 'nome', 'jogadores', 'pendentes'])
+    return pd.read_sql_query(
+        """
+        SELECT w.watchlist_id, w.nome,
+            (SELECT COUNT(*) FROM watchlist_players p WHERE p.watchlist_id = w.watchlist_id) AS jogadores,
+            (SELECT COUNT(*) FROM alerts a WHERE a.watchlist_id = w.watchlist_id AND a.lido = 0) AS pendentes
+        FROM watchlists w
+        ORDER BY w.nome
+        """,
+        conn
+    )
+
+# Jogadores de uma watchlist, com nome e clube da versão atual (vazios para quem saiu do export).
+def read_watchlist_players(conn: sqlite3.Connection, watchlist_id: int) -> pd.DataFrame:
+    if not _has_table(conn, 'watchlist_players'):
+        return pd.DataFrame(columns=['player_id', 'nome', 'clube'])
+    return pd.read_sql_query(
+        """
+        SELECT w.player_id, v.nome, cl.nome AS clube
+        FROM watchlist_players w
+        LEFT JOIN player_versions v ON v.player_id = w.player_id AND v.valid_to IS NULL
+        LEFT JOIN clubs cl ON cl.club_id = v.club_id
+        WHERE w.watchlist_id = ?
+        ORDER BY v.nome
+        """,
+        conn, params=(int(watchlist_id),)
+    )
+
+# Regras de alerta; 'watchlist' fica nulo nas regras que valem para todas as watchlists.
+def read_alert_rules(conn: sqlite3.Connection) -> pd.DataFrame:
+    if not _has_table(conn, 'alert_rules'):
+        return pd.DataFrame(columns=['rule_id', 'watchlist_id', 'watchlist', 'tipo', 'limiar'])
+    return pd.read_sql_query(
+        """
+        SELECT r.rule_id, r.watchlist_id, w.nome AS watchlist, r.tipo, r.limiar
+        FROM alert_rules r
+        LEFT JOIN watchlists w ON w.watchlist_id = r.watchlist_id
+        ORDER BY r.rule_id
+        """,
+        conn
+    )
+
+# Alertas gravados pela carga, do snapshot mais recente para o mais antigo (só os não lidos,
+# com 'pendentes'). Usa o índice ix_alerts_pendentes.
+def read_alerts(conn: sqlite3.Connection, pendentes: bool = True, limite: int = None) -> pd.DataFrame:
+    colunas = ['alert_id', 'data_snapshot', 'watchlist', 'player_id', 'nome', 'clube', 'tipo', 'mensagem', 'lido']
+    if not _has_table(conn, 'alerts'):
+        return pd.DataFrame(columns=colunas)
+    where = "WHERE a.lido = 0" if pendentes else ""
+    limit = f"LIMIT {int(limite)}" if limite is not None else ""
+    return pd.read_sql_query(
+        f"""
+        SELECT a.alert_id, s.data_snapshot, w.nome AS watchlist, a.player_id, v.nome, cl.nome AS clube,
+            r.tipo, a.mensagem, a.lido
+        FROM alerts a
+        JOIN snapshots s ON s.snapshot_id = a.snapshot_id
+        JOIN watchlists w ON w.watchlist_id = a.watchlist_id
+        JOIN alert_rules r ON r.rule_id = a.rule_id
+        JOIN player_versions v ON v.version_id = a.version_id
+        LEFT JOIN clubs cl ON cl.club_id = v.club_id
+        {where}
+        ORDER BY a.snapshot_id DESC, a.alert_id
+        {limit}
+        """,
+        conn
+    )
+
+# Fatia do cubo de talentos (tabela 'talent_cube') de um snapshot (o mais recente, por padrão):
+# agrupada por 'agrupar' e restrita a 'filtros' (nome da dimensão -> valor; None = sem valor), ambos com
+# as chaves de DIMENSOES_LEITURA_CUBO. Adicionar dimensões em 'agrupar' é o drill-down e removê-las, o
+# roll-up: cada combinação é um nível já materializado, então a consulta lê só as linhas desse nível
+# (índice ix_talent_cube_nivel) e custa o número de grupos, não o de jogadores. Inclui as médias
+# (media_<métrica> = soma / contagem). Sem o cubo (esquema anterior), retorna um DataFrame vazio.
+def read_cube(conn: sqlite3.Connection, agrupar: list, filtros: dict = None, data_snapshot: str = None) -> pd.DataFrame:
+    filtros = filtros or {}
+    desconhecidas = (set(agrupar) | set(filtros)) - set(DIMENSOES_LEITURA_CUBO)
+    if desconhecidas:
+        raise KeyError(f"Dimensões fora do cubo: {sorted(desconhecidas)}. Use {list(DIMENSOES_LEITURA_CUBO)}.")
+    colunas = list(agrupar) + ['jogadores'] + [c for c in COLUNAS_MEDIDAS if c != 'jogadores'] + \
+        [f'media_{prefixo}' for prefixo in MEDIDAS_CUBO]
+    if not _has_table(conn, 'talent_cube'):
+        return pd.DataFrame(columns=colunas)
+
+    nivel = cube_level(DIMENSOES_LEITURA_CUBO[d][0] for d in set(agrupar) | set(filtros))
+    selecao, juncoes, condicoes = [], [], ["c.nivel = ?"]
+    params = [nivel]
+    for nome, (coluna, tabela, _) in DIMENSOES_LEITURA_CUBO.items():
+        if nome not in agrupar and nome not in filtros:
+            continue
+        expressao = f"c.{coluna}"
+        if tabela is not None:
+            juncoes.append(f"LEFT JOIN {tabela} d_{nome} ON d_{nome}.{coluna} = c.{coluna}")
+            expressao = f"d_{nome}.nome"
+        if nome in agrupar:
+            selecao.append(f"{expressao} AS {nome}")
+        if nome in filtros:
+            if filtros[nome] is None:
+                condicoes.append(f"c.{coluna} IS NULL")
+            else:
+                condicoes.append(f"{expressao} = ?")
+                params.append(filtros[nome])
+    if data_snapshot is None:
+        condicoes.append("c.snapshot_id = (SELECT snapshot_id FROM snapshots ORDER BY data_snapshot DESC LIMIT 1)")
+    else:
+        condicoes.append("c.snapshot_id = (SELECT snapshot_id FROM snapshots WHERE data_snapshot = ?)")
+        params.append(data_snapshot)
+
+    fatia = pd.read_sql_query(
+        f"""
+        SELECT {', '.join(selecao + [f'c.{m}' for m in COLUNAS_MEDIDAS])}
+        FROM talent_cube c
+        {' '.join(juncoes)}
+        WHERE {' AND '.join(condicoes)}
+        """,
+        conn, params=params
+    )
+    for nome in agrupar:
+        if DIMENSOES_LEITURA_CUBO[nome][2] is not None:
+            fatia[nome] = fatia[nome].fillna(DIMENSOES_LEITURA_CUBO[nome][2])
+    for prefixo in MEDIDAS_CUBO:
+        fatia[f'media_{prefixo}'] = fatia[f'sum_{prefixo}'] / fatia[f'count_{prefixo}'].where(fatia[f'count_{prefixo}'] > 0)
+    return fatia[colunas]
@@ -1,18 +1,79 @@
 import pandas as pd
+import numpy as np
 import sys
+from src.transform.transform import COLUNAS_MAP, COLUNA_ID
+
+# Tipos declarados na leitura: texto fica como texto e só Idade/ID são inteiros
+TIPOS_EXTRACAO = {
+    'Nome': 'object',
+    'País': 'object',
+    'Posição': 'object',
+    'Clube': 'object',
+    'Idade': 'int64',
+    'Salário': 'object',
+    'Valor Venda': 'object',
+    'Melhor Classificação': 'object',
+    'Melhor Classificação Potencial': 'object',
+    COLUNA_ID: 'int64',
+}
+
+# Usa o motor CSV do PyArrow (multithread) quando disponível, senão o motor C do pandas.
+def _default_engine() -> str:
+    try:
+        import pyarrow  # noqa: F401
+        return 'pyarrow'
+    except ImportError:
+        return 'c'
+
+# Lê o CSV com o leitor multithread do PyArrow, declarando o tipo de cada coluna.
+def _read_csv_pyarrow(file_path: str, usecols: list, dtype: dict) -> pd.DataFrame:
+    import pyarrow as pa
+    from pyarrow import csv
+
+    # Texto é declarado como string para o PyArrow não inferir "1.970" como número
+    tipos = {c: (pa.string() if t == 'object' else pa.int64()) for c, t in dtype.items()}
+    tabela = csv.read_csv(
+        file_path,
+        read_options=csv.ReadOptions(encoding='latin1', use_threads=True),
+        parse_options=csv.ParseOptions(delimiter=';'),
+        convert_options=csv.ConvertOptions(
+            include_columns=usecols,
+            column_types=tipos,
+            strings_can_be_null=True
+        )
+    )
+    df = tabela.to_pandas()
+
+    # Nulos de texto viram NaN, como no motor C do pandas
+    colunas_texto = [c for c, t in dtype.items() if t == 'object']
+    df[colunas_texto] = df[colunas_texto].fillna(np.nan)
+    return df
 
 # Extrai dados de um arquivo .CSV
-def extract_data(file_path: str) -> pd.DataFrame:
+def extract_data(file_path: str, engine: str = None) -> pd.DataFrame:
     print(f"Iniciando extração de dados de: {file_path}")
     try:
+        # Lê apenas o cabeçalho para descobrir quais colunas necessárias existem no export
+        colunas_arquivo = pd.read_csv(file_path, sep=';', encoding='latin1', nrows=0).columns
+        colunas_desejadas = list(COLUNAS_MAP.keys()) + [COLUNA_ID]
+        usecols = [c for c in colunas_desejadas if c in colunas_arquivo]
+        dtype = {c: t for c, t in TIPOS_EXTRACAO.items() if c in usecols}
+
+        engine = engine or _default_engine()
+
         # Lê o CSV com os parâmetros específicos do Football Manager
-        df = pd.read_csv(
-            file_path, 
-            sep=';', 
-            encoding='latin1'
-        )
-        
-        print("Dados extraídos com sucesso. Retornando DataFrame bruto.")
+        if engine == 'pyarrow':
+            df = _read_csv_pyarrow(file_path, usecols, dtype)
+        else:
+            df = pd.read_csv(
+                file_path, 
+                sep=';', 
+                encoding='latin1',
+                usecols=usecols,
+                dtype=dtype
+            )
+
+        print(f"Dados extraídos com sucesso ({len(usecols)} colunas, motor '{engine}'). Retornando DataFrame bruto.")
         return df
 
     except FileNotFoundError:
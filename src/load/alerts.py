@@ -0,0 +1,193 @@
+import sqlite3
+import numpy as np
+import pandas as pd
+
+# Watchlists de scouts e regras de alerta avaliadas a cada carga. Uma regra vale para uma watchlist
+# (ou para todas, com watchlist_id nulo); os alertas disparados ficam na tabela 'alerts' até serem lidos.
+
+# Tipos de regra: tipo -> (descrição, limiar padrão). Os limiares são em pontos de classificação,
+# exceto 'valor_caiu' (em % do valor anterior); 'mudou_clube' não usa limiar.
+REGRAS_ALERTA = {
+    'potencial_subiu': ("Potencial subiu pelo menos N pontos", 2.0),
+    'atual_subiu': ("Qualidade atual subiu pelo menos N pontos", 2.0),
+    'valor_caiu': ("Valor de mercado caiu pelo menos N%", 20.0),
+    'mudou_clube': ("Mudou de clube", None),
+}
+
+DDL_WATCHLISTS = """
+CREATE TABLE IF NOT EXISTS watchlists (
+    watchlist_id INTEGER PRIMARY KEY,
+    nome TEXT NOT NULL UNIQUE,
+    criada_em TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS watchlist_players (
+    watchlist_id INTEGER NOT NULL REFERENCES watchlists (watchlist_id),
+    player_id INTEGER NOT NULL,
+    PRIMARY KEY (watchlist_id, player_id)
+);
+CREATE INDEX IF NOT EXISTS ix_watchlist_players_player ON watchlist_players (player_id);
+CREATE TABLE IF NOT EXISTS alert_rules (
+    rule_id INTEGER PRIMARY KEY,
+    watchlist_id INTEGER REFERENCES watchlists (watchlist_id),
+    tipo TEXT NOT NULL,
+    limiar REAL
+);
+CREATE TABLE IF NOT EXISTS alerts (
+    alert_id INTEGER PRIMARY KEY,
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots (snapshot_id),
+    rule_id INTEGER NOT NULL REFERENCES alert_rules (rule_id),
+    watchlist_id INTEGER NOT NULL REFERENCES watchlists (watchlist_id),
+    player_id INTEGER NOT NULL,
+    version_id INTEGER NOT NULL REFERENCES player_versions (version_id),
+    valor_anterior REAL,
+    valor_novo REAL,
+    mensagem TEXT NOT NULL,
+    lido INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (snapshot_id, rule_id, watchlist_id, player_id)
+);
+CREATE INDEX IF NOT EXISTS ix_alerts_pendentes ON alerts (lido, snapshot_id)
+"""
+
+# Versões gravadas no snapshot para jogadores de alguma watchlist, lado a lado com a versão anterior
+# de cada um. Parte de 'watchlist_players' e chega às versões pelo índice (player_id, valid_from):
+# só as linhas do snapshot novo são lidas, nunca o histórico inteiro. Como uma versão nova só é gravada
+# quando algum atributo muda, jogadores sem mudança nem aparecem aqui.
+SQL_CANDIDATOS = """
+SELECT
+    r.rule_id, r.tipo, r.limiar, w.watchlist_id, n.player_id, n.version_id, n.nome,
+    a.classificacao_potencial AS potencial_anterior, n.classificacao_potencial AS potencial_novo,
+    a.classificacao_atual AS atual_anterior, n.classificacao_atual AS atual_novo,
+    a.valor AS valor_anterior, n.valor AS valor_novo,
+    a.club_id AS club_anterior, n.club_id AS club_novo,
+    ca.nome AS clube_anterior, cn.nome AS clube_novo
+FROM watchlist_players w
+JOIN player_versions n ON n.player_id = w.player_id AND n.valid_from = :snapshot_id
+JOIN player_versions a ON a.version_id = (
+    SELECT p.version_id FROM player_versions p
+    WHERE p.player_id = n.player_id AND p.valid_from < n.valid_from
+    ORDER BY p.valid_from DESC LIMIT 1
+)
+JOIN alert_rules r ON r.watchlist_id IS NULL OR r.watchlist_id = w.watchlist_id
+LEFT JOIN clubs ca ON ca.club_id = a.club_id
+LEFT JOIN clubs cn ON cn.club_id = n.club_id
+"""
+
+# Cria as tabelas de watchlists e alertas, se ainda não existirem.
+def create_watchlist_tables(conn: sqlite3.Connection) -> None:
+    from src.load.schema import _execute_ddl
+    _execute_ddl(conn, DDL_WATCHLISTS)
+
+# Conexão de escrita para gerenciar watchlists e regras (ex.: pelo dashboard), com as tabelas garantidas.
+def connect_watchlists(db_path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, timeout=30)
+    with conn:
+        create_watchlist_tables(conn)
+    return conn
+
+# Texto do alerta de uma linha candidata que disparou a regra.
+def _mensagem(linha) -> str:
+    if linha.tipo == 'potencial_subiu':
+        return f"Potencial subiu de {linha.potencial_anterior:.1f} para {linha.potencial_novo:.1f} " \
+               f"({linha.potencial_novo - linha.potencial_anterior:+.1f})"
+    if linha.tipo == 'atual_subiu':
+        return f"Qualidade atual subiu de {linha.atual_anterior:.1f} para {linha.atual_novo:.1f} " \
+               f"({linha.atual_novo - linha.atual_anterior:+.1f})"
+    if linha.tipo == 'valor_caiu':
+        queda = (linha.valor_anterior - linha.valor_novo) / linha.valor_anterior * 100
+        return f"Valor caiu {queda:.0f}%: € {linha.valor_anterior:,.0f} → € {linha.valor_novo:,.0f}"
+    return f"Mudou de clube: {linha.clube_anterior or 'Sem Clube'} → {linha.clube_novo or 'Sem Clube'}"
+
+# Avalia as regras contra as versões gravadas no snapshot e grava os alertas disparados.
+# Rodar de novo para o mesmo snapshot não duplica alertas. Retorna o número de alertas novos.
+def evaluate_alerts(conn: sqlite3.Connection, snapshot_id: int) -> int:
+    candidatos = pd.read_sql_query(SQL_CANDIDATOS, conn, params={'snapshot_id': snapshot_id})
+    if candidatos.empty:
+        return 0
+
+    tipo = candidatos['tipo']
+    limiar = candidatos['limiar'].fillna(tipo.map({t: p for t, (_, p) in REGRAS_ALERTA.items()}))
+    anterior = pd.Series(np.nan, index=candidatos.index)
+    novo = pd.Series(np.nan, index=candidatos.index)
+    disparou = pd.Series(False, index=candidatos.index)
+    for regra, coluna in [('potencial_subiu', 'potencial'), ('atual_subiu', 'atual')]:
+        mascara = tipo == regra
+        anterior[mascara] = candidatos.loc[mascara, f'{coluna}_anterior']
+        novo[mascara] = candidatos.loc[mascara, f'{coluna}_novo']
+        disparou |= mascara & (novo - anterior >= limiar)
+
+    mascara = tipo == 'valor_caiu'
+    anterior[mascara] = candidatos.loc[mascara, 'valor_anterior']
+    novo[mascara] = candidatos.loc[mascara, 'valor_novo']
+    queda = (anterior - novo) / anterior.where(anterior > 0) * 100
+    disparou |= mascara & (queda >= limiar)
+
+    clube_anterior = candidatos['club_anterior'].astype('Int64')
+    clube_novo = candidatos['club_novo'].astype('Int64')
+    mudou = clube_anterior.ne(clube_novo).fillna(clube_anterior.isna() != clube_novo.isna()).astype(bool)
+    disparou |= (tipo == 'mudou_clube') & mudou
+
+    alertas = candidatos[disparou.to_numpy()].assign(
+        snapshot_id=snapshot_id, valor_anterior=anterior[disparou], valor_novo=novo[disparou]
+    )
+    if alertas.empty:
+        return 0
+    alertas['mensagem'] = [_mensagem(linha) for linha in alertas.itertuples(index=False)]
+
+    from src.load.schema import to_records
+    colunas = ['snapshot_id', 'rule_id', 'watchlist_id', 'player_id', 'version_id',
+               'valor_anterior', 'valor_novo', 'mensagem']
+    antes = conn.total_changes
+    conn.executemany(
+        f"INSERT OR IGNORE INTO alerts ({', '.join(colunas)}) VALUES ({', '.join('?' * len(colunas))})",
+        to_records(alertas[colunas])
+    )
+    novos = conn.total_changes - antes
+    print(f"Snapshot {snapshot_id}: {novos} alertas disparados para jogadores em watchlists.")
+    return novos
+
+# --- Gerenciamento (chamadas dentro de uma transação de quem abriu a conexão) ---
+
+# Cria uma watchlist (ou retorna a existente com esse nome) e devolve o id.
+def create_watchlist(conn: sqlite3.Connection, nome: str) -> int:
+    nome = nome.strip()
+    if not nome:
+        raise ValueError("A watchlist precisa de um nome.")
+    conn.execute("INSERT OR IGNORE INTO watchlists (nome) VALUES (?)", (nome,))
+    return conn.execute("SELECT watchlist_id FROM watchlists WHERE nome = ?", (nome,)).fetchone()[0]
+
+# Substitui os jogadores de uma watchlist.
+def set_watchlist_players(conn: sqlite3.Connection, watchlist_id: int, player_ids: list) -> None:
+    conn.execute("DELETE FROM watchlist_players WHERE watchlist_id = ?", (int(watchlist_id),))
+    conn.executemany(
+        "INSERT OR IGNORE INTO watchlist_players (watchlist_id, player_id) VALUES (?, ?)",
+        [(int(watchlist_id), int(p)) for p in player_ids]
+    )
+
+# Remove a watchlist com os seus jogadores, regras e alertas.
+def delete_watchlist(conn: sqlite3.Connection, watchlist_id: int) -> None:
+    for tabela in ('alerts', 'alert_rules', 'watchlist_players', 'watchlists'):
+        conn.execute(f"DELETE FROM {tabela} WHERE watchlist_id = ?", (int(watchlist_id),))
+
+# Cria uma regra (para uma watchlist, ou para todas com watchlist_id=None) e devolve o id.
+def add_rule(conn: sqlite3.Connection, tipo: str, limiar: float = None, watchlist_id: int = None) -> int:
+    if tipo not in REGRAS_ALERTA:
+        raise ValueError(f"Tipo de regra desconhecido: '{tipo}'. Use um de: {', '.join(REGRAS_ALERTA)}.")
+    if limiar is None:
+        limiar = REGRAS_ALERTA[tipo][1]
+    cursor = conn.execute(
+        "INSERT INTO alert_rules (watchlist_id, tipo, limiar) VALUES (?, ?, ?)",
+        (None if watchlist_id is None else int(watchlist_id), tipo, limiar)
+    )
+    return cursor.lastrowid
+
+# Remove uma regra e os alertas que ela disparou.
+def delete_rule(conn: sqlite3.Connection, rule_id: int) -> None:
+    conn.execute("DELETE FROM alerts WHERE rule_id = ?", (int(rule_id),))
+    conn.execute("DELETE FROM alert_rules WHERE rule_id = ?", (int(rule_id),))
+
+# Marca alertas como lidos (todos os pendentes, sem 'alert_ids').
+def mark_alerts_read(conn: sqlite3.Connection, alert_ids: list = None) -> None:
+    if alert_ids is None:
+        conn.execute("UPDATE alerts SET lido = 1 WHERE lido = 0")
+    else:
+        conn.executemany("UPDATE alerts SET lido = 1 WHERE alert_id = ?", [(int(a),) for a in alert_ids])
@@ -2,22 +2,62 @@ import pandas as pd
 import sqlite3
 import sys
 import os
+from src.load.schema import create_schema, migrate_schema, write_snapshots, format_snapshot, get_snapshot_id
+from src.load.publish import enable_wal, staging_path, open_staging, publish_staging, remove_staging
+from src.database.columnar import write_columnar
 
 # Carrega o DataFrame transformado em um banco de dados SQLite.
-def load_data(df: pd.DataFrame, db_path: str, table_name: str) -> None:
+# Os dados vão para o esquema normalizado (dimensões + histórico 'player_versions');
+# 'table_name' é o nome da view de compatibilidade com o formato antigo. Retorna o número de versões gravadas.
+# A carga é gravada num banco de staging e publicada numa transação curta (ver src/load/publish.py).
+def load_data(df: pd.DataFrame, db_path: str, table_name: str) -> int:
     print(f"Iniciando carga de dados para: {db_path}")
     os.makedirs(os.path.dirname(db_path), exist_ok=True)
     
     try:
-        with sqlite3.connect(db_path) as conn:
-            df.to_sql(
-                table_name,
-                conn,
-                if_exists='append', 
-                index=False          
-            )
+        conn = sqlite3.connect(db_path, isolation_level=None, timeout=30)
+        try:
+            enable_wal(conn)
+            try:
+                # Migração e criação do esquema direto no banco publicado (só muda algo na primeira carga
+                # ou numa troca de versão do esquema)
+                conn.execute("BEGIN IMMEDIATE")
+                migrado = migrate_schema(conn, table_name)
+                create_schema(conn, table_name)
+                conn.execute("COMMIT")
+            except Exception:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+
+            if migrado:
+                # Recupera o espaço do esquema anterior
+                conn.execute("VACUUM")
+
+            # A carga roda numa cópia (staging); o dashboard só enxerga o resultado quando ele é publicado
+            caminho_staging = staging_path(db_path)
+            staging, limites, marcador = open_staging(conn, caminho_staging)
+            try:
+                staging.execute("BEGIN IMMEDIATE")
+                total = write_snapshots(staging, df)
+                staging.execute("COMMIT")
+                datas = sorted(df['data_snapshot'].map(format_snapshot).unique())
+                snapshots = [get_snapshot_id(staging, data) for data in datas]
+                publish_staging(conn, caminho_staging, limites, marcador, snapshots, total)
+            finally:
+                staging.close()
+                remove_staging(caminho_staging)
+        finally:
+            conn.close()
         
-        print(f"Dados carregados com sucesso na tabela '{table_name}'.")
+        print(f"Dados carregados com sucesso: {total} versões gravadas (view '{table_name}').")
+
+        # Cópia colunar para o dashboard; se falhar, ele continua lendo do SQLite
+        try:
+            write_columnar(db_path, table_name)
+        except Exception as e:
+            print(f"Aviso: cópia colunar não atualizada: {e}", file=sys.stderr)
+        return total
 
     except sqlite3.Error as e:
         print(f"Erro ao carregar dados para o SQLite: {e}", file=sys.stderr)
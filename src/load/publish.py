@@ -0,0 +1,137 @@
+import os
+import sqlite3
+import time
+
+# Publicação atômica das cargas. O banco publicado fica em modo WAL: leitores nunca esperam pelo
+# escritor e sempre enxergam o último estado publicado. A carga em si (SCD2, percentis, cubo, curvas,
+# alertas) roda num banco de staging, uma cópia consistente do publicado, sem travar nada nele; depois
+# só as linhas que a carga gerou passam para o publicado, numa transação curta de INSERT ... SELECT
+# entre os dois bancos (ATTACH), que também grava o marcador de versão na tabela 'publications'.
+
+# Tabelas geradas pela carga e como cada uma passa do staging para o publicado:
+# tabela -> (modo, chave, condição extra)
+#   'novas'    linhas com chave maior que a maior chave publicada quando o staging foi copiado
+#   'versoes'  'novas' + o valid_to das versões fechadas nos snapshots da carga
+#   'snapshot' linhas dos snapshots da carga (substituídas)
+#   'todas'    tabela inteira (substituída)
+TABELAS_PUBLICADAS = {
+    'snapshots': ('novas', 'snapshot_id', None),
+    'clubs': ('novas', 'club_id', None),
+    'countries': ('novas', 'country_id', None),
+    'positions': ('novas', 'position_id', None),
+    'roles': ('novas', 'role_id', None),
+    'role_tokens': ('novas', 'role_token_id', None),
+    'player_versions': ('versoes', 'version_id', None),
+    'player_percentiles': ('snapshot', 'snapshot_id', None),
+    'talent_cube': ('snapshot', 'snapshot_id', None),
+    'player_growth': ('todas', None, None),
+    # Regras, watchlists e jogadores removidos no dashboard durante a carga não geram alertas
+    'alerts': ('novas', 'alert_id',
+               "rule_id IN (SELECT rule_id FROM main.alert_rules) "
+               "AND watchlist_id IN (SELECT watchlist_id FROM main.watchlists) "
+               "AND EXISTS (SELECT 1 FROM main.watchlist_players wp "
+               "WHERE wp.watchlist_id = alerts.watchlist_id AND wp.player_id = alerts.player_id)"),
+}
+
+# Tabelas que a carga não altera (validação, dashboard, o próprio marcador): vale o banco publicado
+TABELAS_NAO_PUBLICADAS = {'quarantine', 'watchlists', 'watchlist_players', 'alert_rules', 'publications'}
+
+# Coloca o banco em modo WAL (persistente no arquivo). Com WAL, 'synchronous = NORMAL' continua
+# seguro contra corrupção e evita um fsync por transação.
+def enable_wal(conn: sqlite3.Connection) -> None:
+    modo = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+    if modo.lower() != 'wal':
+        print(f"Aviso: o banco continua no modo de journal '{modo}' (WAL indisponível).")
+    conn.execute("PRAGMA synchronous = NORMAL")
+
+# Caminho do banco de staging de um banco publicado (ao lado dele, no mesmo disco).
+def staging_path(db_path: str) -> str:
+    return f"{db_path}.staging"
+
+def remove_staging(caminho: str) -> None:
+    for sufixo in ('', '-journal', '-wal', '-shm'):
+        try:
+            os.remove(caminho + sufixo)
+        except FileNotFoundError:
+            pass
+
+# Marcador de versão: id da última publicação (0 antes da primeira).
+def publication_marker(conn: sqlite3.Connection, esquema: str = 'main') -> int:
+    return conn.execute(f"SELECT COALESCE(MAX(publication_id), 0) FROM {esquema}.publications").fetchone()[0]
+
+# Copia o banco publicado para o staging (backup online: cópia consistente, sem bloquear leitores)
+# e retorna a conexão do staging, com as maiores chaves e o marcador do momento da cópia.
+def open_staging(conn: sqlite3.Connection, caminho: str) -> tuple:
+    remove_staging(caminho)
+    staging = sqlite3.connect(caminho, isolation_level=None)
+    conn.backup(staging)
+    # Cópia descartável: sem journal nem fsync
+    staging.execute("PRAGMA journal_mode = OFF")
+    staging.execute("PRAGMA synchronous = OFF")
+    limites = {
+        tabela: staging.execute(f"SELECT COALESCE(MAX({chave}), 0) FROM {tabela}").fetchone()[0]
+        for tabela, (modo, chave, _) in TABELAS_PUBLICADAS.items() if modo in ('novas', 'versoes')
+    }
+    return staging, limites, publication_marker(staging)
+
+def _colunas(conn: sqlite3.Connection, tabela: str) -> str:
+    return ", ".join(linha[1] for linha in conn.execute(f"PRAGMA main.table_info({tabela})"))
+
+# Publica o que a carga gravou no staging: numa única transação, confere que ninguém publicou desde
+# a cópia, passa o delta de cada tabela de TABELAS_PUBLICADAS e grava o marcador. 'snapshots' são os
+# ids dos snapshots da carga. Retorna o id da publicação.
+def publish_staging(conn: sqlite3.Connection, caminho: str, limites: dict, marcador: int,
+                    snapshots: list, versoes: int) -> int:
+    inicio = time.perf_counter()
+    em_snapshots = f"({', '.join('?' * len(snapshots))})" if snapshots else "(NULL)"
+    conn.execute("ATTACH DATABASE ? AS staging", (caminho,))
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            atual = publication_marker(conn)
+            if atual != marcador:
+                raise RuntimeError(
+                    f"Outra carga foi publicada durante esta (versão {atual}, esperada {marcador}). Rode o pipeline de novo."
+                )
+            for tabela, (modo, chave, condicao) in TABELAS_PUBLICADAS.items():
+                colunas = _colunas(conn, tabela)
+                extra = f" AND {condicao}" if condicao else ""
+                if modo == 'versoes':
+                    conn.execute(
+                        f"UPDATE main.{tabela} SET valid_to = (SELECT s.valid_to FROM staging.{tabela} s "
+                        f"WHERE s.{chave} = main.{tabela}.{chave}) "
+                        f"WHERE {chave} IN (SELECT {chave} FROM staging.{tabela} "
+                        f"WHERE {chave} <= ? AND valid_to IN {em_snapshots})",
+                        [limites[tabela], *snapshots]
+                    )
+                if modo in ('novas', 'versoes'):
+                    conn.execute(
+                        f"INSERT INTO main.{tabela} ({colunas}) SELECT {colunas} FROM staging.{tabela} "
+                        f"WHERE {chave} > ?{extra}",
+                        (limites[tabela],)
+                    )
+                elif modo == 'snapshot':
+                    conn.execute(f"DELETE FROM main.{tabela} WHERE {chave} IN {em_snapshots}", snapshots)
+                    conn.execute(
+                        f"INSERT INTO main.{tabela} ({colunas}) SELECT {colunas} FROM staging.{tabela} "
+                        f"WHERE {chave} IN {em_snapshots}{extra}",
+                        snapshots
+                    )
+                else:
+                    conn.execute(f"DELETE FROM main.{tabela}")
+                    conn.execute(f"INSERT INTO main.{tabela} ({colunas}) SELECT {colunas} FROM staging.{tabela}")
+            cursor = conn.execute(
+                "INSERT INTO main.publications (snapshots, versoes) VALUES (?, ?)",
+                (",".join(str(s) for s in snapshots), versoes)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.execute("DETACH DATABASE staging")
+    # Devolve as páginas do WAL ao arquivo principal sem esperar leitores
+    conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+    print(f"Publicação {cursor.lastrowid}: snapshots {snapshots} publicados em {(time.perf_counter() - inicio) * 1000:.0f} ms.")
+    return cursor.lastrowid
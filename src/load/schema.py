@@ -0,0 +1,439 @@
+import numpy as np
+import pandas as pd
+import sqlite3
+from src.analysis.growth import fit_growth_curves
+from src.analysis.cube import build_cube, role_tokens
+from src.load.alerts import create_watchlist_tables, evaluate_alerts
+
+# Versão do esquema gravada em PRAGMA user_version
+# (0 = tabela 'players' única, 1 = fato 'player_snapshot', 2 = histórico por versões,
+#  3 = percentis por coorte, 4 = curvas de crescimento, 5 = watchlists e alertas, 6 = cubo de talentos,
+#  7 = marcador de publicação 'publications', 8 = funções do cubo na dimensão 'role_tokens')
+SCHEMA_VERSION = 8
+
+# Dimensões: tabela -> (coluna de id, coluna do DataFrame transformado)
+DIMENSOES = {
+    'clubs': ('club_id', 'clube'),
+    'countries': ('country_id', 'pais'),
+    'positions': ('position_id', 'posicao'),
+}
+
+# Atributos versionados do jogador; uma nova versão só é gravada quando algum deles muda
+COLUNAS_ATRIBUTOS = [
+    'nome', 'country_id', 'position_id', 'club_id',
+    'idade', 'salario', 'valor', 'classificacao_atual', 'classificacao_potencial',
+    'role_atual_id', 'role_potencial_id'
+]
+
+# Colunas do fato, na ordem em que são gravadas
+COLUNAS_FATO = ['player_id'] + COLUNAS_ATRIBUTOS + ['row_hash', 'valid_from']
+
+# Faixas etárias das coortes: (idade máxima, rótulo)
+FAIXAS_ETARIAS = [(21, 'Sub-21'), (25, '22-25'), (29, '26-29'), (np.inf, '30+')]
+
+# Métricas com percentil dentro da coorte (função atual x faixa etária): coluna -> coluna do percentil
+COLUNAS_PERCENTIL = {
+    'classificacao_atual': 'pct_atual',
+    'classificacao_potencial': 'pct_potencial',
+    'valor': 'pct_valor',
+    'salario': 'pct_salario',
+}
+
+DDL_TABELAS = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    snapshot_id INTEGER PRIMARY KEY,
+    data_snapshot TIMESTAMP NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS clubs (
+    club_id INTEGER PRIMARY KEY,
+    nome TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS countries (
+    country_id INTEGER PRIMARY KEY,
+    nome TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS positions (
+    position_id INTEGER PRIMARY KEY,
+    nome TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS roles (
+    role_id INTEGER PRIMARY KEY,
+    nome TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS role_tokens (
+    role_token_id INTEGER PRIMARY KEY,
+    nome TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS player_versions (
+    version_id INTEGER PRIMARY KEY,
+    player_id INTEGER,
+    nome TEXT NOT NULL,
+    country_id INTEGER REFERENCES countries (country_id),
+    position_id INTEGER REFERENCES positions (position_id),
+    club_id INTEGER REFERENCES clubs (club_id),
+    idade INTEGER,
+    salario REAL,
+    valor REAL,
+    classificacao_atual REAL,
+    classificacao_potencial REAL,
+    role_atual_id INTEGER REFERENCES roles (role_id),
+    role_potencial_id INTEGER REFERENCES roles (role_id),
+    row_hash INTEGER NOT NULL,
+    valid_from INTEGER NOT NULL REFERENCES snapshots (snapshot_id),
+    valid_to INTEGER REFERENCES snapshots (snapshot_id)
+);
+CREATE INDEX IF NOT EXISTS ix_player_versions_player ON player_versions (player_id, valid_from);
+CREATE INDEX IF NOT EXISTS ix_player_versions_validade ON player_versions (valid_from, valid_to);
+CREATE INDEX IF NOT EXISTS ix_player_versions_atuais ON player_versions (player_id) WHERE valid_to IS NULL;
+CREATE TABLE IF NOT EXISTS player_percentiles (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots (snapshot_id),
+    version_id INTEGER NOT NULL REFERENCES player_versions (version_id),
+    role_id INTEGER REFERENCES roles (role_id),
+    faixa_etaria TEXT,
+    pct_atual REAL,
+    pct_potencial REAL,
+    pct_valor REAL,
+    pct_salario REAL,
+    PRIMARY KEY (snapshot_id, version_id)
+);
+CREATE INDEX IF NOT EXISTS ix_player_percentiles_coorte
+    ON player_percentiles (snapshot_id, role_id, faixa_etaria, pct_potencial);
+CREATE TABLE IF NOT EXISTS player_growth (
+    player_id INTEGER PRIMARY KEY,
+    ultimo_snapshot_id INTEGER NOT NULL REFERENCES snapshots (snapshot_id),
+    n_obs INTEGER NOT NULL,
+    idade_ref REAL NOT NULL,
+    nivel REAL NOT NULL,
+    taxa_anual REAL NOT NULL,
+    rmse REAL,
+    proj_21 REAL,
+    proj_24 REAL,
+    proj_27 REAL,
+    classificacao_potencial REAL,
+    deficit_potencial REAL
+);
+CREATE INDEX IF NOT EXISTS ix_player_growth_deficit ON player_growth (deficit_potencial, idade_ref);
+CREATE TABLE IF NOT EXISTS talent_cube (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots (snapshot_id),
+    nivel INTEGER NOT NULL,
+    club_id INTEGER REFERENCES clubs (club_id),
+    country_id INTEGER REFERENCES countries (country_id),
+    faixa_etaria TEXT,
+    role_token_id INTEGER REFERENCES role_tokens (role_token_id),
+    jogadores INTEGER NOT NULL,
+    count_potencial INTEGER NOT NULL, sum_potencial REAL, min_potencial REAL, max_potencial REAL,
+    count_atual INTEGER NOT NULL, sum_atual REAL, min_atual REAL, max_atual REAL,
+    count_valor INTEGER NOT NULL, sum_valor REAL, min_valor REAL, max_valor REAL,
+    n_pot_80 INTEGER NOT NULL, n_pot_85 INTEGER NOT NULL, n_pot_90 INTEGER NOT NULL, n_pot_95 INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_talent_cube_nivel ON talent_cube (snapshot_id, nivel, faixa_etaria, role_token_id);
+CREATE TABLE IF NOT EXISTS publications (
+    publication_id INTEGER PRIMARY KEY,
+    publicada_em TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    snapshots TEXT,
+    versoes INTEGER NOT NULL
+);
+"""
+
+# View de compatibilidade: mesmas colunas da antiga tabela 'players' (+ player_id e percentis).
+# Reconstrói cada snapshot com as versões válidas nele (valid_from <= snapshot < valid_to).
+DDL_VIEW = """
+CREATE VIEW IF NOT EXISTS {view_name} AS
+SELECT
+    v.nome,
+    co.nome AS pais,
+    po.nome AS posicao,
+    cl.nome AS clube,
+    v.idade,
+    v.salario,
+    v.valor,
+    v.classificacao_atual,
+    v.classificacao_potencial,
+    ra.nome AS sufixo_atual,
+    rp.nome AS sufixo_potencial,
+    s.data_snapshot,
+    v.player_id,
+    pp.faixa_etaria,
+    pp.pct_atual,
+    pp.pct_potencial,
+    pp.pct_valor,
+    pp.pct_salario
+FROM snapshots s
+JOIN player_versions v
+    ON v.valid_from <= s.snapshot_id
+    AND (v.valid_to IS NULL OR v.valid_to > s.snapshot_id)
+LEFT JOIN player_percentiles pp
+    ON pp.snapshot_id = s.snapshot_id AND pp.version_id = v.version_id
+LEFT JOIN countries co ON co.country_id = v.country_id
+LEFT JOIN positions po ON po.position_id = v.position_id
+LEFT JOIN clubs cl ON cl.club_id = v.club_id
+LEFT JOIN roles ra ON ra.role_id = v.role_atual_id
+LEFT JOIN roles rp ON rp.role_id = v.role_potencial_id
+"""
+
+# Formata o timestamp do snapshot como texto (mesmo formato gravado pelo pandas no esquema legado).
+def format_snapshot(valor) -> str:
+    return pd.Timestamp(valor).isoformat(sep=' ')
+
+# Retorna o tipo do objeto ('table', 'view') com esse nome no banco, ou None.
+def _object_type(conn: sqlite3.Connection, nome: str):
+    row = conn.execute("SELECT type FROM sqlite_master WHERE name = ?", (nome,)).fetchone()
+    return row[0] if row else None
+
+# Executa um bloco de DDL comando a comando (executescript faria COMMIT da transação aberta).
+def _execute_ddl(conn: sqlite3.Connection, ddl: str) -> None:
+    for comando in ddl.split(';'):
+        if comando.strip():
+            conn.execute(comando)
+
+# Converte um DataFrame em tuplas prontas para o sqlite3 (NaN/NA viram NULL).
+def to_records(df: pd.DataFrame) -> list:
+    return list(df.astype(object).where(df.notna(), None).itertuples(index=False, name=None))
+
+# Cria as tabelas normalizadas e a view de compatibilidade, se ainda não existirem.
+def create_schema(conn: sqlite3.Connection, view_name: str = 'players') -> None:
+    _execute_ddl(conn, DDL_TABELAS)
+    create_watchlist_tables(conn)
+    conn.execute(DDL_VIEW.format(view_name=view_name))
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+# Garante o id de cada valor numa dimensão, inserindo os novos; retorna os ids alinhados à Series.
+def get_dimension_ids(conn: sqlite3.Connection, tabela: str, coluna_id: str, valores: pd.Series) -> pd.Series:
+    unicos = valores.dropna().unique()
+    conn.executemany(
+        f"INSERT OR IGNORE INTO {tabela} (nome) VALUES (?)",
+        [(str(v),) for v in unicos]
+    )
+    mapa = dict(conn.execute(f"SELECT nome, {coluna_id} FROM {tabela}").fetchall())
+    return valores.map(mapa).astype('Int64')
+
+# Garante o id do snapshot (um por data_snapshot).
+def get_snapshot_id(conn: sqlite3.Connection, data_snapshot: str) -> int:
+    conn.execute("INSERT OR IGNORE INTO snapshots (data_snapshot) VALUES (?)", (data_snapshot,))
+    return conn.execute(
+        "SELECT snapshot_id FROM snapshots WHERE data_snapshot = ?", (data_snapshot,)
+    ).fetchone()[0]
+
+# Hash dos atributos de cada linha (tipos normalizados para o hash ser estável entre cargas).
+def compute_row_hash(df: pd.DataFrame) -> pd.Series:
+    normalizado = pd.DataFrame({
+        coluna: (df[coluna].astype('float64') if coluna != 'nome' else df[coluna].astype(str))
+        for coluna in COLUNAS_ATRIBUTOS
+    })
+    return pd.util.hash_pandas_object(normalizado, index=False).astype('int64')
+
+# Converte um snapshot transformado nas linhas do fato, com as chaves inteiras das dimensões.
+def build_fact_rows(conn: sqlite3.Connection, df: pd.DataFrame, snapshot_id: int) -> pd.DataFrame:
+    fato = pd.DataFrame(index=df.index)
+    if 'id_unico' in df.columns:
+        fato['player_id'] = df['id_unico'].astype('Int64')
+    else:
+        fato['player_id'] = pd.Series(pd.NA, index=df.index, dtype='Int64')
+    fato['nome'] = df['nome']
+
+    for tabela, (coluna_id, coluna) in DIMENSOES.items():
+        fato[coluna_id] = get_dimension_ids(conn, tabela, coluna_id, df[coluna])
+
+    for coluna in ['idade', 'salario', 'valor', 'classificacao_atual', 'classificacao_potencial']:
+        fato[coluna] = df[coluna]
+
+    fato['role_atual_id'] = get_dimension_ids(conn, 'roles', 'role_id', df['sufixo_atual'])
+    fato['role_potencial_id'] = get_dimension_ids(conn, 'roles', 'role_id', df['sufixo_potencial'])
+    fato['row_hash'] = compute_row_hash(fato)
+    fato['valid_from'] = snapshot_id
+    return fato[COLUNAS_FATO]
+
+# Aplica um snapshot ao histórico (SCD tipo 2): jogadores sem mudança mantêm a versão atual,
+# os que mudaram ou sumiram têm a versão fechada e só as mudanças viram versões novas.
+# Linhas sem player_id não podem ser comparadas e valem apenas para o próprio snapshot.
+def apply_snapshot(conn: sqlite3.Connection, fato: pd.DataFrame, snapshot_id: int) -> int:
+    # Um player_id repetido no snapshot casaria com a mesma versão atual mais de uma vez: vale a última linha
+    repetido = (fato['player_id'].notna() & fato['player_id'].duplicated(keep='last')).to_numpy()
+    if repetido.any():
+        print(f"Aviso: snapshot {snapshot_id} tem {int(repetido.sum())} linhas com player_id repetido; mantida a última de cada.")
+        fato = fato[~repetido]
+
+    atuais = pd.read_sql_query(
+        "SELECT version_id, player_id, row_hash, valid_from FROM player_versions WHERE valid_to IS NULL",
+        conn
+    )
+    atuais_com_id = atuais.dropna(subset=['player_id']).astype({'player_id': 'int64'})
+
+    comparacao = fato[['player_id', 'row_hash']].merge(
+        atuais_com_id[['player_id', 'row_hash', 'version_id']],
+        on='player_id', how='left', suffixes=('', '_atual')
+    )
+    inalterado = (comparacao['row_hash'] == comparacao['row_hash_atual']).to_numpy()
+    versoes_mantidas = set(comparacao.loc[inalterado, 'version_id'].astype('int64'))
+
+    # Linhas sem id já gravadas neste mesmo snapshot continuam valendo (carga em append)
+    mesmo_snapshot_sem_id = atuais['player_id'].isna() & (atuais['valid_from'] == snapshot_id)
+    fechar = atuais[~atuais['version_id'].isin(versoes_mantidas) & ~mesmo_snapshot_sem_id]
+    conn.executemany(
+        "UPDATE player_versions SET valid_to = ? WHERE version_id = ?",
+        [(snapshot_id, int(v)) for v in fechar['version_id']]
+    )
+
+    novas = fato[~inalterado]
+    conn.executemany(
+        f"INSERT INTO player_versions ({', '.join(COLUNAS_FATO)}) "
+        f"VALUES ({', '.join('?' * len(COLUNAS_FATO))})",
+        to_records(novas)
+    )
+    print(f"Snapshot {snapshot_id}: {len(novas)} versões novas, {int(inalterado.sum())} jogadores sem mudança.")
+    return len(novas)
+
+# Rótulo da faixa etária de cada idade (ver FAIXAS_ETARIAS).
+def age_band(idade: pd.Series) -> pd.Series:
+    limites = [-np.inf] + [limite for limite, _ in FAIXAS_ETARIAS]
+    rotulos = [rotulo for _, rotulo in FAIXAS_ETARIAS]
+    return pd.cut(idade, bins=limites, labels=rotulos).astype(object)
+
+# Percentil (0-1) de cada métrica dentro da coorte função x faixa etária.
+# Empates recebem o maior percentil do grupo: 0.95 = melhor ou igual a 95% da coorte.
+def compute_percentiles(df: pd.DataFrame, coluna_funcao: str = 'role_id') -> pd.DataFrame:
+    resultado = pd.DataFrame(index=df.index)
+    resultado['faixa_etaria'] = age_band(df['idade'])
+    grupos = df.groupby([df[coluna_funcao], resultado['faixa_etaria']], dropna=False)
+    for coluna, coluna_pct in COLUNAS_PERCENTIL.items():
+        resultado[coluna_pct] = grupos[coluna].rank(method='max', pct=True)
+    return resultado
+
+# (Re)calcula os percentis das versões válidas num snapshot.
+def write_percentiles(conn: sqlite3.Connection, snapshot_id: int) -> int:
+    versoes = pd.read_sql_query(
+        f"SELECT version_id, role_atual_id AS role_id, idade, {', '.join(COLUNAS_PERCENTIL)} "
+        "FROM player_versions WHERE valid_from <= ? AND (valid_to IS NULL OR valid_to > ?)",
+        conn, params=(snapshot_id, snapshot_id)
+    )
+    percentis = pd.concat([versoes[['version_id', 'role_id']], compute_percentiles(versoes)], axis=1)
+    percentis.insert(0, 'snapshot_id', snapshot_id)
+
+    conn.execute("DELETE FROM player_percentiles WHERE snapshot_id = ?", (snapshot_id,))
+    conn.executemany(
+        f"INSERT INTO player_percentiles ({', '.join(percentis.columns)}) "
+        f"VALUES ({', '.join('?' * len(percentis.columns))})",
+        to_records(percentis)
+    )
+    return len(percentis)
+
+# (Re)materializa o cubo da fábrica de talentos de um snapshot (ver src/analysis/cube.py), sobre as
+# versões válidas nele; as funções de cada jogador viram tokens na dimensão 'role_tokens' ('roles'
+# guarda só os sufixos completos de player_versions).
+def write_cube(conn: sqlite3.Connection, snapshot_id: int) -> int:
+    versoes = pd.read_sql_query(
+        "SELECT v.club_id, v.country_id, v.idade, v.classificacao_potencial, v.classificacao_atual, v.valor, "
+        "r.nome AS sufixo_atual "
+        "FROM player_versions v LEFT JOIN roles r ON r.role_id = v.role_atual_id "
+        "WHERE v.valid_from <= ? AND (v.valid_to IS NULL OR v.valid_to > ?)",
+        conn, params=(snapshot_id, snapshot_id)
+    )
+    versoes['faixa_etaria'] = age_band(versoes['idade'])
+    tokens = role_tokens(versoes['sufixo_atual'])
+    funcoes = get_dimension_ids(conn, 'role_tokens', 'role_token_id', tokens)
+    cubo = build_cube(versoes, funcoes)
+    cubo.insert(0, 'snapshot_id', snapshot_id)
+
+    conn.execute("DELETE FROM talent_cube WHERE snapshot_id = ?", (snapshot_id,))
+    conn.executemany(
+        f"INSERT INTO talent_cube ({', '.join(cubo.columns)}) VALUES ({', '.join('?' * len(cubo.columns))})",
+        to_records(cubo)
+    )
+    return len(cubo)
+
+# (Re)ajusta a curva de crescimento de todos os jogadores com id sobre o histórico inteiro
+# (ver src/analysis/growth.py). Linhas sem player_id não têm histórico e ficam de fora.
+def write_growth(conn: sqlite3.Connection) -> int:
+    obs = pd.read_sql_query(
+        "SELECT v.player_id, s.snapshot_id, s.data_snapshot, v.idade, v.classificacao_atual, v.classificacao_potencial "
+        "FROM snapshots s JOIN player_versions v "
+        "ON v.valid_from <= s.snapshot_id AND (v.valid_to IS NULL OR v.valid_to > s.snapshot_id) "
+        "WHERE v.player_id IS NOT NULL",
+        conn
+    )
+    curvas = fit_growth_curves(obs)
+    curvas.insert(0, 'ultimo_snapshot_id', obs.groupby('player_id')['snapshot_id'].max().reindex(curvas.index))
+    curvas = curvas.reset_index()
+
+    conn.execute("DELETE FROM player_growth")
+    conn.executemany(
+        f"INSERT INTO player_growth ({', '.join(curvas.columns)}) VALUES ({', '.join('?' * len(curvas.columns))})",
+        to_records(curvas)
+    )
+    print(f"Curvas de crescimento ajustadas para {len(curvas)} jogadores.")
+    return len(curvas)
+
+# Grava um DataFrame transformado (um ou mais snapshots, em ordem cronológica) no histórico.
+# As regras de alerta são avaliadas em cada snapshot, só contra as versões que ele gravou.
+def write_snapshots(conn: sqlite3.Connection, df: pd.DataFrame) -> int:
+    total = 0
+    datas = df['data_snapshot'].map(format_snapshot)
+    # O histórico só cresce para a frente: um snapshot anterior ao último fecharia versões no passado
+    ultima = conn.execute("SELECT MAX(data_snapshot) FROM snapshots").fetchone()[0]
+    anteriores = sorted(d for d in datas.unique() if ultima is not None and d < ultima)
+    if anteriores:
+        raise ValueError(
+            f"Snapshot(s) {anteriores} anterior(es) ao último já carregado ({ultima}). "
+            "O histórico só aceita snapshots novos ou o mais recente (append)."
+        )
+    for data_snapshot, df_snapshot in df.groupby(datas, sort=True):
+        snapshot_id = get_snapshot_id(conn, data_snapshot)
+        fato = build_fact_rows(conn, df_snapshot, snapshot_id)
+        total += apply_snapshot(conn, fato, snapshot_id)
+        write_percentiles(conn, snapshot_id)
+        write_cube(conn, snapshot_id)
+        evaluate_alerts(conn, snapshot_id)
+    write_growth(conn)
+    return total
+
+# Migra esquemas anteriores (tabela única legada ou fato 'player_snapshot') para o atual,
+# regravando os snapshots existentes em ordem. O histórico v2+ é mantido e só ganha o que falta
+# (percentis, cubo de talentos, curvas de crescimento, tabelas de watchlists).
+def migrate_schema(conn: sqlite3.Connection, view_name: str = 'players') -> bool:
+    tipo = _object_type(conn, view_name)
+    versao = conn.execute("PRAGMA user_version").fetchone()[0]
+    if tipo is None or (tipo == 'view' and versao >= SCHEMA_VERSION):
+        return False
+
+    print(f"Migrando '{view_name}' (esquema v{versao}) para o esquema v{SCHEMA_VERSION}...")
+    if tipo == 'view' and versao >= 2:
+        # O histórico já está no formato atual: recria a view e calcula o que as versões anteriores não tinham
+        conn.execute(f"DROP VIEW {view_name}")
+        if versao < 8:
+            # O cubo v6/v7 gravava os tokens de função em 'roles': recria o cubo sobre 'role_tokens'
+            # e tira de 'roles' os tokens que não são sufixo de nenhuma versão
+            conn.execute("DROP TABLE IF EXISTS talent_cube")
+            conn.execute(
+                "DELETE FROM roles WHERE role_id NOT IN (SELECT role_atual_id FROM player_versions "
+                "WHERE role_atual_id IS NOT NULL UNION SELECT role_potencial_id FROM player_versions "
+                "WHERE role_potencial_id IS NOT NULL)"
+            )
+        create_schema(conn, view_name)
+        snapshots = [row[0] for row in conn.execute("SELECT snapshot_id FROM snapshots ORDER BY snapshot_id")]
+        if versao == 2:
+            for snapshot_id in snapshots:
+                write_percentiles(conn, snapshot_id)
+            print(f"Percentis calculados para {len(snapshots)} snapshots.")
+        if versao < 8:
+            for snapshot_id in snapshots:
+                write_cube(conn, snapshot_id)
+            print(f"Cubo de talentos materializado para {len(snapshots)} snapshots.")
+        if versao < 4:
+            write_growth(conn)
+        print("Migração concluída.")
+        return True
+
+    df_antigo = pd.read_sql_query(f"SELECT * FROM {view_name}", conn)
+    if tipo == 'table':
+        conn.execute(f"DROP TABLE {view_name}")
+    else:
+        conn.execute(f"DROP VIEW {view_name}")
+    conn.execute("DROP TABLE IF EXISTS player_snapshot")
+    if 'player_id' in df_antigo.columns:
+        df_antigo = df_antigo.rename(columns={'player_id': 'id_unico'})
+        df_antigo['id_unico'] = df_antigo['id_unico'].astype('Int64')
+
+    create_schema(conn, view_name)
+    total = write_snapshots(conn, df_antigo)
+    print(f"Migração concluída: {len(df_antigo)} linhas em {df_antigo['data_snapshot'].nunique()} snapshots ({total} versões).")
+    return True
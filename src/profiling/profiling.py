@@ -0,0 +1,156 @@
+import functools
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+
+import pandas as pd
+
+# Variáveis de ambiente e parâmetro de URL que ligam as medições
+ENV_OVERLAY = 'FM_PERF_OVERLAY'
+ENV_LOG = 'FM_PERF_LOG'
+PARAM_OVERLAY = 'perf'
+
+# Reruns guardados para as médias móveis
+JANELA_PADRAO = 50
+
+_lock_log = threading.Lock()
+
+# Liga o painel quando a variável de ambiente ou o parâmetro de URL tem um valor "verdadeiro".
+def overlay_enabled(ambiente: dict, parametros: dict) -> bool:
+    valores = (ambiente.get(ENV_OVERLAY, ''), parametros.get(PARAM_OVERLAY, ''))
+    return any(str(v).strip().lower() in ('1', 'true', 'sim', 'on') for v in valores)
+
+# Contagem de acertos e faltas dos caches do dashboard. Os totais são do processo (os caches do
+# Streamlit são compartilhados entre as sessões); as contagens do rerun atual ficam por thread,
+# já que cada sessão roda o script na sua própria thread.
+class CacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totais = {}
+        self._local = threading.local()
+
+    # Decorador: aplica 'cache' (st.cache_data, st.cache_resource, functools.lru_cache...) à função,
+    # contando as chamadas por fora e as execuções (faltas) por dentro do cache.
+    def track(self, nome: str, cache):
+        def decorador(funcao):
+            @functools.wraps(funcao)
+            def executar(*args, **kwargs):
+                self._contar(nome, 'misses')
+                return funcao(*args, **kwargs)
+
+            em_cache = cache(executar)
+
+            @functools.wraps(funcao)
+            def chamar(*args, **kwargs):
+                self._contar(nome, 'chamadas')
+                return em_cache(*args, **kwargs)
+            # Mantém o método de limpeza do cache acessível pela função decorada
+            for metodo in ('clear', 'cache_clear'):
+                if hasattr(em_cache, metodo):
+                    setattr(chamar, metodo, getattr(em_cache, metodo))
+            return chamar
+        return decorador
+
+    def _contar(self, nome: str, campo: str) -> None:
+        with self._lock:
+            contagem = self._totais.setdefault(nome, {'chamadas': 0, 'misses': 0})
+            contagem[campo] += 1
+        rerun = getattr(self._local, 'contagem', None)
+        if rerun is not None:
+            rerun.setdefault(nome, {'chamadas': 0, 'misses': 0})[campo] += 1
+
+    # Zera as contagens do rerun da thread atual.
+    def start_rerun(self) -> None:
+        self._local.contagem = {}
+
+    # Acertos e faltas do rerun atual da thread: nome -> {'hits', 'misses'}.
+    def rerun_counts(self) -> dict:
+        contagem = getattr(self._local, 'contagem', None) or {}
+        return {
+            nome: {'hits': c['chamadas'] - c['misses'], 'misses': c['misses']}
+            for nome, c in contagem.items()
+        }
+
+    # Totais do processo por cache: chamadas, hits, misses e taxa de acerto.
+    def totals(self) -> pd.DataFrame:
+        with self._lock:
+            totais = {nome: dict(c) for nome, c in self._totais.items()}
+        df = pd.DataFrame.from_dict(totais, orient='index', columns=['chamadas', 'misses'])
+        df.index.name = 'cache'
+        df.insert(1, 'hits', df['chamadas'] - df['misses'])
+        df['taxa_acerto'] = (df['hits'] / df['chamadas'].where(df['chamadas'] > 0)).fillna(0.0)
+        return df.sort_index()
+
+# Contadores compartilhados pelos caches do dashboard (um por processo, como os próprios caches)
+CACHE_STATS = CacheStats()
+
+# Tempo de cada seção de um rerun do dashboard, marcado por checkpoints: o tempo desde o checkpoint
+# anterior (ou do início) vai para a seção informada. Guarda os últimos 'janela' reruns para as médias
+# e, com 'log_path', grava cada rerun como uma linha JSON. Inativo, todos os métodos são no-ops.
+class RerunProfiler:
+    def __init__(self, ativo: bool = True, janela: int = JANELA_PADRAO, log_path: str = None):
+        self.ativo = ativo
+        self.log_path = log_path
+        self.sessao = uuid.uuid4().hex[:8]
+        self.historico = deque(maxlen=janela)
+        self._secoes = None
+        self._inicio = self._marca = None
+
+    def start(self) -> None:
+        if not self.ativo:
+            return
+        self._secoes = {}
+        self._inicio = self._marca = time.perf_counter()
+
+    def checkpoint(self, secao: str) -> None:
+        if not self.ativo or self._secoes is None:
+            return
+        agora = time.perf_counter()
+        self._secoes[secao] = self._secoes.get(secao, 0.0) + (agora - self._marca) * 1000
+        self._marca = agora
+
+    # Fecha o rerun: o tempo desde o último checkpoint vai para 'secao_final'.
+    # Retorna o registro do rerun (também gravado no log, se configurado), ou None se inativo.
+    def finish(self, secao_final: str = 'outros', cache: dict = None, extras: dict = None):
+        if not self.ativo or self._secoes is None:
+            return None
+        self.checkpoint(secao_final)
+        registro = {
+            'ts': datetime.now().isoformat(timespec='milliseconds'),
+            'sessao': self.sessao,
+            'total_ms': round((self._marca - self._inicio) * 1000, 2),
+            'secoes': {secao: round(ms, 2) for secao, ms in self._secoes.items()},
+            'cache': cache or {},
+            **(extras or {}),
+        }
+        self.historico.append(registro)
+        self._secoes = None
+        if self.log_path:
+            linha = json.dumps(registro, ensure_ascii=False, default=str)
+            with _lock_log, open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(linha + '\n')
+        return registro
+
+    # Por seção: tempo no último rerun, média, p95 e máximo na janela, e fatia do último rerun.
+    # Inclui a linha 'total'. Seções na ordem em que aparecem no último rerun.
+    def summary(self) -> pd.DataFrame:
+        colunas = ['ultimo_ms', 'media_ms', 'p95_ms', 'max_ms', 'fatia']
+        if not self.historico:
+            return pd.DataFrame(columns=colunas)
+        tempos = pd.DataFrame([{**r['secoes'], 'total': r['total_ms']} for r in self.historico]).fillna(0.0)
+        ultimo = tempos.iloc[-1]
+        resumo = pd.DataFrame({
+            'ultimo_ms': ultimo,
+            'media_ms': tempos.mean(),
+            'p95_ms': tempos.quantile(0.95),
+            'max_ms': tempos.max(),
+            'fatia': ultimo / ultimo['total'] if ultimo['total'] > 0 else 0.0,
+        })
+        ordem = [s for s in self.historico[-1]['secoes'] if s in resumo.index]
+        ordem += [s for s in resumo.index if s not in ordem and s != 'total'] + ['total']
+        resumo = resumo.loc[ordem]
+        resumo.index.name = 'secao'
+        return resumo
@@ -0,0 +1,337 @@
+import html
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.analysis.aggregations import AggregationEngine
+from src.analysis.skyline import compute_bargains, CRITERIOS_PADRAO
+from src.database.database import DB_PATH, connect_readonly, get_data_version
+
+# Relatório estático das visões mais consultadas do dashboard (Wonderkids, pechinchas e fábrica de
+# talentos) para o snapshot mais recente: um HTML autocontido por visão (CSS embutido, gráficos em SVG,
+# sem JavaScript nem arquivos externos), gerado uma vez por snapshot e servido como arquivo comum.
+
+# Parâmetros das visões (os mesmos valores padrão das abas do dashboard)
+IDADE_MAX_WONDERKID = 21
+POTENCIAL_WONDERKID = 90.0
+MIN_JOGADORES_CLUBE = 3
+GRUPO_PECHINCHA = 'sufixo_atual'
+LINHAS_TABELA = 50
+TOP_RANKING = 15
+
+# Grade do gráfico de dispersão pré-agregado: (colunas de valor em escala log, linhas de qualidade)
+GRADE_DISPERSAO = (60, 40)
+
+CSS = """
+body { font-family: system-ui, sans-serif; margin: 2rem auto; max-width: 1100px; color: #222; padding: 0 1rem; }
+nav a { margin-right: 1rem; }
+h1 { margin-bottom: .2rem; }
+.meta { color: #666; margin-top: 0; }
+table { border-collapse: collapse; width: 100%; font-size: .9rem; margin: 1rem 0 2rem; }
+th, td { border-bottom: 1px solid #ddd; padding: .3rem .5rem; text-align: left; }
+th { background: #f4f4f4; }
+td.num { text-align: right; font-variant-numeric: tabular-nums; }
+svg { width: 100%; height: auto; background: #fafafa; border: 1px solid #eee; }
+.colunas { display: grid; grid-template-columns: 1fr 1fr; gap: 2rem; }
+"""
+
+# Pasta dos relatórios de um banco (ao lado dele).
+def report_dir(db_path: str = DB_PATH) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), 'reports')
+
+# Nome da pasta de um snapshot (data sem caracteres problemáticos em nomes de arquivo).
+def snapshot_slug(versao: str) -> str:
+    return pd.Timestamp(versao).strftime('%Y-%m-%d_%H%M%S')
+
+# Jogadores de um snapshot do banco, com os mesmos preenchimentos de nulos do dashboard.
+def read_snapshot(db_path: str, versao: str) -> pd.DataFrame:
+    conn = connect_readonly(db_path)
+    try:
+        df = pd.read_sql_query("SELECT * FROM players WHERE data_snapshot = ?", conn, params=(versao,))
+    finally:
+        conn.close()
+    df['posicao'] = df['posicao'].fillna('Desconhecida')
+    df['clube'] = df['clube'].fillna('Sem Clube')
+    df['pais'] = df['pais'].fillna('Desconhecido')
+    return df
+
+def _euros(valor: float) -> str:
+    return "" if pd.isna(valor) else f"€ {valor:,.0f}".replace(',', '.')
+
+# Tabela HTML já formatada: colunas -> (rótulo, formatador ou None para texto).
+def _table(df: pd.DataFrame, colunas: dict) -> str:
+    cabecalho = "".join(f"<th>{html.escape(rotulo)}</th>" for rotulo, _ in colunas.values())
+    linhas = []
+    for registro in df[list(colunas)].itertuples(index=False):
+        celulas = []
+        for valor, (_, formato) in zip(registro, colunas.values()):
+            if formato is None:
+                celulas.append(f"<td>{html.escape('' if pd.isna(valor) else str(valor))}</td>")
+            else:
+                celulas.append(f"<td class='num'>{'' if pd.isna(valor) else formato(valor)}</td>")
+        linhas.append(f"<tr>{''.join(celulas)}</tr>")
+    return f"<table><thead><tr>{cabecalho}</tr></thead><tbody>{''.join(linhas)}</tbody></table>"
+
+# Página completa com navegação entre as visões.
+def _page(titulo: str, versao: str, corpo: str) -> str:
+    links = " ".join(f"<a href='{nome}.html'>{html.escape(rotulo)}</a>" for nome, (rotulo, _) in VISOES.items())
+    return (
+        "<!DOCTYPE html><html lang='pt-BR'><head><meta charset='utf-8'>"
+        f"<title>{html.escape(titulo)}</title><style>{CSS}</style></head><body>"
+        f"<nav><a href='index.html'>Início</a> {links}</nav>"
+        f"<h1>{html.escape(titulo)}</h1><p class='meta'>Snapshot de {html.escape(str(versao))}</p>"
+        f"{corpo}</body></html>"
+    )
+
+def _numero(formato: str):
+    return lambda v: format(v, formato)
+
+# --- Visões ---
+
+# Jovens com a maior diferença entre potencial e qualidade atual.
+def render_wonderkids(df: pd.DataFrame, versao: str) -> tuple:
+    jovens = df[df['idade'] <= IDADE_MAX_WONDERKID].assign(
+        gap_potencial=df['classificacao_potencial'] - df['classificacao_atual']
+    )
+    top = jovens.sort_values('gap_potencial', ascending=False, kind='stable').head(LINHAS_TABELA)
+    corpo = (
+        f"<p>Jogadores de até {IDADE_MAX_WONDERKID} anos com a maior diferença entre potencial e qualidade atual.</p>"
+        + _table(top, {
+            'nome': ("Nome", None), 'clube': ("Clube", None), 'idade': ("Idade", _numero('d')),
+            'gap_potencial': ("Gap potencial", _numero('.1f')), 'classificacao_atual': ("Atual", _numero('.1f')),
+            'classificacao_potencial': ("Potencial", _numero('.1f')), 'valor': ("Valor de mercado", _euros),
+        })
+    )
+    return _page("Wonderkids", versao, corpo), len(top)
+
+# Dispersão pré-agregada em SVG: cada célula da grade (valor em log x qualidade) vira um círculo
+# proporcional ao número de jogadores; os pontos da fronteira são desenhados um a um, em vermelho.
+def _scatter_svg(df: pd.DataFrame, fronteira: pd.DataFrame, largura: int = 900, altura: int = 480) -> str:
+    margem = 50
+    x = np.log10(df['valor'].to_numpy(dtype='float64'))
+    y = df['classificacao_atual'].to_numpy(dtype='float64')
+    validos = np.isfinite(x) & np.isfinite(y)
+    x, y = x[validos], y[validos]
+    if len(x) == 0:
+        return "<p>Sem jogadores com valor de mercado.</p>"
+    x_min, x_max = np.floor(x.min()), np.ceil(x.max())
+    x_max = max(x_max, x_min + 1)
+    y_min, y_max = 0.0, 100.0
+
+    def px(v):
+        return margem + (v - x_min) / (x_max - x_min) * (largura - 2 * margem)
+
+    def py(v):
+        return altura - margem - (v - y_min) / (y_max - y_min) * (altura - 2 * margem)
+
+    contagem, bordas_x, bordas_y = np.histogram2d(
+        x, y, bins=GRADE_DISPERSAO, range=[[x_min, x_max], [y_min, y_max]]
+    )
+    centros_x = (bordas_x[:-1] + bordas_x[1:]) / 2
+    centros_y = (bordas_y[:-1] + bordas_y[1:]) / 2
+    raio_max = min(largura, altura) / max(GRADE_DISPERSAO) * 0.9
+    elementos = []
+    for i, j in zip(*np.nonzero(contagem)):
+        n = int(contagem[i, j])
+        raio = max(1.5, raio_max * np.sqrt(n / contagem.max()))
+        elementos.append(
+            f"<circle cx='{px(centros_x[i]):.1f}' cy='{py(centros_y[j]):.1f}' r='{raio:.1f}' fill='#4c78a8' "
+            f"fill-opacity='0.55'><title>{n} jogadores</title></circle>"
+        )
+    for registro in fronteira.itertuples(index=False):
+        if registro.valor > 0 and pd.notna(registro.classificacao_atual):
+            dica = html.escape(f"{registro.nome} ({registro.clube}) - {_euros(registro.valor)}, {registro.classificacao_atual:.1f}")
+            elementos.append(
+                f"<circle cx='{px(np.log10(registro.valor)):.1f}' cy='{py(registro.classificacao_atual):.1f}' r='4' "
+                f"fill='#d62728'><title>{dica}</title></circle>"
+            )
+
+    eixos = [f"<line x1='{margem}' y1='{altura - margem}' x2='{largura - margem}' y2='{altura - margem}' stroke='#999'/>",
+             f"<line x1='{margem}' y1='{margem}' x2='{margem}' y2='{altura - margem}' stroke='#999'/>"]
+    for potencia in range(int(x_min), int(x_max) + 1):
+        eixos.append(f"<text x='{px(potencia):.1f}' y='{altura - margem + 18}' font-size='11' text-anchor='middle'>"
+                     f"{html.escape(_euros(10 ** potencia))}</text>")
+    for nota in range(0, 101, 20):
+        eixos.append(f"<text x='{margem - 8}' y='{py(nota) + 4:.1f}' font-size='11' text-anchor='end'>{nota}</text>")
+    eixos.append(f"<text x='{largura / 2}' y='{altura - 8}' font-size='12' text-anchor='middle'>Valor de mercado (log)</text>")
+    eixos.append(f"<text x='14' y='{altura / 2}' font-size='12' text-anchor='middle' "
+                 f"transform='rotate(-90 14 {altura / 2})'>Qualidade atual</text>")
+    return f"<svg viewBox='0 0 {largura} {altura}' xmlns='http://www.w3.org/2000/svg'>{''.join(eixos + elementos)}</svg>"
+
+# Fronteira de custo-benefício por função, com a dispersão de todos os jogadores.
+def render_bargains(df: pd.DataFrame, versao: str) -> tuple:
+    com_valor = df[df['valor'] > 1000]
+    fronteira = compute_bargains(com_valor, dict(CRITERIOS_PADRAO), GRUPO_PECHINCHA)
+    corpo = (
+        "<p>Cada círculo azul agrupa os jogadores de uma faixa de valor e qualidade (o tamanho é a quantidade). "
+        "Em vermelho, a fronteira de custo-benefício por função: nenhum outro jogador da mesma função é ao mesmo "
+        "tempo mais barato e melhor.</p>"
+        + _scatter_svg(com_valor, fronteira)
+        + f"<h2>Melhores pechinchas ({len(fronteira)} jogadores na fronteira)</h2>"
+        + _table(fronteira, {
+            'nome': ("Nome", None), 'clube': ("Clube", None), 'idade': ("Idade", _numero('d')),
+            'posicao': ("Posições", None), 'sufixo_atual': ("Função", None),
+            'classificacao_atual': ("Atual", _numero('.1f')), 'classificacao_potencial': ("Potencial", _numero('.1f')),
+            'valor': ("Valor de mercado", _euros), 'salario': ("Salário", _euros),
+        })
+    )
+    return _page("Melhor custo-benefício", versao, corpo), len(fronteira)
+
+# Barras horizontais em SVG (rótulo -> valor), do maior para o menor.
+def _bars_svg(serie: pd.Series, largura: int = 500, altura_barra: int = 22) -> str:
+    if serie.empty:
+        return "<p>Nenhum jogador nesse critério.</p>"
+    margem = 150
+    altura = altura_barra * len(serie) + 10
+    maximo = max(serie.max(), 1)
+    barras = []
+    for i, (rotulo, valor) in enumerate(serie.items()):
+        comprimento = (largura - margem - 40) * valor / maximo
+        y = 5 + i * altura_barra
+        barras.append(
+            f"<text x='{margem - 6}' y='{y + 15}' font-size='12' text-anchor='end'>{html.escape(str(rotulo))}</text>"
+            f"<rect x='{margem}' y='{y + 3}' width='{comprimento:.1f}' height='{altura_barra - 6}' fill='#4c78a8'/>"
+            f"<text x='{margem + comprimento + 4:.1f}' y='{y + 15}' font-size='12'>{valor}</text>"
+        )
+    return f"<svg viewBox='0 0 {largura} {altura}' xmlns='http://www.w3.org/2000/svg'>{''.join(barras)}</svg>"
+
+# Clubes com maior potencial médio e países com mais wonderkids.
+def render_talents(df: pd.DataFrame, versao: str) -> tuple:
+    motor = AggregationEngine(df, 'pandas')
+    clubes = motor.club_potential(min_jogadores=MIN_JOGADORES_CLUBE, n=TOP_RANKING).reset_index()
+    paises = motor.country_counts(potencial_min=POTENCIAL_WONDERKID, idade_max=IDADE_MAX_WONDERKID, n=TOP_RANKING)
+    corpo = (
+        "<div class='colunas'><div>"
+        f"<h2>Top clubes por potencial médio</h2><p>Clubes com pelo menos {MIN_JOGADORES_CLUBE} jogadores.</p>"
+        + _table(clubes, {
+            'clube': ("Clube", None), 'mean': ("Potencial médio", _numero('.1f')), 'count': ("Jogadores", _numero('d')),
+        })
+        + "</div><div>"
+        f"<h2>Países com mais wonderkids</h2><p>Potencial a partir de {POTENCIAL_WONDERKID:.0f} e até "
+        f"{IDADE_MAX_WONDERKID} anos.</p>"
+        + _bars_svg(paises)
+        + "</div></div>"
+    )
+    return _page("Fábrica de talentos (Clube/País)", versao, corpo), len(clubes) + len(paises)
+
+# Visões do relatório: arquivo -> (título no menu, função que gera a página)
+VISOES = {
+    'wonderkids': ("Wonderkids", render_wonderkids),
+    'pechinchas': ("Melhor custo-benefício", render_bargains),
+    'talentos': ("Fábrica de talentos", render_talents),
+}
+
+# Corpo de cada processo: lê do banco o snapshot 'versao' (nada além de caminhos e da versão passa
+# entre processos), gera a página e a grava. Retorna (visão, linhas, segundos).
+def _render_view(nome: str, db_path: str, pasta: str, versao: str) -> tuple:
+    inicio = time.perf_counter()
+    df = read_snapshot(db_path, versao)
+    pagina, linhas = VISOES[nome][1](df, versao)
+    with open(os.path.join(pasta, f"{nome}.html"), 'w', encoding='utf-8') as f:
+        f.write(pagina)
+    return nome, linhas, round(time.perf_counter() - inicio, 2)
+
+def _write_text(caminho: str, texto: str) -> None:
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        f.write(texto)
+    os.replace(temporario, caminho)
+
+# Índice geral: o snapshot mais recente em destaque e a lista dos anteriores.
+def _write_root_index(destino: str) -> None:
+    snapshots = []
+    for pasta in sorted(os.listdir(destino), reverse=True):
+        manifesto = os.path.join(destino, pasta, 'manifest.json')
+        if os.path.isfile(manifesto):
+            with open(manifesto, encoding='utf-8') as f:
+                snapshots.append((pasta, json.load(f)))
+    itens = "".join(
+        f"<li><a href='{pasta}/index.html'>{html.escape(m['versao'])}</a>{' (mais recente)' if i == 0 else ''}</li>"
+        for i, (pasta, m) in enumerate(snapshots)
+    )
+    refresh = f"<meta http-equiv='refresh' content='0; url={snapshots[0][0]}/index.html'>" if snapshots else ""
+    _write_text(os.path.join(destino, 'index.html'), (
+        f"<!DOCTYPE html><html lang='pt-BR'><head><meta charset='utf-8'>{refresh}"
+        f"<title>Relatórios FM</title><style>{CSS}</style></head><body>"
+        f"<h1>Relatórios por snapshot</h1><ul>{itens}</ul></body></html>"
+    ))
+
+# Gera o relatório estático do snapshot mais recente em '<destino>/<snapshot>/', com as visões em
+# paralelo (um processo por visão). Todas as visões leem o snapshot resolvido aqui, mesmo que uma carga
+# publique outro no meio da geração. Se o snapshot já tem relatório, não refaz (a menos que 'forcar').
+# Retorna a pasta do relatório.
+def generate_report(db_path: str = DB_PATH, destino: str = None, workers: int = None, forcar: bool = False) -> str:
+    destino = destino or report_dir(db_path)
+    conn = connect_readonly(db_path)
+    try:
+        versao = get_data_version(conn)
+    finally:
+        conn.close()
+    if versao is None:
+        raise ValueError(f"O banco '{db_path}' não tem snapshots para o relatório.")
+
+    pasta = os.path.join(destino, snapshot_slug(versao))
+    manifesto = os.path.join(pasta, 'manifest.json')
+    if not forcar and os.path.isfile(manifesto):
+        with open(manifesto, encoding='utf-8') as f:
+            if json.load(f).get('versao') == versao:
+                print(f"Relatório do snapshot {versao} já existe em '{pasta}'.")
+                return pasta
+
+    print(f"Gerando relatório estático do snapshot {versao}...")
+    os.makedirs(destino, exist_ok=True)
+    temporaria = f"{pasta}.{os.getpid()}.tmp"
+    shutil.rmtree(temporaria, ignore_errors=True)
+    os.makedirs(temporaria)
+    try:
+        workers = min(len(VISOES), workers or os.cpu_count() or 1)
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futuros = [pool.submit(_render_view, nome, db_path, temporaria, versao) for nome in VISOES]
+                resultados = [futuro.result() for futuro in futuros]
+        else:
+            resultados = [_render_view(nome, db_path, temporaria, versao) for nome in VISOES]
+
+        visoes = {nome: {'linhas': linhas, 'segundos': segundos} for nome, linhas, segundos in resultados}
+        itens = "".join(
+            f"<li><a href='{nome}.html'>{html.escape(VISOES[nome][0])}</a></li>" for nome in VISOES
+        )
+        with open(os.path.join(temporaria, 'index.html'), 'w', encoding='utf-8') as f:
+            f.write(_page("Relatório de scouting", versao, f"<ul>{itens}</ul>"))
+        with open(os.path.join(temporaria, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump({
+                'versao': versao, 'gerado_em': datetime.now().isoformat(timespec='seconds'), 'visoes': visoes
+            }, f, ensure_ascii=False, indent=2)
+
+        # Troca a pasta inteira de uma vez: quem está lendo nunca vê um relatório pela metade
+        if os.path.isdir(pasta):
+            antiga = f"{pasta}.{os.getpid()}.old"
+            os.replace(pasta, antiga)
+            os.replace(temporaria, pasta)
+            shutil.rmtree(antiga, ignore_errors=True)
+        else:
+            os.replace(temporaria, pasta)
+    except Exception:
+        shutil.rmtree(temporaria, ignore_errors=True)
+        raise
+
+    _write_root_index(destino)
+    for nome, info in visoes.items():
+        print(f"  {nome}: {info['linhas']} linhas ({info['segundos']}s)")
+    print(f"Relatório gravado em '{pasta}'.")
+    return pasta
+
+if __name__ == '__main__':
+    # python -m src.report.report [--forcar]
+    try:
+        generate_report(forcar='--forcar' in sys.argv)
+    except Exception as e:
+        print(f"Erro ao gerar o relatório: {e}", file=sys.stderr)
+        sys.exit(1)
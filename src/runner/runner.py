@@ -0,0 +1,214 @@
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from datetime import datetime
+from typing import Callable, Optional
+
+from src.database.database import BASE_DIR, DB_PATH
+
+DATA_PATH = os.path.join(BASE_DIR, 'data', 'todos-jogadores.csv')
+
+# Arquivos de controle da execução em segundo plano (ao lado do banco)
+LOCK_PATH = os.path.join(BASE_DIR, 'database', 'etl.lock')
+STATUS_PATH = os.path.join(BASE_DIR, 'database', 'etl_status.json')
+
+# Uma trava vazia ou ilegível mais nova que isso (s) é de uma execução que ainda está gravando o pid
+CARENCIA_TRAVA = 5.0
+
+# Etapas do pipeline, na ordem
+ETAPAS = ['extract', 'transform', 'validate', 'load', 'report']
+
+# Processos iniciados por este servidor (guardados para serem recolhidos ao terminar)
+_processos = []
+
+# Executa extract -> transform -> validate -> load -> report, avisando 'progresso(etapa, mensagem, linhas)' a cada etapa.
+def run_pipeline(data_path: str = DATA_PATH, db_path: str = DB_PATH, table_name: str = 'players',
+                 progresso: Optional[Callable] = None) -> dict:
+    from src.extract.extract import extract_data
+    from src.transform.transform import transform_data
+    from src.validate.validate import validate_data
+    from src.load.load import load_data
+    from src.report.report import generate_report, VISOES
+
+    avisar = progresso or (lambda etapa, mensagem, linhas=None: None)
+
+    avisar('extract', "Extraindo dados brutos...")
+    df_bruto = extract_data(data_path)
+    if df_bruto is None:
+        raise FileNotFoundError(f"Não foi possível extrair os dados de '{data_path}'.")
+    avisar('extract', f"{len(df_bruto)} registros brutos extraídos.", len(df_bruto))
+
+    avisar('transform', "Transformando e limpando os dados...")
+    df_transformado = transform_data(df_bruto)
+    avisar('transform', f"{len(df_transformado)} registros limpos.", len(df_transformado))
+
+    avisar('validate', "Validando os dados...")
+    df_valido, quarentena, _ = validate_data(df_bruto, df_transformado, db_path)
+    avisar('validate', f"{len(df_valido)} registros aprovados, {len(quarentena)} problemas em quarentena.", len(df_valido))
+
+    avisar('load', "Carregando dados no banco...")
+    versoes = load_data(df_valido, db_path, table_name)
+    avisar('load', f"{versoes} versões gravadas.", versoes)
+
+    # O relatório estático é um extra: se falhar, os dados já carregados continuam valendo
+    avisar('report', "Gerando o relatório estático do snapshot...")
+    try:
+        relatorio = generate_report(db_path)
+        avisar('report', f"{len(VISOES)} visões gravadas em '{relatorio}'.", len(VISOES))
+    except Exception as e:
+        relatorio = None
+        print(f"Aviso: o relatório estático não foi gerado ({type(e).__name__}: {e}).", file=sys.stderr)
+        avisar('report', f"Relatório não gerado: {e}")
+
+    return {
+        'extraidas': len(df_bruto), 'transformadas': len(df_transformado),
+        'validadas': len(df_valido), 'versoes': versoes, 'relatorio': relatorio
+    }
+
+# Grava o status de forma atômica (o painel nunca lê um JSON pela metade).
+def _write_status(status_path: str, status: dict) -> None:
+    temporario = f"{status_path}.{os.getpid()}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(status, f, ensure_ascii=False)
+    os.replace(temporario, status_path)
+
+# Lê o status da última execução (ou None se nunca houve uma).
+def read_status(status_path: str = STATUS_PATH) -> Optional[dict]:
+    try:
+        with open(status_path, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def _pid_ativo(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+# Lê o pid gravado na trava (None se ela não existe, 0 se está vazia ou ilegível).
+def _read_lock(lock_path: str) -> Optional[int]:
+    try:
+        with open(lock_path, encoding='utf-8') as f:
+            return int(f.read().strip() or 0)
+    except FileNotFoundError:
+        return None
+    except ValueError:
+        return 0
+
+# Grava 'pid' num arquivo temporário ao lado da trava (quem lê a trava nunca a vê pela metade).
+def _write_pid(lock_path: str, pid: int) -> str:
+    temporario = f"{lock_path}.{os.getpid()}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        f.write(str(pid))
+    return temporario
+
+# Verdadeiro se há uma execução em andamento (remove travas deixadas por processos que morreram).
+def is_running(lock_path: str = LOCK_PATH) -> bool:
+    for processo in list(_processos):
+        if not processo.is_alive():
+            processo.join()
+            _processos.remove(processo)
+    pid = _read_lock(lock_path)
+    if pid is None:
+        return False
+    if pid and _pid_ativo(pid):
+        return True
+    if not pid:
+        try:
+            if time.time() - os.path.getmtime(lock_path) < CARENCIA_TRAVA:
+                return True
+        except FileNotFoundError:
+            return False
+    print(f"Removendo trava abandonada do ETL (pid {pid}).", file=sys.stderr)
+    try:
+        os.remove(lock_path)
+    except FileNotFoundError:
+        pass
+    return False
+
+# Cria a trava de forma atômica, já com o pid; falha se outra execução já a tem.
+def _acquire_lock(lock_path: str) -> bool:
+    if is_running(lock_path):
+        return False
+    temporario = _write_pid(lock_path, os.getpid())
+    try:
+        # link() não substitui um arquivo existente: só uma execução cria a trava
+        os.link(temporario, lock_path)
+    except FileExistsError:
+        return False
+    finally:
+        os.remove(temporario)
+    return True
+
+# Troca o pid da trava (de quem iniciou a execução para o processo que a roda), se ela ainda for nossa.
+def _transfer_lock(lock_path: str, de: int, para: int) -> None:
+    if _read_lock(lock_path) == de:
+        os.replace(_write_pid(lock_path, para), lock_path)
+
+# Remove a trava só se ela ainda tem o pid 'pid' (nunca a de outra execução).
+def _release_lock(lock_path: str, pid: int) -> None:
+    if _read_lock(lock_path) == pid:
+        try:
+            os.remove(lock_path)
+        except FileNotFoundError:
+            pass
+
+# Corpo do processo de segundo plano: roda o pipeline gravando o progresso no arquivo de status.
+def _worker(data_path: str, db_path: str, table_name: str, lock_path: str, status_path: str) -> None:
+    status = {
+        'estado': 'executando', 'pid': os.getpid(), 'iniciado_em': datetime.now().isoformat(timespec='seconds'),
+        'etapa': None, 'mensagem': "Iniciando...", 'linhas': {}, 'erro': None, 'finalizado_em': None,
+    }
+    inicio_etapa = {}
+
+    def progresso(etapa: str, mensagem: str, linhas: int = None) -> None:
+        inicio_etapa.setdefault(etapa, time.perf_counter())
+        status['etapa'] = etapa
+        status['mensagem'] = mensagem
+        if linhas is not None:
+            status['linhas'][etapa] = int(linhas)
+            status.setdefault('segundos', {})[etapa] = round(time.perf_counter() - inicio_etapa[etapa], 2)
+        _write_status(status_path, status)
+
+    try:
+        _write_status(status_path, status)
+        run_pipeline(data_path, db_path, table_name, progresso)
+        status['estado'] = 'concluido'
+        status['mensagem'] = "Pipeline concluído."
+    except Exception as e:
+        status['estado'] = 'erro'
+        status['erro'] = f"{type(e).__name__}: {e}"
+        print(traceback.format_exc(), file=sys.stderr)
+    finally:
+        status['finalizado_em'] = datetime.now().isoformat(timespec='seconds')
+        _write_status(status_path, status)
+        _release_lock(lock_path, os.getpid())
+
+# Inicia o pipeline num processo separado (nunca bloqueia quem chamou).
+# Retorna False se já existe uma execução em andamento.
+def start_pipeline_run(data_path: str = DATA_PATH, db_path: str = DB_PATH, table_name: str = 'players',
+                       lock_path: str = LOCK_PATH, status_path: str = STATUS_PATH) -> bool:
+    if not _acquire_lock(lock_path):
+        return False
+    try:
+        # 'spawn' evita herdar as threads do servidor do Streamlit num fork
+        contexto = multiprocessing.get_context('spawn')
+        processo = contexto.Process(
+            target=_worker, args=(data_path, db_path, table_name, lock_path, status_path),
+            name='etl-pipeline', daemon=False
+        )
+        processo.start()
+    except Exception:
+        _release_lock(lock_path, os.getpid())
+        raise
+    _processos.append(processo)
+    # A trava passa a apontar para o processo do pipeline; ele só a remove se ela ainda tiver o pid dele
+    _transfer_lock(lock_path, os.getpid(), processo.pid)
+    return True
@@ -0,0 +1,125 @@
+import math
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+# Transformação em paralelo para exports grandes: o DataFrame bruto é dividido em partições contíguas,
+# cada uma transformada num processo. As partições vão e voltam como streams Arrow IPC gravados em
+# memória compartilhada (só o nome do bloco e o tamanho passam pelo pipe do pool), então textos não
+# são serializados objeto a objeto como num DataFrame via pickle. Os resultados são concatenados na
+# ordem das partições, iguais aos do caminho serial.
+
+# Menor partição que compensa o custo de mover os dados entre processos
+MIN_LINHAS_POR_PARTICAO = 50_000
+
+def _pyarrow():
+    try:
+        import pyarrow
+        return pyarrow
+    except ImportError:
+        return None
+
+# Número de partições: uma por processo, sem ficar abaixo de 'min_linhas' por partição.
+def partition_count(n_linhas: int, workers: int, min_linhas: int = MIN_LINHAS_POR_PARTICAO) -> int:
+    return max(1, min(workers, math.ceil(n_linhas / max(min_linhas, 1))))
+
+# Grava a tabela como stream Arrow IPC direto num bloco novo de memória compartilhada.
+# Retorna (bloco, tamanho em bytes); quem recebe o bloco é responsável por liberá-lo.
+def _write_shared(tabela) -> tuple:
+    pa = _pyarrow()
+    medidor = pa.MockOutputStream()
+    with pa.ipc.new_stream(medidor, tabela.schema) as escritor:
+        escritor.write_table(tabela)
+    tamanho = medidor.size()
+
+    bloco = shared_memory.SharedMemory(create=True, size=max(tamanho, 1))
+    destino = pa.FixedSizeBufferWriter(pa.py_buffer(bloco.buf))
+    with pa.ipc.new_stream(destino, tabela.schema) as escritor:
+        escritor.write_table(tabela)
+    destino.close()
+    del destino  # solta a referência ao buffer antes de fechar o bloco
+    return bloco, tamanho
+
+# Lê um DataFrame de um bloco de memória compartilhada; com 'liberar', o bloco é removido depois.
+# O stream é lido direto do bloco (sem cópia intermediária); o bloco só é fechado depois que o
+# DataFrame, que tem memória própria, foi montado e as referências do Arrow ao bloco foram soltas.
+# Textos nulos voltam como NaN (o Arrow os entrega como None), como no restante do projeto.
+def _read_shared(nome: str, tamanho: int, liberar: bool = False) -> pd.DataFrame:
+    pa = _pyarrow()
+    bloco = shared_memory.SharedMemory(name=nome)
+    try:
+        leitor = pa.ipc.open_stream(pa.py_buffer(bloco.buf)[:tamanho])
+        tabela = leitor.read_all()
+        df = tabela.to_pandas()
+        del leitor, tabela
+    finally:
+        bloco.close()
+        if liberar:
+            bloco.unlink()
+    for coluna in df.columns:
+        if df[coluna].dtype == object:
+            df[coluna] = df[coluna].where(df[coluna].notna(), np.nan)
+    return df
+
+# Corpo de cada processo: lê a partição, roda o plano do pandas e devolve o resultado em outro bloco.
+def _transform_partition(nome: str, tamanho: int, colunas: dict) -> tuple:
+    from src.transform.transform import _run_pandas
+
+    pa = _pyarrow()
+    df_limpo = _run_pandas(_read_shared(nome, tamanho), colunas)
+    bloco, tamanho_saida = _write_shared(pa.Table.from_pandas(df_limpo, preserve_index=False))
+    nome_saida = bloco.name
+    bloco.close()
+    return nome_saida, tamanho_saida
+
+# Roda o plano do pandas ('_run_pandas') em 'workers' processos e concatena as partições em ordem.
+# Cai no caminho serial quando não há ganho (um processo, poucas linhas, sem pyarrow) ou quando as
+# colunas brutas não cabem em tipos Arrow (ex.: textos misturados com números no mesmo objeto).
+def run_partitioned(df: pd.DataFrame, colunas: dict, workers: int,
+                    min_linhas: int = MIN_LINHAS_POR_PARTICAO) -> pd.DataFrame:
+    from src.transform.transform import _run_pandas
+
+    pa = _pyarrow()
+    n_particoes = partition_count(len(df), workers, min_linhas)
+    if n_particoes == 1 or pa is None:
+        return _run_pandas(df, colunas)
+    try:
+        tabela = pa.Table.from_pandas(df[list(colunas)], preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+        print(f"Colunas brutas sem tipo Arrow ({e}); transformando em um único processo.")
+        return _run_pandas(df, colunas)
+
+    print(f"Transformando em {n_particoes} partições ({workers} processos)...")
+    limites = np.linspace(0, len(df), n_particoes + 1).astype(int)
+    entradas, saidas = [], []
+    try:
+        for inicio, fim in zip(limites[:-1], limites[1:]):
+            entradas.append(_write_shared(tabela.slice(inicio, fim - inicio)))
+        with ProcessPoolExecutor(max_workers=min(workers, n_particoes)) as pool:
+            futuros = [pool.submit(_transform_partition, bloco.name, tamanho, colunas) for bloco, tamanho in entradas]
+            erros = []
+            for futuro in futuros:
+                try:
+                    saidas.append(futuro.result())
+                except Exception as e:
+                    erros.append(e)
+        if erros:
+            raise erros[0]
+        partes = []
+        while saidas:
+            partes.append(_read_shared(*saidas.pop(0), liberar=True))
+    finally:
+        for bloco, _ in entradas:
+            bloco.close()
+            bloco.unlink()
+        # Blocos de saída não lidos (falha no meio do caminho)
+        for nome, _ in saidas:
+            try:
+                sobra = shared_memory.SharedMemory(name=nome)
+                sobra.close()
+                sobra.unlink()
+            except FileNotFoundError:
+                pass
+    return pd.concat(partes, ignore_index=True)
@@ -1,22 +1,10 @@
+import numpy as np
 import pandas as pd
 import datetime
 import sys
-from src.utils import convert_currency_to_float, convert_rating_to_float, extract_rating_suffix
 
-# Transformação completo nos dados brutos do FM.
-def transform_data(df: pd.DataFrame) -> pd.DataFrame:
-    print("Iniciando processo de transformação...")
-    
-    df_limpo = df.copy()
-
-    # 1. Remoção de Lixo 
-    linhas_antes = len(df_limpo)
-    df_limpo = df_limpo.dropna(subset=['Nome']).reset_index(drop=True)
-    linhas_depois = len(df_limpo)
-    print(f"Removidos {linhas_antes - linhas_depois} 'jogadores fantasmas'.")
-
-    # 2. Seleção e Renomeação de Colunas 
-    colunas_map = {
+# Colunas do export do Genie Scout usadas pela transformação (origem -> destino)
+COLUNAS_MAP = {
     # Informações básicas
     'Nome': 'nome',
     'País': 'pais',
@@ -28,31 +16,26 @@ def transform_data(df: pd.DataFrame) -> pd.DataFrame:
     'Melhor Classificação': 'classificacao_atual',
     'Melhor Classificação Potencial': 'classificacao_potencial',
 }
-    
-    df_limpo = df_limpo[list(colunas_map.keys())]
-    df_limpo = df_limpo.rename(columns=colunas_map)
 
-    # 3. Limpeza de Tipos de Dados
-    print("Aplicando limpeza de tipos de dados (moeda e classificações)...")
-    
-    df_limpo['sufixo_atual'] = df_limpo['classificacao_atual'].apply(extract_rating_suffix)
-    df_limpo['sufixo_potencial'] = df_limpo['classificacao_potencial'].apply(extract_rating_suffix)
-    df_limpo['valor'] = df_limpo['valor'].apply(convert_currency_to_float)
-    df_limpo['salario'] = df_limpo['salario'].apply(convert_currency_to_float)
-    df_limpo['classificacao_atual'] = df_limpo['classificacao_atual'].apply(convert_rating_to_float)
-    df_limpo['classificacao_potencial'] = df_limpo['classificacao_potencial'].apply(convert_rating_to_float)
-
-    # 4. Tratamento de Nulos (NaN)
-    print("Tratando valores nulos restantes...")
-    df_limpo['valor'] = df_limpo['valor'].fillna(0)
-    df_limpo['salario'] = df_limpo['salario'].fillna(0)
+# Identificador do jogador no export; mantido como 'id_unico' quando presente
+COLUNA_ID = 'ID Único'
 
-    # Data para usar de comparação
-    print("Adicionando data do snapshot...")
-    df_limpo['data_snapshot'] = datetime.datetime.now()
-    
-    # 5. Definir os Tipos de Dados Finais 
-    tipos_finais = {
+# Plano declarativo da transformação, executado por qualquer backend (pandas ou Polars).
+# Conversões: coluna -> parser ('moeda', 'classificacao'); derivadas: nova coluna -> ('sufixo', origem).
+PLANO = {
+    'descartar_nulos': ['Nome'],
+    'derivadas': {
+        'sufixo_atual': ('sufixo', 'classificacao_atual'),
+        'sufixo_potencial': ('sufixo', 'classificacao_potencial'),
+    },
+    'conversoes': {
+        'valor': 'moeda',
+        'salario': 'moeda',
+        'classificacao_atual': 'classificacao',
+        'classificacao_potencial': 'classificacao',
+    },
+    'preencher': {'valor': 0, 'salario': 0},
+    'tipos_finais': {
         'nome': 'object',
         'pais': 'object',
         'posicao': 'object',
@@ -63,9 +46,179 @@ def transform_data(df: pd.DataFrame) -> pd.DataFrame:
         'classificacao_atual': 'float64',
         'classificacao_potencial': 'float64',
         'data_snapshot': 'datetime64[ns]',
-        'sufixo_atual': 'object', 
+        'sufixo_atual': 'object',
         'sufixo_potencial': 'object'
-    }
+    },
+}
+
+BACKENDS = ('pandas', 'polars')
+
+# Usa o Polars (multithread) quando instalado; senão, o pandas.
+def _default_backend() -> str:
+    try:
+        import polars  # noqa: F401
+        return 'polars'
+    except ImportError:
+        return 'pandas'
+
+# --- Parsers vetorizados (mesmas regras de src/utils.py) ---
+
+# Texto com as funções de string do Arrow quando disponível (bem mais rápidas que as do Python)
+def _tipo_texto() -> str:
+    try:
+        import pyarrow  # noqa: F401
+        return 'string[pyarrow]'
+    except ImportError:
+        return 'string'
+
+# Versão pandas: só os textos passam pelo parser; números já são o valor final.
+def _texto_pandas(serie: pd.Series) -> tuple:
+    if not pd.api.types.is_object_dtype(serie) and not pd.api.types.is_string_dtype(serie):
+        return None, pd.to_numeric(serie, errors='coerce').astype('float64')
+    eh_texto = serie.map(type).eq(str).to_numpy()
+    numeros = pd.to_numeric(serie.where(~eh_texto), errors='coerce').astype('float64')
+    return serie.where(eh_texto).astype(_tipo_texto()), numeros
+
+def _moeda_pandas(serie: pd.Series) -> pd.Series:
+    texto, numeros = _texto_pandas(serie)
+    if texto is None:
+        return numeros
+    s = texto.str.strip().str.upper()
+    vazio = s.isin(['', '-', 'N/D'])
+    s = (s.str.replace('R$', '', regex=False).str.replace('P/S', '', regex=False).str.strip()
+         .str.replace('.', '', regex=False).str.replace(',', '.', regex=False))
+    multiplicador = np.select([s.str.endswith('M').fillna(False), s.str.endswith('K').fillna(False)], [1_000_000.0, 1_000.0], 1.0)
+    s = s.str.replace(r'[MK]$', '', regex=True)
+    convertido = pd.to_numeric(s, errors='coerce').astype('float64') * multiplicador
+    convertido[vazio.fillna(False).to_numpy()] = np.nan
+    return convertido.where(texto.notna().to_numpy(), numeros)
+
+def _classificacao_pandas(serie: pd.Series) -> pd.Series:
+    texto, numeros = _texto_pandas(serie)
+    if texto is None:
+        return numeros
+    s = texto.str.replace(r' .*', '', regex=True).str.replace('%', '', regex=False).str.replace(',', '.', regex=False)
+    convertido = pd.to_numeric(s, errors='coerce').astype('float64')
+    return convertido.where(texto.notna().to_numpy(), numeros)
+
+def _sufixo_pandas(serie: pd.Series) -> pd.Series:
+    eh_texto = serie.map(type).eq(str)
+    sufixo = serie.where(eh_texto).astype(_tipo_texto()).str.extract(r'\((.*?)\)', expand=False)
+    return sufixo.astype(object).where(sufixo.notna(), np.nan)
+
+PARSERS_PANDAS = {'moeda': _moeda_pandas, 'classificacao': _classificacao_pandas, 'sufixo': _sufixo_pandas}
+
+# Versão Polars: cada parser recebe a coluna e o tipo dela no quadro. Colunas já numéricas
+# (CSV tipado, quadro Arrow) não passam pelo parser de texto: o número já é o valor final.
+def _parsers_polars():
+    import polars as pl
+
+    def texto(coluna: str):
+        return pl.col(coluna).cast(pl.Utf8)
+
+    def moeda(coluna: str, tipo):
+        if tipo.is_numeric():
+            return pl.col(coluna).cast(pl.Float64)
+        s = texto(coluna).str.strip_chars().str.to_uppercase()
+        vazio = s.is_in(['', '-', 'N/D'])
+        s = (s.str.replace_all('R$', '', literal=True).str.replace_all('P/S', '', literal=True).str.strip_chars()
+             .str.replace_all('.', '', literal=True).str.replace_all(',', '.', literal=True))
+        multiplicador = (pl.when(s.str.ends_with('M')).then(1_000_000.0)
+                         .when(s.str.ends_with('K')).then(1_000.0).otherwise(1.0))
+        numero = s.str.replace(r'[MK]$', '').cast(pl.Float64, strict=False) * multiplicador
+        return pl.when(vazio).then(None).otherwise(numero)
+
+    def classificacao(coluna: str, tipo):
+        if tipo.is_numeric():
+            return pl.col(coluna).cast(pl.Float64)
+        s = texto(coluna).str.split(' ').list.first().str.replace_all('%', '', literal=True)
+        return s.str.replace_all(',', '.', literal=True).cast(pl.Float64, strict=False)
+
+    def sufixo(coluna: str, tipo):
+        if tipo.is_numeric():
+            return pl.lit(None, dtype=pl.Utf8)
+        return texto(coluna).str.extract(r'\((.*?)\)', 1)
+
+    return {'moeda': moeda, 'classificacao': classificacao, 'sufixo': sufixo}
+
+# --- Backends ---
+
+# Executa o plano com o pandas (vetorizado, sem .apply linha a linha).
+def _run_pandas(df: pd.DataFrame, colunas: dict) -> pd.DataFrame:
+    df_limpo = df.dropna(subset=PLANO['descartar_nulos'])[list(colunas)].rename(columns=colunas)
+    df_limpo = df_limpo.reset_index(drop=True)
+    for nova, (parser, origem) in PLANO['derivadas'].items():
+        df_limpo[nova] = PARSERS_PANDAS[parser](df_limpo[origem])
+    for coluna, parser in PLANO['conversoes'].items():
+        df_limpo[coluna] = PARSERS_PANDAS[parser](df_limpo[coluna])
+    return df_limpo.fillna(PLANO['preencher'])
+
+# Executa o plano no motor lazy (multithread) do Polars e devolve um DataFrame pandas.
+def _run_polars(df: pd.DataFrame, colunas: dict) -> pd.DataFrame:
+    import polars as pl
+
+    import pyarrow as pa
+
+    parsers = _parsers_polars()
+    try:
+        quadro = pl.from_pandas(df[list(colunas)])
+    except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+        # Textos misturados com números no mesmo objeto: o pandas trata cada valor pelo tipo
+        print(f"Colunas brutas sem tipo Arrow ({e}); transformando com o pandas.")
+        return _run_pandas(df, colunas)
+    tipos = quadro.rename(colunas).schema
+    plano = (
+        quadro.lazy()
+        .filter(pl.all_horizontal(pl.col(c).is_not_null() for c in PLANO['descartar_nulos']))
+        .rename(colunas)
+        .with_columns(
+            [parsers[parser](origem, tipos[origem]).alias(nova) for nova, (parser, origem) in PLANO['derivadas'].items()]
+        )
+        .with_columns([parsers[parser](coluna, tipos[coluna]).alias(coluna) for coluna, parser in PLANO['conversoes'].items()])
+        .with_columns([pl.col(c).fill_null(v) for c, v in PLANO['preencher'].items()])
+    )
+    df_limpo = plano.collect().to_pandas()
+    # Texto nulo do Polars vira None; o restante do projeto usa NaN
+    for coluna in df_limpo.columns:
+        if df_limpo[coluna].dtype == object:
+            df_limpo[coluna] = df_limpo[coluna].where(df_limpo[coluna].notna(), np.nan)
+    return df_limpo
+
+# Transformação completo nos dados brutos do FM.
+# 'backend' escolhe o motor ('pandas' ou 'polars'); por padrão usa o Polars se estiver instalado.
+# Com 'workers' > 1, o backend pandas divide exports grandes em partições transformadas em processos
+# separados (ver src/transform/parallel.py); o Polars já usa todos os núcleos e ignora o parâmetro.
+def transform_data(df: pd.DataFrame, backend: str = None, workers: int = None) -> pd.DataFrame:
+    backend = backend or _default_backend()
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend '{backend}' inválido. Use um de {BACKENDS}.")
+    print(f"Iniciando processo de transformação (backend '{backend}')...")
+
+    colunas = dict(COLUNAS_MAP)
+    if COLUNA_ID in df.columns:
+        colunas[COLUNA_ID] = 'id_unico'
+
+    linhas_antes = len(df)
+    print("Aplicando limpeza de tipos de dados (moeda e classificações)...")
+    if backend == 'polars':
+        if workers and workers > 1:
+            print("Aviso: 'workers' só vale no backend pandas; o Polars já usa todos os núcleos.")
+        df_limpo = _run_polars(df, colunas)
+    elif workers and workers > 1:
+        from src.transform.parallel import run_partitioned
+        df_limpo = run_partitioned(df, colunas, workers)
+    else:
+        df_limpo = _run_pandas(df, colunas)
+    print(f"Removidos {linhas_antes - len(df_limpo)} 'jogadores fantasmas'.")
+
+    # Data para usar de comparação
+    print("Adicionando data do snapshot...")
+    df_limpo['data_snapshot'] = datetime.datetime.now()
+
+    # Tipos de dados finais
+    tipos_finais = dict(PLANO['tipos_finais'])
+    if 'id_unico' in df_limpo.columns:
+        tipos_finais['id_unico'] = 'int64'
     df_limpo = df_limpo.astype(tipos_finais)
 
     print(f"Transformação concluída. DataFrame final com {len(df_limpo)} linhas.")
@@ -0,0 +1,160 @@
+import json
+import os
+import sqlite3
+import sys
+
+import numpy as np
+import pandas as pd
+
+from src.load.schema import format_snapshot, to_records
+from src.transform.transform import PARSERS_PANDAS, PLANO
+
+# Fração máxima de linhas com cada problema antes de abortar a carga.
+# 'nome_vazio' conta sobre o export inteiro (linhas sem nome são os "jogadores fantasmas",
+# esperados em pequena quantidade); as demais, sobre as linhas que sobraram da transformação.
+LIMITES = {
+    'nome_vazio': 0.5,
+    'moeda_invalida': 0.02,
+    'classificacao_fora_da_faixa': 0.01,
+    'idade_implausivel': 0.01,
+    'id_duplicado': 0.01,
+}
+
+# Faixas aceitas
+FAIXA_CLASSIFICACAO = (0.0, 100.0)
+FAIXA_IDADE = (13, 60)
+
+# Colunas do export checadas em cada regra
+COLUNAS_MOEDA = ['Valor Venda', 'Salário']
+COLUNAS_CLASSIFICACAO = ['classificacao_atual', 'classificacao_potencial']
+
+# Textos que a conversão de moeda trata como "sem valor" (não são falha de conversão)
+TEXTOS_SEM_VALOR = ['', '-', 'N/D']
+
+DDL_QUARENTENA = """
+CREATE TABLE IF NOT EXISTS quarantine (
+    quarantine_id INTEGER PRIMARY KEY,
+    data_snapshot TIMESTAMP NOT NULL,
+    linha_csv INTEGER NOT NULL,
+    regra TEXT NOT NULL,
+    registro TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_quarantine_snapshot ON quarantine (data_snapshot, regra)
+"""
+
+# Falha da validação: algum limite foi excedido e a carga não deve acontecer.
+class ValidationError(ValueError):
+    def __init__(self, relatorio: pd.DataFrame):
+        self.relatorio = relatorio
+        excedidas = relatorio[~relatorio['ok']]
+        detalhes = ", ".join(
+            f"{regra} {linha.taxa:.1%} (limite {linha.limite:.1%})" for regra, linha in excedidas.iterrows()
+        )
+        super().__init__(f"Dados reprovados na validação: {detalhes}.")
+
+# Posições (no export bruto) das linhas que a transformação mantém, na mesma ordem do DataFrame transformado.
+def _linhas_mantidas(df_bruto: pd.DataFrame) -> np.ndarray:
+    return np.flatnonzero(df_bruto[PLANO['descartar_nulos']].notna().all(axis=1).to_numpy())
+
+# Matriz linha x regra (indexada pela posição no export bruto): True onde a linha viola a regra.
+def check_rows(df_bruto: pd.DataFrame, df: pd.DataFrame) -> pd.DataFrame:
+    mantidas = _linhas_mantidas(df_bruto)
+    if len(mantidas) != len(df):
+        raise ValueError("O DataFrame transformado não corresponde ao export bruto informado.")
+
+    problemas = pd.DataFrame(False, index=pd.RangeIndex(len(df_bruto)), columns=list(LIMITES))
+
+    nome = df_bruto['Nome']
+    problemas['nome_vazio'] = (nome.isna() | nome.astype(str).str.strip().eq('')).to_numpy()
+
+    # Moeda: texto preenchido que o parser não conseguiu converter (a transformação o trocaria por 0)
+    for coluna in COLUNAS_MOEDA:
+        if coluna in df_bruto.columns:
+            bruto = df_bruto[coluna]
+            sem_valor = bruto.isna() | bruto.astype(str).str.strip().str.upper().isin(TEXTOS_SEM_VALOR)
+            falhou = PARSERS_PANDAS['moeda'](bruto).isna() & ~sem_valor
+            problemas['moeda_invalida'] |= falhou.to_numpy()
+
+    # Regras sobre os valores já convertidos, levadas de volta às posições do export
+    fora = np.zeros(len(df), dtype=bool)
+    for coluna in COLUNAS_CLASSIFICACAO:
+        valores = df[coluna].to_numpy(dtype='float64')
+        fora |= (valores < FAIXA_CLASSIFICACAO[0]) | (valores > FAIXA_CLASSIFICACAO[1])
+    problemas.loc[mantidas, 'classificacao_fora_da_faixa'] = fora
+
+    idade = df['idade'].to_numpy(dtype='float64')
+    problemas.loc[mantidas, 'idade_implausivel'] = (idade < FAIXA_IDADE[0]) | (idade > FAIXA_IDADE[1])
+
+    if 'id_unico' in df.columns:
+        problemas.loc[mantidas, 'id_duplicado'] = df['id_unico'].duplicated(keep=False).to_numpy()
+    return problemas
+
+# Resumo por regra: linhas afetadas, taxa, limite e se passou.
+def summarize(problemas: pd.DataFrame, n_mantidas: int, limites: dict = LIMITES) -> pd.DataFrame:
+    linhas = problemas.sum().astype('int64')
+    bases = pd.Series(max(n_mantidas, 1), index=linhas.index)
+    bases['nome_vazio'] = max(len(problemas), 1)
+    relatorio = pd.DataFrame({'linhas': linhas, 'taxa': linhas / bases, 'limite': pd.Series(limites)})
+    relatorio['ok'] = relatorio['taxa'] <= relatorio['limite']
+    return relatorio
+
+# Valida o snapshot transformado contra o export bruto de onde ele veio.
+# Retorna (linhas aprovadas, linhas em quarentena, relatório). As linhas com problema saem da carga
+# e vão para a quarentena (gravada em 'db_path', se informado, mesmo quando a validação reprova);
+# se alguma regra passar do limite, levanta ValidationError antes de qualquer carga.
+def validate_data(df_bruto: pd.DataFrame, df: pd.DataFrame, db_path: str = None, limites: dict = LIMITES) -> tuple:
+    print("Iniciando validação dos dados...")
+    problemas = check_rows(df_bruto, df)
+    relatorio = summarize(problemas, len(df), limites)
+    for regra, linha in relatorio.iterrows():
+        marca = '✔' if linha['ok'] else '✘'
+        print(f"  {marca} {regra}: {linha['linhas']} linhas ({linha['taxa']:.2%}, limite {linha['limite']:.0%})")
+
+    # Uma linha de quarentena por (linha do export, regra violada), com o registro bruto em JSON
+    posicoes, regras = np.nonzero(problemas.to_numpy())
+    data_snapshot = df['data_snapshot'].iloc[0] if len(df) else pd.Timestamp.now()
+    registros = df_bruto.iloc[posicoes].astype(object).where(df_bruto.iloc[posicoes].notna(), None)
+    quarentena = pd.DataFrame({
+        'data_snapshot': data_snapshot,
+        'linha_csv': posicoes + 2,  # +1 do cabeçalho, +1 porque o CSV conta a partir de 1
+        'regra': problemas.columns[regras],
+        'registro': [json.dumps(r, ensure_ascii=False, default=str) for r in registros.to_dict('records')],
+    })
+
+    mantidas = _linhas_mantidas(df_bruto)
+    aprovadas = ~problemas.iloc[mantidas].any(axis=1).to_numpy()
+    df_valido = df[aprovadas].reset_index(drop=True)
+    print(f"Validação: {len(df_valido)} linhas aprovadas, {len(df) - len(df_valido)} em quarentena.")
+
+    if db_path is not None:
+        write_quarantine(quarentena, db_path)
+    if not relatorio['ok'].all():
+        raise ValidationError(relatorio)
+    return df_valido, quarentena, relatorio
+
+# Grava as linhas em quarentena no banco (tabela 'quarantine'), numa transação própria.
+def write_quarantine(quarentena: pd.DataFrame, db_path: str) -> int:
+    if quarentena.empty:
+        return 0
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    registros = quarentena.assign(data_snapshot=quarentena['data_snapshot'].map(format_snapshot))
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        for comando in DDL_QUARENTENA.split(';'):
+            if comando.strip():
+                conn.execute(comando)
+        conn.executemany(
+            "INSERT INTO quarantine (data_snapshot, linha_csv, regra, registro) VALUES (?, ?, ?, ?)",
+            to_records(registros[['data_snapshot', 'linha_csv', 'regra', 'registro']])
+        )
+        conn.execute("COMMIT")
+    except sqlite3.Error as e:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        print(f"Erro ao gravar a quarentena: {e}", file=sys.stderr)
+        raise
+    finally:
+        conn.close()
+    print(f"{len(quarentena)} registros gravados na quarentena.")
+    return len(quarentena)
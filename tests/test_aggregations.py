@@ -0,0 +1,107 @@
+import os
+import sqlite3
+import numpy as np
+import pandas as pd
+import pytest
+import src.analysis.aggregations as modulo_agregacoes
+from src.analysis.aggregations import AggregationEngine
+from src.database.columnar import columnar_path, write_columnar
+
+# Roda os testes nos dois backends (o DuckDB só quando instalado).
+@pytest.fixture(params=['pandas', 'duckdb'])
+def backend(request) -> str:
+    if request.param == 'duckdb':
+        pytest.importorskip('duckdb')
+    return request.param
+
+@pytest.fixture
+def motor(df_historico, banco_historico, backend) -> AggregationEngine:
+    motor = AggregationEngine(df_historico, backend, db_path=banco_historico)
+    assert motor.backend == backend
+    yield motor
+    motor.close()
+
+# O mesmo histórico publicado num banco, com a cópia colunar que o DuckDB lê
+@pytest.fixture
+def banco_historico(df_historico, tmp_path) -> str:
+    db = str(tmp_path / "fm.db")
+    with sqlite3.connect(db) as conn:
+        df_historico.to_sql('players', conn, index=False)
+    conn.close()
+    write_columnar(db)
+    return db
+
+@pytest.fixture
+def df_historico() -> pd.DataFrame:
+    return pd.DataFrame({
+        'nome': ['A', 'B', 'C', 'D', 'E', 'A', 'B', 'F'],
+        'pais': ['Brasil', 'Brasil', 'Argentina', 'Uruguai', 'Argentina', 'Brasil', 'Brasil', 'Chile'],
+        'clube': ['X', 'X', 'Y', 'Y', 'Z', 'X', 'Y', 'Z'],
+        'idade': [19, 20, 21, 30, 18, 20, 21, 17],
+        'valor': [1e6, 2e6, np.nan, 5e5, 3e6, 1.5e6, 2.5e6, 1e5],
+        'classificacao_atual': [60.0, 55.0, 70.0, 75.0, 50.0, 62.0, 57.0, 40.0],
+        'classificacao_potencial': [90.0, 85.0, 92.0, 75.0, np.nan, 91.0, 86.0, 88.0],
+        'data_snapshot': ['2023-07-01 00:00:00'] * 5 + ['2024-01-01 00:00:00'] * 3,
+    })
+
+def test_club_potential(motor):
+    top = motor.club_potential(min_jogadores=2)
+    assert list(top.index) == ['X', 'Y']
+    assert top.loc['X', 'count'] == 3
+    assert top.loc['Y', 'mean'] == pytest.approx((92 + 75 + 86) / 3)
+    # O clube Z tem só um potencial conhecido
+    assert 'Z' not in top.index
+
+def test_country_counts(motor):
+    contagem = motor.country_counts(potencial_min=85, idade_max=21)
+    assert contagem.to_dict() == {'Brasil': 4, 'Argentina': 1, 'Chile': 1}
+    assert list(contagem.index) == ['Brasil', 'Argentina', 'Chile']
+
+def test_filtered_subset(motor, df_historico):
+    recorte = df_historico[df_historico['data_snapshot'] == '2024-01-01 00:00:00']
+    assert motor.country_counts(recorte, potencial_min=85, idade_max=21).to_dict() == {'Brasil': 2, 'Chile': 1}
+    assert motor.club_potential(recorte).index.tolist() == ['X', 'Z', 'Y']
+
+def test_snapshot_summary(motor):
+    resumo = motor.snapshot_summary('clube')
+    assert len(resumo) == 6
+    linha = resumo[(resumo['data_snapshot'] == '2023-07-01 00:00:00') & (resumo['clube'] == 'Y')].iloc[0]
+    assert linha['jogadores'] == 2
+    assert linha['valor_total'] == 5e5
+    assert linha['media_potencial'] == pytest.approx(83.5)
+
+def test_backends_agree(df_historico, banco_historico):
+    pytest.importorskip('duckdb')
+    pandas = AggregationEngine(df_historico, 'pandas')
+    duckdb = AggregationEngine(df_historico, 'duckdb', db_path=banco_historico)
+    pd.testing.assert_frame_equal(pandas.club_potential(), duckdb.club_potential(), check_dtype=False)
+    pd.testing.assert_series_equal(pandas.country_counts(potencial_min=85), duckdb.country_counts(potencial_min=85))
+    pd.testing.assert_frame_equal(
+        pandas.snapshot_summary('pais'), duckdb.snapshot_summary('pais'), check_dtype=False
+    )
+    duckdb.close()
+
+def test_duckdb_reads_the_database_not_the_frame(df_historico, banco_historico):
+    pytest.importorskip('duckdb')
+    # O quadro passado só serve aos recortes: o histórico inteiro vem do banco publicado
+    motor = AggregationEngine(df_historico.head(0), 'duckdb', db_path=banco_historico)
+    assert motor.snapshot_summary('pais')['jogadores'].sum() == len(df_historico)
+    recorte = df_historico[df_historico['idade'] <= 20]
+    assert motor.club_potential(recorte).index.tolist() == AggregationEngine(recorte).club_potential().index.tolist()
+    motor.close()
+
+def test_duckdb_falls_back_to_pandas(df_historico, banco_historico, monkeypatch):
+    assert AggregationEngine(df_historico, 'duckdb', db_path=os.path.join(os.path.dirname(banco_historico), 'nada.db')).backend == 'pandas'
+    # Sem a cópia colunar, o banco é anexado pela extensão sqlite do DuckDB; se ela não carrega, vale o pandas
+    os.remove(columnar_path(banco_historico))
+    sem_colunar = AggregationEngine(df_historico, 'duckdb', db_path=banco_historico)
+    assert sem_colunar.country_counts(potencial_min=85, idade_max=21).to_dict() == {'Brasil': 4, 'Argentina': 1, 'Chile': 1}
+    sem_colunar.close()
+    monkeypatch.setattr(modulo_agregacoes, '_duckdb', lambda: None)
+    motor = AggregationEngine(df_historico, 'duckdb', db_path=banco_historico)
+    assert motor.backend == 'pandas'
+    assert motor.country_counts(potencial_min=85, idade_max=21).to_dict() == {'Brasil': 4, 'Argentina': 1, 'Chile': 1}
+
+def test_default_backend_is_pandas(df_historico):
+    # Os recortes filtrados do dashboard são mais rápidos no pandas (benchmarks/bench_aggregations.py)
+    assert AggregationEngine(df_historico).backend == 'pandas'
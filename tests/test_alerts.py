@@ -0,0 +1,80 @@
+import sqlite3
+import pandas as pd
+import pytest
+import src.load.load as modulo_load
+from src.load.load import load_data
+from src.load.alerts import (
+    connect_watchlists, create_watchlist, set_watchlist_players, add_rule, mark_alerts_read, SQL_CANDIDATOS
+)
+from src.database.database import read_alerts, read_watchlists
+
+def _snapshot(fixture_dados_transformados, data: str) -> pd.DataFrame:
+    snapshot = fixture_dados_transformados.copy()
+    snapshot['id_unico'] = [101, 102, 103]
+    snapshot['data_snapshot'] = pd.Timestamp(data)
+    return snapshot
+
+@pytest.fixture
+def banco_com_watchlist(fixture_dados_transformados, tmp_path):
+    db = str(tmp_path / "fm.db")
+    load_data(_snapshot(fixture_dados_transformados, '2024-01-01'), db, "players")
+    with connect_watchlists(db) as conn:
+        alvos = create_watchlist(conn, "Alvos")
+        set_watchlist_players(conn, alvos, [101, 102])
+        add_rule(conn, 'potencial_subiu', 2.0, alvos)
+        add_rule(conn, 'valor_caiu', 20.0)
+        add_rule(conn, 'mudou_clube')
+    return db
+
+def test_rules_fire_only_for_watched_players_in_new_snapshot(banco_com_watchlist, fixture_dados_transformados):
+    novo = _snapshot(fixture_dados_transformados, '2024-06-01')
+    novo['classificacao_potencial'] = novo['classificacao_potencial'] + [3.0, 1.0, 5.0]  # 103 fora da watchlist
+    novo['valor'] = novo['valor'] * [1.0, 0.5, 0.1]
+    novo.loc[novo['id_unico'] == 101, 'clube'] = 'Clube Novo'
+    load_data(novo, banco_com_watchlist, "players")
+
+    with sqlite3.connect(banco_com_watchlist) as conn:
+        alertas = read_alerts(conn)
+    disparos = sorted(zip(alertas['player_id'], alertas['tipo']))
+    assert disparos == [(101, 'mudou_clube'), (101, 'potencial_subiu'), (102, 'valor_caiu')]
+    assert "Clube X → Clube Novo" in alertas.loc[alertas['tipo'] == 'mudou_clube', 'mensagem'].iloc[0]
+    assert "caiu 50%" in alertas.loc[alertas['tipo'] == 'valor_caiu', 'mensagem'].iloc[0]
+
+def test_unchanged_snapshot_and_reload_do_not_repeat_alerts(banco_com_watchlist, fixture_dados_transformados):
+    load_data(_snapshot(fixture_dados_transformados, '2024-06-01'), banco_com_watchlist, "players")
+    novo = _snapshot(fixture_dados_transformados, '2024-12-01')
+    novo['classificacao_potencial'] = novo['classificacao_potencial'] + 4.0
+    load_data(novo, banco_com_watchlist, "players")
+    load_data(novo, banco_com_watchlist, "players")
+
+    with sqlite3.connect(banco_com_watchlist) as conn:
+        alertas = read_alerts(conn)
+        assert list(alertas['player_id']) == [101, 102]
+        mark_alerts_read(conn)
+        assert read_alerts(conn).empty
+        assert read_watchlists(conn)['pendentes'].tolist() == [0]
+
+def test_candidates_reach_versions_through_indexes(banco_com_watchlist):
+    with sqlite3.connect(banco_com_watchlist) as conn:
+        plano = [linha[-1] for linha in conn.execute(f"EXPLAIN QUERY PLAN {SQL_CANDIDATOS}", {'snapshot_id': 1})]
+    assert not any(p.startswith('SCAN n') or p.startswith('SCAN a') or p.startswith('SCAN p') for p in plano)
+
+def test_alerts_of_players_removed_during_load_are_not_published(banco_com_watchlist, fixture_dados_transformados, monkeypatch):
+    gravar = modulo_load.write_snapshots
+
+    # O scout tira o 102 da watchlist enquanto a carga roda no staging
+    def gravar_e_editar(conn, df):
+        total = gravar(conn, df)
+        with connect_watchlists(banco_com_watchlist) as dashboard:
+            alvos = create_watchlist(dashboard, "Alvos")
+            set_watchlist_players(dashboard, alvos, [101])
+        return total
+
+    monkeypatch.setattr(modulo_load, 'write_snapshots', gravar_e_editar)
+    novo = _snapshot(fixture_dados_transformados, '2024-06-01')
+    novo['valor'] = novo['valor'] * [0.5, 0.5, 0.5]
+    load_data(novo, banco_com_watchlist, "players")
+
+    with sqlite3.connect(banco_com_watchlist) as conn:
+        alertas = read_alerts(conn)
+    assert sorted(zip(alertas['player_id'], alertas['tipo'])) == [(101, 'valor_caiu')]
@@ -0,0 +1,70 @@
+import gzip
+import json
+import threading
+import urllib.error
+import urllib.request
+import pytest
+import pandas as pd
+from src.load.load import load_data
+from src.api.api import APIServer
+
+@pytest.fixture
+def api(fixture_dados_transformados, tmp_path):
+    db_path = tmp_path / "test_fm_api.db"
+    df = pd.concat([fixture_dados_transformados] * 4, ignore_index=True)
+    df['id_unico'] = range(1, len(df) + 1)
+    df['classificacao_potencial'] = [float(i % 5) for i in range(len(df))]
+    load_data(df, str(db_path), "players")
+
+    servidor = APIServer(('127.0.0.1', 0), str(db_path), workers=4)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{servidor.server_address[1]}"
+    servidor.shutdown()
+    servidor.server_close()
+
+def _get(url: str, cabecalhos: dict = None):
+    resposta = urllib.request.urlopen(urllib.request.Request(url, headers=cabecalhos or {}))
+    corpo = resposta.read()
+    if resposta.headers.get('Content-Encoding') == 'gzip':
+        corpo = gzip.decompress(corpo)
+    return resposta, json.loads(corpo)
+
+def test_players_keyset_pagination_visits_every_row_once(api):
+    vistos, potenciais, cursor = [], [], None
+    while True:
+        url = f"{api}/players?limit=5" + (f"&cursor={cursor}" if cursor else "")
+        _, pagina = _get(url)
+        vistos += [item['player_id'] for item in pagina['items']]
+        potenciais += [item['classificacao_potencial'] for item in pagina['items']]
+        cursor = pagina['next_cursor']
+        if cursor is None:
+            break
+
+    assert sorted(vistos) == list(range(1, 13))
+    assert potenciais == sorted(potenciais, reverse=True)
+
+def test_players_filters_and_history(api):
+    _, pagina = _get(f"{api}/players?clube=Clube%20X,Clube%20Y&idade_max=22")
+    assert {item['clube'] for item in pagina['items']} == {'Clube X'}
+
+    _, historico = _get(f"{api}/players/1/history")
+    assert len(historico['items']) == 1
+
+def test_top_per_group(api):
+    _, top = _get(f"{api}/top?coluna=classificacao_potencial&n=1&por=clube")
+    assert len(top['items']) == 3
+    assert all(item['posicao_ranking'] == 1 for item in top['items'])
+
+def test_etag_revalidation_and_gzip(api):
+    resposta, _ = _get(f"{api}/players", {'Accept-Encoding': 'gzip'})
+    assert resposta.headers['Content-Encoding'] == 'gzip'
+
+    with pytest.raises(urllib.error.HTTPError) as erro:
+        _get(f"{api}/players", {'If-None-Match': resposta.headers['ETag']})
+    assert erro.value.code == 304
+
+def test_invalid_parameters_return_400(api):
+    for consulta in ["players?ordem=nome", "players?limit=-5", "players?limit=0", "top?n=-1"]:
+        with pytest.raises(urllib.error.HTTPError) as erro:
+            _get(f"{api}/{consulta}")
+        assert erro.value.code == 400, consulta
@@ -0,0 +1,81 @@
+import sqlite3
+import numpy as np
+import pandas as pd
+import pytest
+from src.analysis.cube import build_cube, role_tokens, cube_level
+from src.load.load import load_data
+from src.database.database import read_cube
+
+def _jogadores(n=300, semente=0) -> pd.DataFrame:
+    rng = np.random.default_rng(semente)
+    return pd.DataFrame({
+        'club_id': pd.array(rng.choice([1, 2, 3, None], n), dtype='Int64'),
+        'country_id': pd.array(rng.choice([10, 20], n), dtype='Int64'),
+        'faixa_etaria': rng.choice(['Sub-21', '22-25', '30+'], n),
+        'sufixo_atual': rng.choice(['M', 'A', 'M, A', None], n),
+        'classificacao_potencial': rng.uniform(60, 99, n).round(1),
+        'classificacao_atual': rng.uniform(40, 90, n).round(1),
+        'valor': rng.choice([np.nan, 1e5, 1e6], n),
+    })
+
+def _cubo(df: pd.DataFrame) -> pd.DataFrame:
+    tokens = role_tokens(df['sufixo_atual'])
+    return build_cube(df, tokens.map({'M': 100, 'A': 200}).astype('Int64'))
+
+def test_cube_levels_match_direct_groupby():
+    df = _jogadores()
+    cubo = _cubo(df)
+
+    nivel = cubo[cubo['nivel'] == cube_level(['club_id', 'faixa_etaria'])]
+    esperado = df.groupby(['club_id', 'faixa_etaria'], dropna=False)['classificacao_potencial'].agg(['count', 'sum', 'max'])
+    obtido = nivel.set_index(['club_id', 'faixa_etaria'])[['count_potencial', 'sum_potencial', 'max_potencial']]
+    obtido.columns = ['count', 'sum', 'max']
+    pd.testing.assert_frame_equal(obtido.sort_index(), esperado.sort_index(), check_dtype=False, check_names=False)
+
+    total = cubo[cubo['nivel'] == 0].iloc[0]
+    assert total['jogadores'] == len(df)
+    assert total['count_valor'] == df['valor'].notna().sum()
+    assert total['n_pot_90'] == (df['classificacao_potencial'] >= 90).sum()
+    assert len(cubo['nivel'].unique()) == 16
+
+def test_players_with_two_roles_count_once_in_subtotals():
+    df = _jogadores()
+    cubo = _cubo(df)
+    por_funcao = cubo[cubo['nivel'] == cube_level(['role_token_id'])].set_index('role_token_id')['jogadores']
+
+    assert por_funcao[100] == df['sufixo_atual'].str.contains('M', na=False).sum()
+    assert por_funcao[200] == df['sufixo_atual'].str.contains('A', na=False).sum()
+    assert por_funcao.sum() > len(df) - df['sufixo_atual'].isna().sum()
+    assert cubo.loc[cubo['nivel'] == 0, 'jogadores'].iloc[0] == len(df)
+
+def test_read_cube_drill_down_and_roll_up(fixture_dados_transformados, tmp_path):
+    db = str(tmp_path / "fm.db")
+    load_data(fixture_dados_transformados, db, "players")
+
+    with sqlite3.connect(db) as conn:
+        por_pais = read_cube(conn, ['pais']).set_index('pais')
+        detalhe = read_cube(conn, ['pais', 'clube'])
+        brasil = read_cube(conn, ['clube'], filtros={'pais': 'Brasil'})
+        with pytest.raises(KeyError):
+            read_cube(conn, ['posicao'])
+
+    assert por_pais.loc['Brasil', 'jogadores'] == 2
+    assert por_pais.loc['Brasil', 'media_potencial'] == pytest.approx(57.5)
+    # Roll-up do detalhe (somas) confere com o nível já materializado
+    assert detalhe.groupby('pais')['sum_potencial'].sum().to_dict() == pytest.approx(por_pais['sum_potencial'].to_dict())
+    assert sorted(brasil['clube']) == ['Clube X', 'Clube Y']
+
+def test_role_tokens_stay_out_of_roles_dimension(fixture_dados_transformados, tmp_path):
+    db = str(tmp_path / "fm.db")
+    df = fixture_dados_transformados.copy()
+    df['sufixo_atual'] = ['M, A', 'M', None]
+    load_data(df, db, "players")
+
+    with sqlite3.connect(db) as conn:
+        roles = {linha[0] for linha in conn.execute("SELECT nome FROM roles")}
+        tokens = {linha[0] for linha in conn.execute("SELECT nome FROM role_tokens")}
+        por_funcao = read_cube(conn, ['funcao']).set_index('funcao')['jogadores']
+
+    assert roles == {'M, A', 'M'} | set(df['sufixo_potencial'].dropna())
+    assert tokens == {'M', 'A'}
+    assert por_funcao[por_funcao.index.notna()].to_dict() == {'M': 2, 'A': 1}
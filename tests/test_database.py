@@ -0,0 +1,131 @@
+import os
+import pytest
+import sqlite3
+import threading
+import pandas as pd
+from src.database.database import (
+    connect_readonly, resolve_db_path, ReadOnlyConnectionPool, IncrementalPlayerFrame, BASE_DIR,
+    PlayerHistoryCache, read_player_histories
+)
+from src.database.columnar import columnar_path, open_columnar, write_columnar
+from src.load.load import load_data
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "test_ro.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE players (nome TEXT, idade INTEGER)")
+        conn.execute("INSERT INTO players VALUES ('Jogador A', 22)")
+    return str(path)
+
+def test_resolve_db_path_uses_project_root():
+    assert resolve_db_path('database/fm_database.db').startswith(BASE_DIR)
+    assert resolve_db_path('/tmp/x.db') == '/tmp/x.db'
+
+def test_connect_readonly_rejects_writes(db_path):
+    conn = connect_readonly(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM players").fetchone()[0] == 1
+    assert conn.execute("PRAGMA query_only").fetchone()[0] == 1
+    with pytest.raises(sqlite3.OperationalError):
+        conn.execute("INSERT INTO players VALUES ('Jogador B', 30)")
+    conn.close()
+
+def test_connect_readonly_missing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        connect_readonly(str(tmp_path / "nao_existe.db"))
+
+def test_pool_reuses_connection_per_thread(db_path):
+    pool = ReadOnlyConnectionPool(db_path)
+    assert pool.get() is pool.get()
+
+    outras = []
+    t = threading.Thread(target=lambda: outras.append(pool.get()))
+    t.start()
+    t.join()
+    assert outras[0] is not pool.get()
+    pool.close()
+
+def test_incremental_frame_appends_only_new_snapshots(db_path):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("DROP TABLE players")
+        conn.execute("CREATE TABLE players (nome TEXT, idade INTEGER, data_snapshot TIMESTAMP)")
+        conn.execute("INSERT INTO players VALUES ('Jogador A', 22, '2025-01-01 10:00:00')")
+
+    lidos = []
+    def prepare(df):
+        lidos.append(len(df))
+        return df
+
+    store = IncrementalPlayerFrame('players', prepare=prepare)
+    conn_ro = connect_readonly(db_path)
+    assert len(store.refresh(conn_ro)) == 1
+    assert len(store.refresh(conn_ro)) == 1
+    assert lidos == [1]
+
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("INSERT INTO players VALUES ('Jogador A', 23, '2025-02-01 10:00:00')")
+        conn.execute("INSERT INTO players VALUES ('Jogador B', 19, '2025-02-01 10:00:00')")
+
+    df = store.refresh(conn_ro)
+    assert len(df) == 3
+    assert lidos == [1, 2]
+    assert store.version == '2025-02-01 10:00:00'
+    conn_ro.close()
+
+def test_columnar_copy_is_used_only_when_current(fixture_dados_transformados, tmp_path):
+    db = str(tmp_path / "fm.db")
+    load_data(fixture_dados_transformados, db, 'players')
+    caminho = columnar_path(db)
+    assert os.path.exists(caminho)
+
+    # Mesmo conteúdo da view, com as colunas numéricas mapeadas somente leitura
+    conn_ro = connect_readonly(db)
+    df_sql = pd.read_sql_query("SELECT * FROM players", conn_ro)
+    df_arrow = open_columnar(caminho)
+    pd.testing.assert_frame_equal(df_arrow, df_sql)
+    assert not df_arrow['valor'].to_numpy().flags.writeable
+
+    store = IncrementalPlayerFrame('players', columnar_path=caminho)
+    assert not store.refresh(conn_ro)['valor'].to_numpy().flags.writeable
+
+    # Snapshot novo com a cópia colunar atualizada pela carga: reabre o mapeamento em vez de concatenar
+    load_data(fixture_dados_transformados.assign(data_snapshot=pd.Timestamp('2029-01-01')), db, 'players')
+    df = store.refresh(conn_ro)
+    assert len(df) == 6
+    assert not df['valor'].to_numpy().flags.writeable
+
+    # Cópia de uma versão anterior: a leitura completa volta para o SQLite
+    antigo = str(tmp_path / "antigo.arrow")
+    write_columnar(db, path=antigo)
+    load_data(fixture_dados_transformados.assign(data_snapshot=pd.Timestamp('2030-01-01')), db, 'players')
+    store = IncrementalPlayerFrame('players', columnar_path=antigo)
+    df = store.refresh(conn_ro)
+    assert len(df) == 9
+    assert df['valor'].to_numpy().flags.writeable
+    conn_ro.close()
+
+def test_history_cache_fetches_only_missing_players(db_path):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("DROP TABLE players")
+        conn.execute("CREATE TABLE players (nome TEXT, player_id INTEGER, data_snapshot TIMESTAMP)")
+        conn.executemany("INSERT INTO players VALUES (?, ?, ?)", [
+            (nome, pid, data) for pid, nome in [(1, 'A'), (2, 'B'), (3, 'C')]
+            for data in ['2025-01-01', '2025-02-01']
+        ])
+
+    conn_ro = connect_readonly(db_path)
+    assert list(read_player_histories(conn_ro, [3, 1])['player_id']) == [1, 1, 3, 3]
+
+    lidos = []
+    cache = PlayerHistoryCache('players', prepare=lambda df: lidos.append(sorted(df['player_id'].unique())) or df, max_jogadores=2)
+    assert list(cache.get(conn_ro, [2, 1], '2025-02-01')['nome']) == ['B', 'B', 'A', 'A']
+    assert list(cache.get(conn_ro, [1, 2, 3, 99], '2025-02-01')['nome']) == ['A', 'A', 'B', 'B', 'C', 'C']
+    assert lidos == [[1, 2], [3]]
+    assert cache.consultas == 2
+
+    # Limite de séries: as usadas há mais tempo saem; versão nova descarta tudo
+    cache.get(conn_ro, [3], '2025-02-01')
+    assert list(cache.series) == [99, 3]
+    cache.get(conn_ro, [3], '2025-03-01')
+    assert cache.consultas == 3
+    conn_ro.close()
@@ -0,0 +1,30 @@
+import pytest
+import pandas as pd
+from src.extract.extract import extract_data, COLUNA_ID
+from src.transform.transform import COLUNAS_MAP
+
+CSV_LARGO = (
+    '"Nome";"País";"Posição";"Clube";"Idade";"Salário";"Valor Venda";'
+    '"Melhor Classificação";"Melhor Classificação Potencial";"ID Único";"Finalização";"Passe"\n'
+    '"";"Inglaterra";"Def C, MD";"-";"23";"0";"0";"71.3% (M)";"78.8% (M)";"8826161";"12";"14"\n'
+    '"Jogador A";"Brasil";"M C";"Flamengo";"19";"50";"1.970";"54.5% (M)";"75.4% (M)";"2002098642";"9";"15"\n'
+)
+
+@pytest.fixture
+def csv_largo(tmp_path):
+    path = tmp_path / "export.csv"
+    path.write_bytes(CSV_LARGO.encode('latin1'))
+    return str(path)
+
+def test_extract_reads_only_needed_columns(csv_largo):
+    df = extract_data(csv_largo, engine='c')
+    assert list(df.columns) == list(COLUNAS_MAP.keys()) + [COLUNA_ID]
+    assert df['Idade'].dtype == 'int64'
+    assert df['Valor Venda'].iloc[1] == '1.970'
+    assert pd.isna(df['Nome'].iloc[0])
+
+def test_extract_pyarrow_matches_c_engine(csv_largo):
+    pytest.importorskip('pyarrow')
+    df_c = extract_data(csv_largo, engine='c')
+    df_arrow = extract_data(csv_largo, engine='pyarrow')
+    pd.testing.assert_frame_equal(df_c, df_arrow)
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+from src.analysis.growth import fit_growth_curves
+
+def _observacoes(jogadores: dict, inicio='2024-01-01', meses=6) -> pd.DataFrame:
+    linhas = []
+    for player_id, (idade, notas, potencial) in jogadores.items():
+        for i, nota in enumerate(notas):
+            linhas.append({
+                'player_id': player_id,
+                'data_snapshot': pd.Timestamp(inicio) + pd.DateOffset(months=meses * i),
+                'idade': idade + (meses * i) // 12,
+                'classificacao_atual': nota,
+                'classificacao_potencial': potencial,
+            })
+    return pd.DataFrame(linhas)
+
+def test_batched_fit_matches_per_player_least_squares():
+    rng = np.random.default_rng(0)
+    jogadores = {
+        i: (int(rng.integers(16, 30)), list(rng.uniform(40, 80, int(rng.integers(3, 7)))), 90.0)
+        for i in range(200)
+    }
+    obs = _observacoes(jogadores)
+    curvas = fit_growth_curves(obs, ridge=1e-9)
+
+    for player_id in [0, 57, 199]:
+        grupo = obs[obs['player_id'] == player_id].sort_values('data_snapshot')
+        anos = (grupo['data_snapshot'] - grupo['data_snapshot'].iloc[0]).dt.days.to_numpy() / 365.25
+        idade = grupo['idade'].iloc[0] + anos
+        taxa, intercepto = np.polyfit(idade, grupo['classificacao_atual'], 1)
+        linha = curvas.loc[player_id]
+        assert np.isclose(linha['taxa_anual'], taxa, atol=1e-5)
+        assert np.isclose(linha['nivel'], intercepto + taxa * idade[-1], atol=1e-5)
+        assert linha['n_obs'] == len(grupo)
+
+def test_projections_and_deficit():
+    # 101: 19 anos, +4 pontos por ano; 102: só uma observação; 103: já passou dos 27
+    obs = _observacoes({
+        101: (19, [60.0, 62.0, 64.0, 66.0], 80.0),
+        102: (20, [70.0], 75.0),
+        103: (30, [80.0, 80.0, 80.0], 82.0),
+    })
+    curvas = fit_growth_curves(obs, ridge=1e-9)
+
+    jovem = curvas.loc[101]
+    assert np.isclose(jovem['taxa_anual'], 4.0, atol=0.01)
+    assert np.isclose(jovem['idade_ref'], 20.5, atol=0.01)
+    assert np.isclose(jovem['proj_24'], jovem['nivel'] + jovem['taxa_anual'] * (24 - jovem['idade_ref']))
+    assert np.isclose(jovem['proj_27'], 92.0, atol=0.1)
+    assert jovem['deficit_potencial'] < 0
+    assert np.isnan(curvas.loc[103, 'proj_27'])
+    assert np.isclose(curvas.loc[103, 'deficit_potencial'], 2.0)
+
+    # Uma observação: a taxa é a típica da faixa etária (a do 101) e a curva passa pelo ponto
+    unico = curvas.loc[102]
+    assert unico['n_obs'] == 1
+    assert np.isclose(unico['nivel'], 70.0)
+    assert np.isclose(unico['taxa_anual'], jovem['taxa_anual'])
+
+def test_projections_stay_in_rating_range():
+    obs = _observacoes({1: (16, [10.0, 30.0, 50.0], 100.0)})
+    curvas = fit_growth_curves(obs)
+    assert curvas[['proj_21', 'proj_24', 'proj_27']].max(axis=1).iloc[0] == 100.0
+
+def test_empty_observations():
+    vazio = pd.DataFrame(columns=['player_id', 'data_snapshot', 'idade', 'classificacao_atual', 'classificacao_potencial'])
+    assert fit_growth_curves(vazio).empty
@@ -2,6 +2,8 @@ import pytest
 import sqlite3
 import pandas as pd
 from src.load.load import load_data
+from src.load.schema import compute_percentiles, SCHEMA_VERSION
+from src.database.database import read_growth
 
 def test_load_data_creates_db_file(fixture_dados_transformados, tmp_path):
     test_db_path = tmp_path / "test_fm.db"
@@ -24,3 +26,183 @@ def test_load_data_appends_data(fixture_dados_transformados, tmp_path):
         
     assert len(df_from_db) == len(fixture_dados_transformados) * 2
     assert len(df_from_db) == 6 
+
+def test_load_data_writes_normalized_schema(fixture_dados_transformados, tmp_path):
+    test_db_path = tmp_path / "test_fm_schema.db"
+    load_data(fixture_dados_transformados, str(test_db_path), "players")
+
+    with sqlite3.connect(test_db_path) as conn:
+        tipos = dict(conn.execute("SELECT name, type FROM sqlite_master").fetchall())
+        n_snapshots = conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+        n_paises = conn.execute("SELECT COUNT(*) FROM countries").fetchone()[0]
+        df_view = pd.read_sql("SELECT * FROM players", conn)
+
+    assert tipos['players'] == 'view'
+    assert tipos['player_versions'] == 'table'
+    assert n_snapshots == 1
+    assert n_paises == 2
+    assert set(fixture_dados_transformados.columns) <= set(df_view.columns)
+    assert sorted(df_view['clube']) == sorted(fixture_dados_transformados['clube'])
+
+def test_load_data_migrates_legacy_table(fixture_dados_transformados, tmp_path):
+    test_db_path = tmp_path / "test_fm_legado.db"
+    with sqlite3.connect(test_db_path) as conn:
+        fixture_dados_transformados.to_sql("players", conn, index=False)
+
+    load_data(fixture_dados_transformados, str(test_db_path), "players")
+
+    with sqlite3.connect(test_db_path) as conn:
+        tipo = conn.execute("SELECT type FROM sqlite_master WHERE name = 'players'").fetchone()[0]
+        df_view = pd.read_sql("SELECT * FROM players", conn)
+
+    assert tipo == 'view'
+    assert len(df_view) == len(fixture_dados_transformados) * 2
+
+def test_load_data_stores_only_changed_versions(fixture_dados_transformados, tmp_path):
+    test_db_path = tmp_path / "test_fm_scd.db"
+    snapshot_1 = fixture_dados_transformados.copy()
+    snapshot_1['id_unico'] = [101, 102, 103]
+    snapshot_1['data_snapshot'] = pd.Timestamp('2025-01-01 10:00:00')
+
+    # Snapshot 2: 101 sem mudança, 102 mudou de clube, 103 saiu e 104 entrou
+    snapshot_2 = snapshot_1.copy()
+    snapshot_2['data_snapshot'] = pd.Timestamp('2025-02-01 10:00:00')
+    snapshot_2.loc[snapshot_2['id_unico'] == 102, 'clube'] = 'Clube Novo'
+    snapshot_2.loc[snapshot_2['id_unico'] == 103, ['id_unico', 'nome']] = [104, 'Jogador D']
+
+    load_data(snapshot_1, str(test_db_path), "players")
+    load_data(snapshot_2, str(test_db_path), "players")
+
+    with sqlite3.connect(test_db_path) as conn:
+        n_versoes = conn.execute("SELECT COUNT(*) FROM player_versions").fetchone()[0]
+        df_view = pd.read_sql("SELECT * FROM players", conn)
+
+    assert n_versoes == 5
+    df_s2 = df_view[df_view['data_snapshot'] == '2025-02-01 10:00:00'].set_index('player_id')
+    assert sorted(df_s2.index) == [101, 102, 104]
+    assert df_s2.loc[102, 'clube'] == 'Clube Novo'
+    df_s1 = df_view[df_view['data_snapshot'] == '2025-01-01 10:00:00'].set_index('player_id')
+    assert sorted(df_s1.index) == [101, 102, 103]
+    assert df_s1.loc[102, 'clube'] == 'Clube Y'
+
+def test_load_data_keeps_last_row_of_repeated_player_id(fixture_dados_transformados, tmp_path):
+    db = str(tmp_path / "fm.db")
+    snapshot_1 = fixture_dados_transformados.copy()
+    snapshot_1['id_unico'] = [101, 102, 103]
+    snapshot_1['data_snapshot'] = pd.Timestamp('2025-01-01')
+    load_data(snapshot_1, db, "players")
+
+    # 101 aparece duas vezes: a primeira linha (sem mudança) não pode casar com a versão de outra linha
+    snapshot_2 = pd.concat([snapshot_1.iloc[[0]], snapshot_1], ignore_index=True)
+    snapshot_2['data_snapshot'] = pd.Timestamp('2025-02-01')
+    snapshot_2.loc[1, 'clube'] = 'Clube Novo'
+    load_data(snapshot_2, db, "players")
+
+    with sqlite3.connect(db) as conn:
+        atuais = pd.read_sql_query(
+            "SELECT v.player_id, cl.nome AS clube FROM player_versions v JOIN clubs cl USING (club_id) "
+            "WHERE v.valid_to IS NULL ORDER BY v.player_id", conn
+        )
+    assert list(atuais['player_id']) == [101, 102, 103]
+    assert atuais.loc[0, 'clube'] == 'Clube Novo'
+
+def test_load_data_rejects_snapshot_older_than_latest(fixture_dados_transformados, tmp_path):
+    db = str(tmp_path / "fm.db")
+    load_data(fixture_dados_transformados.assign(data_snapshot=pd.Timestamp('2025-02-01')), db, "players")
+    with pytest.raises(ValueError, match="anterior"):
+        load_data(fixture_dados_transformados.assign(data_snapshot=pd.Timestamp('2025-01-01')), db, "players")
+    with sqlite3.connect(db) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0] == 1
+
+def test_compute_percentiles_within_cohorts():
+    df = pd.DataFrame({
+        'role_id': [1, 1, 1, 1, 2, 1],
+        'idade': [19, 20, 21, 18, 19, 30],
+        'classificacao_atual': [50.0, 60.0, 70.0, 80.0, 10.0, 99.0],
+        'classificacao_potencial': [80.0, 80.0, 70.0, 60.0, 10.0, 99.0],
+        'valor': [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+        'salario': [1.0, 1.0, 1.0, 1.0, 1.0, 1.0],
+    })
+    pct = compute_percentiles(df)
+
+    assert list(pct['faixa_etaria']) == ['Sub-21', 'Sub-21', 'Sub-21', 'Sub-21', 'Sub-21', '30+']
+    assert list(pct['pct_atual']) == [0.25, 0.5, 0.75, 1.0, 1.0, 1.0]
+    assert list(pct['pct_potencial'][:4]) == [1.0, 1.0, 0.5, 0.25]
+
+def test_load_data_stores_cohort_percentiles(fixture_dados_transformados, tmp_path):
+    test_db_path = tmp_path / "test_fm_percentis.db"
+    load_data(fixture_dados_transformados, str(test_db_path), "players")
+
+    with sqlite3.connect(test_db_path) as conn:
+        n_percentis = conn.execute("SELECT COUNT(*) FROM player_percentiles").fetchone()[0]
+        df_view = pd.read_sql("SELECT * FROM players", conn)
+
+    assert n_percentis == len(fixture_dados_transformados)
+    # Cada jogador do fixture está sozinho na sua coorte
+    assert (df_view['pct_atual'].dropna() == 1.0).all()
+    assert df_view['faixa_etaria'].notna().all()
+
+def test_load_data_adds_percentiles_to_existing_history(fixture_dados_transformados, tmp_path):
+    test_db_path = tmp_path / "test_fm_v2.db"
+    load_data(fixture_dados_transformados, str(test_db_path), "players")
+    with sqlite3.connect(test_db_path) as conn:
+        conn.execute("DROP VIEW players")
+        conn.execute("DELETE FROM player_percentiles")
+        conn.execute("CREATE VIEW players AS SELECT * FROM player_versions")
+        conn.execute("PRAGMA user_version = 2")
+
+    load_data(fixture_dados_transformados, str(test_db_path), "players")
+
+    with sqlite3.connect(test_db_path) as conn:
+        n_versoes = conn.execute("SELECT COUNT(*) FROM player_versions").fetchone()[0]
+        df_view = pd.read_sql("SELECT * FROM players", conn)
+
+    assert n_versoes == len(fixture_dados_transformados) * 2
+    assert len(df_view) == len(fixture_dados_transformados) * 2
+    assert df_view['faixa_etaria'].notna().all()
+
+def test_load_data_fits_growth_curves(fixture_dados_transformados, tmp_path):
+    test_db_path = tmp_path / "test_fm_curvas.db"
+    snapshot_1 = fixture_dados_transformados.copy()
+    snapshot_1['id_unico'] = [101, 102, 103]
+    snapshot_1['data_snapshot'] = pd.Timestamp('2025-01-01 10:00:00')
+    snapshot_2 = snapshot_1.copy()
+    snapshot_2['data_snapshot'] = pd.Timestamp('2026-01-01 10:00:00')
+    snapshot_2['idade'] = snapshot_2['idade'] + 1
+    snapshot_2['classificacao_atual'] = snapshot_2['classificacao_atual'] + [5.0, 0.0, -2.0]
+
+    load_data(snapshot_1, str(test_db_path), "players")
+    load_data(snapshot_2, str(test_db_path), "players")
+
+    with sqlite3.connect(test_db_path) as conn:
+        curvas = pd.read_sql("SELECT * FROM player_growth", conn).set_index('player_id')
+        no_caminho = read_growth(conn, deficit_max=0.0)
+        plano = " ".join(str(linha) for linha in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT player_id FROM player_growth WHERE deficit_potencial <= 0"
+        ))
+
+    assert sorted(curvas.index) == [101, 102, 103]
+    assert (curvas['n_obs'] == 2).all()
+    assert (curvas['ultimo_snapshot_id'] == 2).all()
+    assert curvas.loc[101, 'taxa_anual'] > 4.0
+    assert curvas.loc[102, 'nivel'] == pytest.approx(45.0)
+    assert list(no_caminho['nome']) == ['Jogador A', 'Jogador B (Rico)']
+    assert 'ix_player_growth_deficit' in plano
+
+def test_load_data_adds_growth_curves_to_v3_history(fixture_dados_transformados, tmp_path):
+    test_db_path = tmp_path / "test_fm_v3.db"
+    snapshot = fixture_dados_transformados.copy()
+    snapshot['id_unico'] = [101, 102, 103]
+    load_data(snapshot, str(test_db_path), "players")
+    with sqlite3.connect(test_db_path) as conn:
+        conn.execute("DROP TABLE player_growth")
+        conn.execute("PRAGMA user_version = 3")
+        assert read_growth(conn).empty
+
+    load_data(snapshot.iloc[:0], str(test_db_path), "players")
+
+    with sqlite3.connect(test_db_path) as conn:
+        versao = conn.execute("PRAGMA user_version").fetchone()[0]
+        n_curvas = conn.execute("SELECT COUNT(*) FROM player_growth").fetchone()[0]
+    assert versao == SCHEMA_VERSION
+    assert n_curvas == 3
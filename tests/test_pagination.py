@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+from src.analysis.pagination import SortedPager
+
+def _todas_as_paginas(pager, coluna, decrescente, mascara, tamanho):
+    posicoes, cursor = [], -1
+    while True:
+        pagina, cursor = pager.page(coluna, decrescente, mascara, cursor, tamanho)
+        posicoes.extend(pagina)
+        if cursor is None:
+            return posicoes
+
+def test_pages_match_full_sort_with_filter():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'valor': rng.integers(0, 20, 1000).astype(float)})
+    df.loc[rng.random(1000) < 0.1, 'valor'] = np.nan
+    mascara = rng.random(1000) < 0.3
+    pager = SortedPager(df, ['valor'])
+
+    for decrescente in (True, False):
+        esperado = df[mascara].sort_values(
+            'valor', ascending=not decrescente, kind='stable', na_position='last'
+        ).index.tolist()
+        assert _todas_as_paginas(pager, 'valor', decrescente, mascara, 37) == esperado
+
+def test_last_page_has_no_cursor():
+    df = pd.DataFrame({'idade': [20.0, 30.0, 25.0]})
+    pager = SortedPager(df, ['idade'])
+    pagina, cursor = pager.page('idade', False, np.ones(3, dtype=bool), tamanho=3)
+    assert list(pagina) == [0, 2, 1]
+    assert cursor is None
@@ -0,0 +1,63 @@
+import functools
+import json
+import time
+
+from src.profiling.profiling import CacheStats, RerunProfiler, overlay_enabled
+
+def test_checkpoints_split_rerun_into_sections(tmp_path):
+    log = tmp_path / 'perf.jsonl'
+    perf = RerunProfiler(log_path=str(log))
+    for _ in range(3):
+        perf.start()
+        time.sleep(0.002)
+        perf.checkpoint('carga')
+        perf.checkpoint('filtros')
+        registro = perf.finish(cache={'pager': {'hits': 1, 'misses': 0}})
+
+    assert list(registro['secoes']) == ['carga', 'filtros', 'outros']
+    assert registro['secoes']['carga'] >= 2
+    assert abs(sum(registro['secoes'].values()) - registro['total_ms']) < 0.1
+
+    resumo = perf.summary()
+    assert list(resumo.index) == ['carga', 'filtros', 'outros', 'total']
+    assert resumo.loc['total', 'fatia'] == 1.0
+    assert len(perf.historico) == 3
+
+    linhas = [json.loads(linha) for linha in log.read_text().splitlines()]
+    assert len(linhas) == 3
+    assert linhas[-1]['cache'] == {'pager': {'hits': 1, 'misses': 0}}
+
+def test_inactive_profiler_records_nothing():
+    perf = RerunProfiler(ativo=False)
+    perf.start()
+    perf.checkpoint('carga')
+    assert perf.finish() is None
+    assert perf.summary().empty
+
+def test_cache_stats_count_hits_and_misses():
+    stats = CacheStats()
+
+    @stats.track('quadrado', functools.lru_cache(maxsize=None))
+    def quadrado(x):
+        return x * x
+
+    stats.start_rerun()
+    assert [quadrado(2), quadrado(2), quadrado(3)] == [4, 4, 9]
+    assert stats.rerun_counts() == {'quadrado': {'hits': 1, 'misses': 2}}
+
+    stats.start_rerun()
+    quadrado(3)
+    assert stats.rerun_counts() == {'quadrado': {'hits': 1, 'misses': 0}}
+    totais = stats.totals().loc['quadrado']
+    assert (totais['chamadas'], totais['hits'], totais['misses']) == (4, 2, 2)
+    assert totais['taxa_acerto'] == 0.5
+
+    quadrado.cache_clear()
+    quadrado(3)
+    assert stats.totals().loc['quadrado', 'misses'] == 3
+
+def test_overlay_enabled_by_env_or_query_param():
+    assert overlay_enabled({'FM_PERF_OVERLAY': '1'}, {})
+    assert overlay_enabled({}, {'perf': 'true'})
+    assert not overlay_enabled({}, {'perf': '0'})
+    assert not overlay_enabled({}, {})
@@ -0,0 +1,68 @@
+import os
+import sqlite3
+import pandas as pd
+import pytest
+from src.load.load import load_data
+from src.load.publish import TABELAS_PUBLICADAS, TABELAS_NAO_PUBLICADAS, staging_path, publication_marker
+from src.database.database import connect_readonly
+
+def _snapshot(fixture_dados_transformados, data: str) -> pd.DataFrame:
+    snapshot = fixture_dados_transformados.copy()
+    snapshot['id_unico'] = [101, 102, 103]
+    snapshot['data_snapshot'] = pd.Timestamp(data)
+    return snapshot
+
+def test_reader_keeps_its_snapshot_while_load_publishes(fixture_dados_transformados, tmp_path):
+    db = str(tmp_path / "fm.db")
+    load_data(_snapshot(fixture_dados_transformados, '2024-01-01'), db, "players")
+
+    leitor = connect_readonly(db)
+    try:
+        # Transação de leitura aberta durante toda a carga: no modo de journal antigo a publicação
+        # esperaria por ela até estourar o timeout ("database is locked")
+        leitor.execute("BEGIN")
+        antes = leitor.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+        novo = _snapshot(fixture_dados_transformados, '2024-06-01')
+        novo['classificacao_potencial'] = novo['classificacao_potencial'] + 2.0
+        load_data(novo, db, "players")
+        assert leitor.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0] == antes
+        leitor.execute("COMMIT")
+        assert leitor.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0] == antes + 1
+    finally:
+        leitor.close()
+
+def test_publication_bumps_marker_and_matches_direct_load(fixture_dados_transformados, tmp_path):
+    db = str(tmp_path / "fm.db")
+    primeiro = _snapshot(fixture_dados_transformados, '2024-01-01')
+    segundo = _snapshot(fixture_dados_transformados, '2024-06-01')
+    segundo.loc[segundo['id_unico'] == 101, 'clube'] = 'Clube Novo'
+    load_data(primeiro, db, "players")
+    load_data(segundo, db, "players")
+
+    with sqlite3.connect(db) as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        assert publication_marker(conn) == 2
+        assert conn.execute("SELECT snapshots, versoes FROM publications ORDER BY publication_id").fetchall() == [('1', 3), ('2', 1)]
+        abertas = conn.execute("SELECT COUNT(*) FROM player_versions WHERE valid_to IS NULL").fetchone()[0]
+        fechadas = conn.execute("SELECT valid_to FROM player_versions WHERE valid_to IS NOT NULL").fetchall()
+        publicado = pd.read_sql_query("SELECT * FROM players ORDER BY data_snapshot, player_id", conn)
+    assert (abertas, fechadas) == (3, [(2,)])
+    assert not os.path.exists(staging_path(db))
+
+    # Mesmo resultado de uma carga única com os dois snapshots
+    direto = str(tmp_path / "direto.db")
+    load_data(pd.concat([primeiro, segundo], ignore_index=True), direto, "players")
+    with sqlite3.connect(direto) as conn:
+        esperado = pd.read_sql_query("SELECT * FROM players ORDER BY data_snapshot, player_id", conn)
+    pd.testing.assert_frame_equal(publicado, esperado)
+
+def test_every_table_has_a_publication_rule(fixture_dados_transformados, tmp_path):
+    db = str(tmp_path / "fm.db")
+    load_data(_snapshot(fixture_dados_transformados, '2024-01-01'), db, "players")
+    with sqlite3.connect(db) as conn:
+        tabelas = {linha[0] for linha in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+        )}
+    regras = set(TABELAS_PUBLICADAS) | TABELAS_NAO_PUBLICADAS
+    assert tabelas <= regras
+    assert not set(TABELAS_PUBLICADAS) & TABELAS_NAO_PUBLICADAS
@@ -0,0 +1,85 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+from src.load.load import load_data
+import src.report.report as modulo_report
+from src.report.report import generate_report, snapshot_slug, VISOES
+
+def _banco(tmp_path, snapshot='2024-01-01 00:00:00', n=60, prefixo='Jogador') -> str:
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'player_id': np.arange(n) + 1,
+        'nome': [f"{prefixo} <{i}>" for i in range(n)],
+        'pais': rng.choice(['Brasil', 'Argentina', None], n),
+        'posicao': rng.choice(['PL', 'M C', 'DC'], n),
+        'clube': rng.choice(['Clube X', 'Clube Y', 'Clube Z'], n),
+        'idade': rng.integers(16, 34, n),
+        'valor': rng.choice([0.0, 5e4, 2e5, 1e6, 3e7], n),
+        'salario': rng.uniform(1e3, 1e5, n),
+        'classificacao_atual': rng.uniform(40, 80, n).round(1),
+        'sufixo_atual': rng.choice(['M', 'A', None], n),
+        'classificacao_potencial': rng.uniform(80, 99, n).round(1),
+        'sufixo_potencial': None,
+        'data_snapshot': pd.Timestamp(snapshot),
+    })
+    caminho = str(tmp_path / "fm.db")
+    load_data(df, caminho, 'players')
+    return caminho
+
+def test_report_writes_self_contained_views(tmp_path):
+    db = _banco(tmp_path)
+    pasta = generate_report(db, workers=1)
+
+    assert os.path.basename(pasta) == snapshot_slug('2024-01-01 00:00:00')
+    manifesto = json.loads(open(os.path.join(pasta, 'manifest.json'), encoding='utf-8').read())
+    assert set(manifesto['visoes']) == set(VISOES)
+    for nome in VISOES:
+        pagina = open(os.path.join(pasta, f"{nome}.html"), encoding='utf-8').read()
+        # Autocontido: nada de scripts nem recursos externos; nomes escapados
+        assert '<script' not in pagina and 'src=' not in pagina
+        assert '<Jogador' not in pagina
+    pechinchas = open(os.path.join(pasta, 'pechinchas.html'), encoding='utf-8').read()
+    assert '<svg' in pechinchas and '&lt;' in pechinchas
+    assert manifesto['visoes']['wonderkids']['linhas'] > 0
+
+def test_report_is_generated_once_per_snapshot(tmp_path):
+    db = _banco(tmp_path)
+    pasta = generate_report(db, workers=1)
+    pagina = os.path.join(pasta, 'wonderkids.html')
+    os.remove(pagina)
+
+    assert generate_report(db, workers=1) == pasta
+    assert not os.path.exists(pagina)
+    generate_report(db, workers=1, forcar=True)
+    assert os.path.exists(pagina)
+
+def test_root_index_lists_snapshots_newest_first(tmp_path):
+    db = _banco(tmp_path)
+    generate_report(db, workers=1)
+    _banco(tmp_path, snapshot='2024-06-01 00:00:00')
+    generate_report(db, workers=1)
+
+    indice = open(tmp_path / "reports" / "index.html", encoding='utf-8').read()
+    assert indice.index('2024-06-01') < indice.index('2024-01-01')
+    assert not [p for p in os.listdir(tmp_path / "reports") if p.endswith(('.tmp', '.old'))]
+
+def test_all_views_read_the_snapshot_resolved_at_start(tmp_path, monkeypatch):
+    db = _banco(tmp_path)
+    ler = modulo_report.read_snapshot
+    cargas = []
+
+    # Uma carga publica outro snapshot logo depois da primeira visão ler o dela
+    def ler_e_carregar(db_path, versao):
+        df = ler(db_path, versao)
+        if not cargas:
+            cargas.append(_banco(tmp_path, snapshot='2024-06-01 00:00:00', prefixo='Novo'))
+        return df
+
+    monkeypatch.setattr(modulo_report, 'read_snapshot', ler_e_carregar)
+    pasta = generate_report(db, workers=1)
+
+    assert cargas and os.path.basename(pasta) == snapshot_slug('2024-01-01 00:00:00')
+    for nome in VISOES:
+        pagina = open(os.path.join(pasta, f"{nome}.html"), encoding='utf-8').read()
+        assert 'Novo &lt;' not in pagina and '2024-06-01' not in pagina
@@ -0,0 +1,73 @@
+import os
+import time
+import sqlite3
+from src.runner.runner import (
+    run_pipeline, start_pipeline_run, read_status, is_running, _acquire_lock, _release_lock, CARENCIA_TRAVA
+)
+
+def _csv_bruto(fixture_dados_brutos, tmp_path) -> str:
+    caminho = tmp_path / "jogadores.csv"
+    fixture_dados_brutos.to_csv(caminho, sep=';', encoding='latin1', index=False)
+    return str(caminho)
+
+def test_run_pipeline_reports_each_stage(fixture_dados_brutos, tmp_path):
+    eventos = []
+    resultado = run_pipeline(
+        _csv_bruto(fixture_dados_brutos, tmp_path), str(tmp_path / "fm.db"),
+        progresso=lambda etapa, mensagem, linhas=None: eventos.append((etapa, linhas))
+    )
+
+    relatorio = resultado.pop('relatorio')
+    assert resultado == {'extraidas': 4, 'transformadas': 3, 'validadas': 3, 'versoes': 3}
+    assert os.path.isfile(os.path.join(relatorio, 'wonderkids.html'))
+    assert [e for e in eventos if e[1] is not None][:4] == [
+        ('extract', 4), ('transform', 3), ('validate', 3), ('load', 3)
+    ]
+    assert [e[0] for e in eventos][-1] == 'report'
+
+def test_stale_lock_is_removed(tmp_path):
+    lock = tmp_path / "etl.lock"
+    lock.write_text("999999999")
+    assert not is_running(str(lock))
+    assert not lock.exists()
+
+def test_lock_being_written_is_not_taken_as_stale(tmp_path):
+    lock = tmp_path / "etl.lock"
+    lock.write_text("")
+    assert is_running(str(lock)) and lock.exists()
+    antigo = time.time() - CARENCIA_TRAVA - 1
+    os.utime(lock, (antigo, antigo))
+    assert not is_running(str(lock))
+    assert not lock.exists()
+
+def test_lock_is_released_only_by_its_owner(tmp_path):
+    lock = str(tmp_path / "etl.lock")
+    assert _acquire_lock(lock)
+    assert not _acquire_lock(lock)
+    assert open(lock).read() == str(os.getpid())
+    _release_lock(lock, os.getpid() + 1)
+    assert os.path.exists(lock)
+    _release_lock(lock, os.getpid())
+    assert not os.path.exists(lock)
+    assert os.listdir(tmp_path) == []
+
+def test_background_run_holds_lock_until_done(fixture_dados_brutos, tmp_path):
+    caminhos = dict(
+        db_path=str(tmp_path / "fm.db"), lock_path=str(tmp_path / "etl.lock"),
+        status_path=str(tmp_path / "etl_status.json")
+    )
+    csv = _csv_bruto(fixture_dados_brutos, tmp_path)
+
+    assert start_pipeline_run(csv, **caminhos)
+    assert not start_pipeline_run(csv, **caminhos)
+
+    limite = time.time() + 60
+    while is_running(caminhos['lock_path']) and time.time() < limite:
+        time.sleep(0.1)
+
+    status = read_status(caminhos['status_path'])
+    assert status['estado'] == 'concluido'
+    assert status['linhas']['load'] == 3
+    assert not os.path.exists(caminhos['lock_path'])
+    with sqlite3.connect(caminhos['db_path']) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM players").fetchone()[0] == 3
@@ -0,0 +1,34 @@
+import pytest
+import pandas as pd
+from src.analysis.similarity import SimilarityIndex, tokenize_roles
+
+@pytest.fixture
+def df_snapshot() -> pd.DataFrame:
+    dados = {
+        'nome': ['Ponta A', 'Ponta B (Barato)', 'Ponta C (Veterano)', 'Zagueiro D'],
+        'posicao': ['MA DE, PL', 'MA DE', 'MA DE, PL', 'DC'],
+        'sufixo_atual': ['W', 'W', 'W', 'CB'],
+        'idade': [22, 21, 33, 22],
+        'classificacao_atual': [70.0, 70.0, 60.0, 70.0],
+        'classificacao_potencial': [80.0, 80.0, 62.0, 80.0],
+        'valor': [10_000_000.0, 9_500_000.0, 1_000_000.0, 10_000_000.0],
+        'salario': [50_000.0, 50_000.0, 10_000.0, 50_000.0],
+    }
+    return pd.DataFrame(dados, index=[10, 11, 12, 13])
+
+def test_tokenize_roles():
+    assert tokenize_roles('MA DE, PL', 'W') == {'pos:MA DE', 'pos:PL', 'fun:W'}
+    assert tokenize_roles(None, None) == set()
+
+def test_query_returns_most_similar_first(df_snapshot):
+    indice = SimilarityIndex(df_snapshot)
+    resultado = indice.query(indice.position_of(10), k=3)
+    assert 10 not in resultado.index
+    assert resultado.index[0] == 11
+    assert resultado.index[-1] == 12
+    assert resultado['distancia'].is_monotonic_increasing
+
+def test_query_constraints(df_snapshot):
+    indice = SimilarityIndex(df_snapshot)
+    resultado = indice.query(indice.position_of(10), k=3, mais_barato=True, mais_jovem=True)
+    assert list(resultado.index) == [11]
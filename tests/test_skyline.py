@@ -0,0 +1,43 @@
+import pytest
+import numpy as np
+import pandas as pd
+from src.analysis.skyline import skyline_mask, compute_bargains
+
+@pytest.fixture
+def df_mercado() -> pd.DataFrame:
+    dados = {
+        'nome': ['Barato e Bom', 'Caro e Melhor', 'Caro e Pior', 'Barato e Ruim', 'Repetido', 'Goleiro'],
+        'sufixo_atual': ['W', 'W', 'W', 'W', 'W', 'GK'],
+        'idade': [25, 30, 22, 19, 25, 35],
+        'valor': [1_000_000.0, 5_000_000.0, 6_000_000.0, 1_000_000.0, 1_000_000.0, 9_000_000.0],
+        'classificacao_atual': [70.0, 80.0, 75.0, 60.0, 70.0, 50.0],
+        'classificacao_potencial': [72.0, 80.0, 85.0, 75.0, 72.0, 50.0],
+    }
+    return pd.DataFrame(dados)
+
+def test_skyline_2d_keeps_ties_and_drops_dominated(df_mercado):
+    mascara = skyline_mask(df_mercado)
+    assert list(df_mercado.loc[mascara, 'nome']) == ['Barato e Bom', 'Caro e Melhor', 'Repetido']
+
+def test_skyline_with_extra_criteria(df_mercado):
+    criterios = {'valor': 'min', 'classificacao_atual': 'max', 'idade': 'min', 'classificacao_potencial': 'max'}
+    mascara = skyline_mask(df_mercado, criterios)
+    assert set(df_mercado.loc[mascara, 'nome']) == {
+        'Barato e Bom', 'Caro e Melhor', 'Caro e Pior', 'Barato e Ruim', 'Repetido'
+    }
+
+def test_skyline_nd_matches_brute_force():
+    rng = np.random.default_rng(42)
+    M = rng.integers(0, 5, size=(80, 3)).astype(float)
+    df = pd.DataFrame(M, columns=['a', 'b', 'c'])
+    mascara = skyline_mask(df, {'a': 'min', 'b': 'min', 'c': 'min'})
+    esperado = [
+        not any(np.all(M[j] <= M[i]) and np.any(M[j] < M[i]) for j in range(len(M)))
+        for i in range(len(M))
+    ]
+    assert list(mascara) == esperado
+
+def test_compute_bargains_per_group(df_mercado):
+    pechinchas = compute_bargains(df_mercado, grupo='sufixo_atual')
+    assert 'Goleiro' in set(pechinchas['nome'])
+    assert pechinchas['nome'].iloc[0] == 'Caro e Melhor'
@@ -0,0 +1,52 @@
+import itertools
+import pytest
+import numpy as np
+import pandas as pd
+from src.analysis.squad import parse_positions, build_squad
+
+FORMACAO_PEQUENA = {'Goleiro': 1, 'Zagueiro': 2, 'Atacante': 1}
+
+@pytest.fixture
+def df_mercado() -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    posicoes = ['GR'] * 5 + ['Def C'] * 7 + ['PL'] * 5 + ['Def C, PL'] * 3
+    n = len(posicoes)
+    return pd.DataFrame({
+        'nome': [f'Jogador {i}' for i in range(n)],
+        'posicao': posicoes,
+        'valor': rng.integers(1, 20, n).astype(float) * 1_000_000,
+        'salario': rng.integers(1, 20, n).astype(float) * 1_000,
+        'classificacao_atual': rng.integers(40, 90, n).astype(float),
+    })
+
+def test_parse_positions_expands_roles_and_sides():
+    assert parse_positions("Def/Ala E, MA EC") == {'Def E', 'Ala E', 'MA E', 'MA C'}
+    assert parse_positions("PL") == {'PL'}
+    assert parse_positions(None) == set()
+
+def test_build_squad_matches_brute_force(df_mercado):
+    orcamento, orcamento_salarial = 40_000_000, 45_000
+    elenco, info = build_squad(df_mercado, FORMACAO_PEQUENA, orcamento, orcamento_salarial)
+
+    goleiros = np.flatnonzero(df_mercado['posicao'] == 'GR')
+    zagueiros = np.flatnonzero(df_mercado['posicao'].str.contains('Def C'))
+    atacantes = np.flatnonzero(df_mercado['posicao'].str.contains('PL'))
+    melhor = -np.inf
+    for g, (z1, z2), a in itertools.product(goleiros, itertools.combinations(zagueiros, 2), atacantes):
+        escolha = [g, z1, z2, a]
+        if len(set(escolha)) < 4:
+            continue
+        linhas = df_mercado.iloc[escolha]
+        if linhas['valor'].sum() <= orcamento and linhas['salario'].sum() <= orcamento_salarial:
+            melhor = max(melhor, linhas['classificacao_atual'].sum())
+
+    assert info['otimo']
+    assert info['total'] == melhor
+    assert elenco.index.is_unique
+    assert elenco['valor'].sum() <= orcamento
+    assert elenco['salario'].sum() <= orcamento_salarial
+    assert list(elenco['vaga']) == ['Goleiro', 'Zagueiro', 'Zagueiro', 'Atacante']
+
+def test_build_squad_without_enough_players(df_mercado):
+    with pytest.raises(ValueError):
+        build_squad(df_mercado, {'Goleiro': 1, 'Meia': 1}, 1e12, 1e12)
@@ -1,5 +1,16 @@
 import pytest
+import numpy as np
 import pandas as pd
+from src.transform.transform import transform_data, PARSERS_PANDAS, COLUNAS_MAP, _run_pandas, _parsers_polars
+from src.transform.parallel import run_partitioned, partition_count
+from src.utils import convert_currency_to_float, convert_rating_to_float, extract_rating_suffix
+
+# Roda todos os testes deste arquivo nos dois backends (o Polars só quando instalado).
+@pytest.fixture(params=['pandas', 'polars'])
+def fixture_dados_transformados(request, fixture_dados_brutos) -> pd.DataFrame:
+    if request.param == 'polars':
+        pytest.importorskip('polars')
+    return transform_data(fixture_dados_brutos, backend=request.param)
 
 def test_remove_ghosts(fixture_dados_transformados):
     assert len(fixture_dados_transformados) == 3
@@ -38,3 +49,61 @@ def test_data_snapshot_column(fixture_dados_transformados):
     assert pd.api.types.is_datetime64_any_dtype(
         fixture_dados_transformados['data_snapshot']
     )
+
+def test_vectorized_parsers_match_utils():
+    valores = pd.Series(['R$ 1,5M', 'R$ 500K', 'R$ 1.250', '0', 0, 'N/D', np.nan, '-', '',
+                         '50,1% (M)', '45,0%', 'abc', 1.5, 1500000.0, 2.5], dtype=object)
+    esperado = {
+        'moeda': convert_currency_to_float,
+        'classificacao': convert_rating_to_float,
+        'sufixo': extract_rating_suffix,
+    }
+    for nome, funcao in esperado.items():
+        assert PARSERS_PANDAS[nome](valores).equals(pd.Series([funcao(v) for v in valores])), nome
+
+    # Polars: uma coluna não mistura tipos, então textos e números vão em colunas separadas
+    pl = pytest.importorskip('polars')
+    eh_texto = valores.map(type).eq(str)
+    quadro = pl.DataFrame({
+        'texto': pl.Series([v if isinstance(v, str) else None for v in valores], dtype=pl.Utf8),
+        'numero': pl.Series([None if isinstance(v, str) else v for v in valores], dtype=pl.Float64),
+    })
+    for nome, funcao in esperado.items():
+        parser = _parsers_polars()[nome]
+        obtido = quadro.select(
+            texto=parser('texto', quadro.schema['texto']), numero=parser('numero', quadro.schema['numero'])
+        ).to_pandas()
+        combinado = obtido['texto'].where(eh_texto, obtido['numero']).astype(object)
+        esperados = [funcao(v) for v in valores]
+        assert [None if pd.isna(v) else v for v in combinado] == [None if pd.isna(v) else v for v in esperados], nome
+
+def test_unknown_backend_raises(fixture_dados_brutos):
+    with pytest.raises(ValueError):
+        transform_data(fixture_dados_brutos, backend='spark')
+
+def test_parallel_transform_matches_serial(fixture_dados_brutos):
+    bruto = pd.concat([fixture_dados_brutos] * 50, ignore_index=True)
+    colunas = dict(COLUNAS_MAP)
+    serial = _run_pandas(bruto, colunas)
+    paralelo = run_partitioned(bruto, colunas, workers=3, min_linhas=50)
+    pd.testing.assert_frame_equal(paralelo, serial)
+
+def test_parallel_transform_falls_back_on_mixed_types(fixture_dados_brutos):
+    bruto = fixture_dados_brutos.copy()
+    bruto['Valor Venda'] = ['R$ 1.5M', 500000, '0', np.nan]
+    colunas = dict(COLUNAS_MAP)
+    pd.testing.assert_frame_equal(run_partitioned(bruto, colunas, workers=2, min_linhas=1), _run_pandas(bruto, colunas))
+
+def test_partition_count():
+    assert partition_count(1_000, workers=8, min_linhas=400) == 3
+    assert partition_count(10, workers=8, min_linhas=400) == 1
+    assert partition_count(1_000_000, workers=4, min_linhas=400) == 4
+
+def test_polars_handles_numeric_and_mixed_raw_columns(fixture_dados_brutos):
+    pytest.importorskip('polars')
+    from src.transform.transform import _run_polars
+    colunas = dict(COLUNAS_MAP)
+    for valores in ([1500000.0, 2.5, 0.0, np.nan], ['R$ 1.5M', 500000, '0', np.nan]):
+        bruto = fixture_dados_brutos.copy()
+        bruto['Valor Venda'] = valores
+        pd.testing.assert_frame_equal(_run_polars(bruto, colunas), _run_pandas(bruto, colunas), check_dtype=False)
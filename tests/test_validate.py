@@ -0,0 +1,61 @@
+import json
+import sqlite3
+import pytest
+import pandas as pd
+from src.transform.transform import transform_data
+from src.validate.validate import validate_data, ValidationError, LIMITES
+
+# Export com um problema de cada tipo (além da linha sem nome)
+@pytest.fixture
+def df_bruto_com_problemas(fixture_dados_brutos) -> pd.DataFrame:
+    boas = pd.concat([fixture_dados_brutos.iloc[:3]] * 100, ignore_index=True)
+    boas['ID Único'] = range(len(boas))
+    ruins = pd.DataFrame({
+        'Nome': ['Idade Errada', 'Nota Errada', 'Valor Ilegível', 'Duplicado', ''],
+        'País': 'Brasil', 'Posição': 'PL', 'Clube': 'Clube X',
+        'Idade': [1, 20, 20, 20, 20],
+        'Valor Venda': ['R$ 1K', 'R$ 1K', 'R$ ??', 'R$ 1K', 'R$ 1K'],
+        'Salário': '0',
+        'Melhor Classificação': ['50,0%', '150,0%', '50,0%', '50,0%', '50,0%'],
+        'Melhor Classificação Potencial': '60,0%',
+        'ID Único': [1000, 1001, 1002, 0, 1003],
+    })
+    df = pd.concat([boas, ruins, fixture_dados_brutos.iloc[[3]]], ignore_index=True)
+    df.loc[df['Nome'] == '', 'Nome'] = None
+    return df
+
+def test_offending_rows_go_to_quarantine(df_bruto_com_problemas):
+    df = transform_data(df_bruto_com_problemas, backend='pandas')
+    df_valido, quarentena, relatorio = validate_data(df_bruto_com_problemas, df)
+
+    por_regra = quarentena.groupby('regra')['linha_csv'].count().to_dict()
+    assert por_regra == {
+        'idade_implausivel': 1, 'classificacao_fora_da_faixa': 1, 'moeda_invalida': 1,
+        'id_duplicado': 2, 'nome_vazio': 2
+    }
+    assert relatorio['ok'].all()
+    assert len(df_valido) == len(df) - 5
+    assert not df_valido['nome'].isin(['Idade Errada', 'Nota Errada', 'Valor Ilegível', 'Duplicado']).any()
+    # O registro guardado é o bruto, apontando para a linha do CSV
+    registro = quarentena[quarentena['regra'] == 'moeda_invalida'].iloc[0]
+    assert json.loads(registro['registro'])['Valor Venda'] == 'R$ ??'
+    assert registro['linha_csv'] == df_bruto_com_problemas.index[df_bruto_com_problemas['Nome'] == 'Valor Ilegível'][0] + 2
+
+def test_threshold_aborts_before_load(df_bruto_com_problemas, tmp_path):
+    db = tmp_path / "fm.db"
+    df = transform_data(df_bruto_com_problemas, backend='pandas')
+    with pytest.raises(ValidationError) as erro:
+        validate_data(df_bruto_com_problemas, df, str(db), limites={**LIMITES, 'idade_implausivel': 0.0})
+    assert not erro.value.relatorio.loc['idade_implausivel', 'ok']
+
+    # A quarentena fica gravada para inspeção; nenhum dado de jogador foi carregado
+    with sqlite3.connect(db) as conn:
+        tabelas = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        n_quarentena = conn.execute("SELECT COUNT(*) FROM quarantine").fetchone()[0]
+    assert tabelas == {'quarantine'}
+    assert n_quarentena == 7
+
+def test_clean_export_passes(fixture_dados_brutos, fixture_dados_transformados):
+    df_valido, quarentena, _ = validate_data(fixture_dados_brutos, fixture_dados_transformados)
+    assert len(df_valido) == 3
+    assert list(quarentena['regra']) == ['nome_vazio']